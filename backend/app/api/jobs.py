@@ -1,12 +1,169 @@
-from flask import Blueprint, jsonify
+import json
+import os
+import uuid
+from datetime import datetime
 
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context
+from werkzeug.utils import secure_filename
+
+from ..extensions import db
 from ..models import ImportJob
+from ..models.import_job import RUNNING_STATUSES
+from ..services.job_events import SETTLED_STATUSES, job_state, publish_job, wait_for_job
+from ..tasks.import_csv import apply_import_preview, import_products_job, resume_task
 
 jobs_bp = Blueprint("jobs", __name__)
 
+# How long an event stream waits for an update before sending a keepalive
+# comment, which stops proxies from closing an idle connection.
+KEEPALIVE_SECONDS = 15
+
 
 @jobs_bp.get("/<string:job_id>")
 def get_job(job_id: str):
+    """
+    The job's current state, including its ``version``. Pass that back as
+    ``since`` together with ``wait=<seconds>`` to long-poll: the request is
+    held until the job changes or the wait (at most a minute) runs out.
+    """
+    since = request.args.get("since", type=int)
+    wait = request.args.get("wait", default=0, type=float)
+    if since is None or wait <= 0:
+        job = ImportJob.query.filter_by(job_id=job_id).first_or_404()
+        return jsonify(job_state(job))
+
+    state = wait_for_job(job_id, since, wait)
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(state)
+
+
+@jobs_bp.get("/<string:job_id>/events")
+def job_event_stream(job_id: str):
+    """
+    Server-sent events: a ``job`` event with the job's state each time it
+    changes, ending once the job settles. A reconnecting ``EventSource``
+    sends ``Last-Event-ID`` and only hears about newer versions.
+    """
+    ImportJob.query.filter_by(job_id=job_id).first_or_404()
+    since = request.headers.get("Last-Event-ID", type=int)
+
+    def stream():
+        version = since
+        yield "retry: 2000\n\n"
+        while True:
+            state = wait_for_job(job_id, version, KEEPALIVE_SECONDS)
+            if state is None:
+                return
+            settled = state["status"] in SETTLED_STATUSES
+            # A settled job is always sent, so a client that reconnects
+            # after the last event still learns it can stop listening.
+            if version is None or state["version"] > version or settled:
+                version = state["version"]
+                yield f"event: job\nid: {version}\ndata: {json.dumps(state)}\n\n"
+            else:
+                yield ": keepalive\n\n"
+            if settled:
+                return
+
+    response = Response(stream_with_context(stream()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@jobs_bp.post("/<string:job_id>/resume")
+def resume_job(job_id: str):
     job = ImportJob.query.filter_by(job_id=job_id).first_or_404()
-    return jsonify(job.to_dict())
+    if job.status == "previewed":
+        return jsonify({"error": "Preview is ready; apply it instead"}), 409
+    # Only a failed job, or one whose worker stopped sending heartbeats, has
+    # anything to pick up; every other status is running or settled.
+    running = job.status in RUNNING_STATUSES
+    if running and not job.is_stale(current_app.config["IMPORT_STALE_AFTER"]):
+        return jsonify({"error": "Job is still running"}), 409
+    if not running and job.status != "failed":
+        error = f"Only a failed or stalled job can be resumed (status is {job.status})"
+        return jsonify({"error": error}), 409
+
+    task = resume_task(job)
+    job.status = "queued"
+    db.session.commit()
+    publish_job(job)
+
+    task.delay(job_id=job.job_id)
+
+    return jsonify({"job_id": job.job_id, "resume_from": job.checkpoint_offset}), 202
+
+
+@jobs_bp.post("/<string:job_id>/apply")
+def apply_preview(job_id: str):
+    """Merge a previewed job's staged rows into products, without re-reading its file."""
+    job = ImportJob.query.filter_by(job_id=job_id).first_or_404()
+    if job.status != "previewed":
+        return jsonify({"error": f"Only a previewed job can be applied (status is {job.status})"}), 409
+
+    # Claimed here so a second request cannot queue the same apply twice.
+    job.status = "applying"
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+    publish_job(job)
+
+    apply_import_preview.delay(job_id=job.job_id)
+
+    return jsonify({"job_id": job.job_id, "preview": (job.stats or {}).get("preview")}), 202
+
+
+@jobs_bp.get("/<string:job_id>/rejects")
+def download_rejects(job_id: str):
+    job = ImportJob.query.filter_by(job_id=job_id).first_or_404()
+    if not job.reject_file_path or not os.path.exists(job.reject_file_path):
+        return jsonify({"error": "Job has no rejected rows"}), 404
+    stem = os.path.splitext(job.filename)[0]
+    return send_file(
+        job.reject_file_path,
+        mimetype="text/csv",
+        as_attachment=True,
+        download_name=f"{stem}_rejects.csv",
+    )
+
+
+@jobs_bp.post("/<string:job_id>/rejects/import")
+def import_rejects(job_id: str):
+    """
+    Import a corrected copy of a job's reject file, sent as ``file``, with
+    the job's options. The leading ``_row``/``_offset``/``_error`` columns
+    are ignored by the importer. The stored reject file itself is refused:
+    its rows would only be rejected again.
+    """
+    job = ImportJob.query.filter_by(job_id=job_id).first_or_404()
+    if not job.reject_file_path or not os.path.exists(job.reject_file_path):
+        return jsonify({"error": "Job has no rejected rows"}), 404
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Send the corrected reject file as file"}), 400
+
+    new_job_id = str(uuid.uuid4())
+    filename = secure_filename(upload.filename)
+    if not filename.lower().endswith(".csv"):
+        return jsonify({"error": "Only CSV files are supported"}), 400
+    file_path = os.path.join(os.path.dirname(job.file_path), f"{new_job_id}_{filename}")
+    upload.save(file_path)
+
+    # Not a sync: the reject file is a fragment, not the whole catalog.
+    reimport = ImportJob(
+        job_id=new_job_id,
+        filename=filename,
+        file_path=file_path,
+        status="queued",
+        load_mode=job.load_mode,
+        column_mapping=job.column_mapping,
+        error_policy=job.error_policy,
+        max_errors=job.max_errors,
+    )
+    db.session.add(reimport)
+    db.session.commit()
+
+    import_products_job.delay(job_id=new_job_id)
 
+    return jsonify({"job_id": new_job_id, "source_job_id": job.job_id}), 202
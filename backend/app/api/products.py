@@ -1,9 +1,20 @@
+import os
+import uuid
 from decimal import Decimal, InvalidOperation
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
 
 from ..extensions import db
-from ..models import Product
+from ..models import DeleteJob, ImportJob, Product
+from ..services.batch_sizer import BatchSizer
+from ..services.bulk_upsert import apply_records, iter_records, spool_records
+from ..services.pagination import approximate_count, keyset_page
+from ..services.product_export import EXPORT_FORMATS, export_chunks, gzip_chunks
+from ..services.product_fields import json_response, parse_fields, project, serialize_rows
+from ..services.product_search import FILTER_FIELDS, apply_filters, relevance
+from ..services.webhook_events import emit_product_changes
+from ..tasks.delete_products import delete_products_job
+from ..tasks.import_csv import UPSERT_PARAMS_PER_ROW, import_products_job
 
 products_bp = Blueprint("products", __name__)
 
@@ -12,36 +23,80 @@ products_bp = Blueprint("products", __name__)
 def list_products():
     page = int(request.args.get("page", 1))
     per_page = min(int(request.args.get("per_page", 20)), 100)
-    sku = request.args.get("sku")
-    name = request.args.get("name")
-    description = request.args.get("description")
-    is_active = request.args.get("is_active")
-
-    query = Product.query
-
-    if sku:
-        query = query.filter(Product.sku_normalized.contains(sku.lower()))
-    if name:
-        query = query.filter(Product.name.ilike(f"%{name}%"))
-    if description:
-        query = query.filter(Product.description.ilike(f"%{description}%"))
-    if is_active is not None:
-        if is_active.lower() == "true":
-            query = query.filter(Product.is_active.is_(True))
-        elif is_active.lower() == "false":
-            query = query.filter(Product.is_active.is_(False))
-
-    pagination = query.order_by(Product.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    return jsonify(
+    sort = request.args.get("sort")
+    cursor = request.args.get("cursor")
+    approximate = request.args.get("total") == "approx"
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    # Rows are fetched as projected tuples rather than hydrated Product objects.
+    query = project(apply_filters(Product.query, request.args), fields)
+
+    # Any ``cursor`` parameter (empty for the first page) selects keyset
+    # pagination, which never counts and never skips rows with OFFSET.
+    if cursor is not None:
+        if sort == "relevance":
+            return jsonify({"error": "sort=relevance does not support cursor pagination"}), 400
+        try:
+            items, next_cursor = keyset_page(query, Product, cursor, per_page)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        payload = {"items": serialize_rows(items, fields), "next_cursor": next_cursor, "per_page": per_page}
+        if approximate:
+            payload["total"] = _approximate_total(query)
+            payload["total_is_estimate"] = True
+        return json_response(payload)
+
+    # ``sort=relevance`` ranks matches on Postgres; elsewhere it keeps the newest-first order.
+    score = relevance(request.args) if sort == "relevance" else None
+    if score is not None:
+        query = query.order_by(score.desc(), Product.created_at.desc(), Product.id.desc())
+    else:
+        query = query.order_by(Product.created_at.desc(), Product.id.desc())
+
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=not approximate)
+    if approximate:
+        pagination.total = _approximate_total(query)
+    return json_response(
         {
-            "items": [p.to_dict() for p in pagination.items],
+            "items": serialize_rows(pagination.items, fields),
             "total": pagination.total,
             "page": pagination.page,
             "pages": pagination.pages,
+            "total_is_estimate": approximate,
         }
     )
 
 
+@products_bp.get("/export")
+def export_products():
+    export_format = request.args.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    compress = request.args.get("gzip", "").lower() == "true"
+
+    query = apply_filters(Product.query, request.args)
+    chunks = export_chunks(query, export_format, fields, current_app.config["EXPORT_BATCH_SIZE"])
+    filename = f"products.{export_format}"
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return current_app.response_class(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @products_bp.post("/")
 def create_product():
     payload = request.get_json() or {}
@@ -56,12 +111,36 @@ def create_product():
     product.set_sku(payload["sku"])
     db.session.add(product)
     db.session.commit()
+    emit_product_changes(inserted=[product.sku], source={"api": "create"})
     return jsonify(product.to_dict()), 201
 
 
+@products_bp.post("/bulk-upsert")
+def bulk_upsert_products():
+    # Bodies past the inline limit are too slow for one request; load them as an import job.
+    background = request.args.get("background", "").lower() == "true"
+    if request.content_length and request.content_length > current_app.config["BULK_UPSERT_INLINE_LIMIT"]:
+        background = True
+
+    records = iter_records(request.stream, request.content_type)
+    try:
+        if background:
+            return _hand_off_bulk_upsert(records)
+        sizer = BatchSizer(
+            current_app.config["IMPORT_BATCH_SIZE"],
+            current_app.config["IMPORT_BATCH_TARGET_SECONDS"],
+            params_per_row=UPSERT_PARAMS_PER_ROW,
+        )
+        result = apply_records(records, str(uuid.uuid4()), sizer)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(result)
+
+
 @products_bp.put("/<int:product_id>")
 def update_product(product_id: int):
     product = Product.query.get_or_404(product_id)
+    previous_sku = product.sku
     payload = request.get_json() or {}
     if "sku" in payload:
         if not payload["sku"]:
@@ -73,22 +152,104 @@ def update_product(product_id: int):
     if "price" in payload:
         product.price = _parse_price(payload["price"])
     db.session.commit()
+    # A renamed SKU reads as the old one gone and the new one changed.
+    emit_product_changes(
+        updated=[product.sku],
+        deleted=[previous_sku] if previous_sku != product.sku else [],
+        source={"api": "update"},
+    )
     return jsonify(product.to_dict())
 
 
 @products_bp.delete("/<int:product_id>")
 def delete_product(product_id: int):
     product = Product.query.get_or_404(product_id)
+    sku = product.sku
     db.session.delete(product)
     db.session.commit()
+    emit_product_changes(deleted=[sku], source={"api": "delete"})
     return ("", 204)
 
 
 @products_bp.post("/bulk-delete")
 def bulk_delete_products():
-    deleted = db.session.query(Product).delete(synchronize_session=False)
+    # Filters come from the query string like the list endpoint, or from the JSON body.
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+    # A misspelt filter must not widen the delete, so unknown keys are refused.
+    unknown = sorted((set(payload) | set(request.args)) - {*FILTER_FIELDS, "skus", "all"})
+    if unknown:
+        return jsonify({"error": f"Unknown bulk-delete fields: {', '.join(unknown)}"}), 400
+
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = payload.get(field, request.args.get(field))
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        if value not in (None, ""):
+            filters[field] = str(value)
+    if "is_active" in filters and filters["is_active"].lower() not in ("true", "false"):
+        return jsonify({"error": "is_active must be true or false"}), 400
+
+    skus = payload.get("skus")
+    if skus is not None and (
+        not isinstance(skus, list) or not all(isinstance(sku, str) and sku.strip() for sku in skus)
+    ):
+        return jsonify({"error": "skus must be a list of non-empty strings"}), 400
+
+    delete_all = payload.get("all", request.args.get("all"))
+    if delete_all not in (None, True, "true"):
+        return jsonify({"error": "all must be true"}), 400
+    if delete_all is not None and (filters or skus is not None):
+        return jsonify({"error": "all cannot be combined with filters or skus"}), 400
+    if delete_all is None and not filters and skus is None:
+        return jsonify({"error": "Give filters or skus, or all=true to delete every product"}), 400
+
+    delete_job = DeleteJob(filters={"all": True} if delete_all else filters or None, skus=skus)
+    db.session.add(delete_job)
+    db.session.commit()
+
+    delete_products_job.delay(job_id=delete_job.job_id)
+
+    return jsonify({"job_id": delete_job.job_id}), 202
+
+
+@products_bp.get("/bulk-delete/<string:job_id>")
+def get_bulk_delete(job_id: str):
+    delete_job = DeleteJob.query.filter_by(job_id=job_id).first_or_404()
+    return jsonify(delete_job.to_dict())
+
+
+def _hand_off_bulk_upsert(records):
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    os.makedirs(upload_folder, exist_ok=True)
+
+    job_id = str(uuid.uuid4())
+    file_path = os.path.join(upload_folder, f"{job_id}_bulk-upsert.csv")
+    try:
+        rows, errors = spool_records(records, file_path)
+    except ValueError:
+        os.remove(file_path)
+        raise
+
+    import_job = ImportJob(
+        job_id=job_id,
+        filename="bulk-upsert.csv",
+        file_path=file_path,
+        status="queued",
+        load_mode=current_app.config["IMPORT_LOAD_MODE"],
+        error_policy=current_app.config["IMPORT_ERROR_POLICY"],
+        max_errors=current_app.config["IMPORT_MAX_ERRORS"],
+    )
+    db.session.add(import_job)
     db.session.commit()
-    return jsonify({"deleted": deleted})
+    import_products_job.delay(job_id=job_id)
+    return jsonify({"job_id": job_id, "rows": rows, "errors": errors}), 202
+
+
+def _approximate_total(query) -> int:
+    return approximate_count(query, current_app.config["PRODUCT_COUNT_CACHE_SECONDS"])
 
 
 def _parse_price(value):
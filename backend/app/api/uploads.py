@@ -1,15 +1,28 @@
+import hashlib
+import json
 import os
 import uuid
 
 from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import ClientDisconnected
 from werkzeug.utils import secure_filename
 
 from ..extensions import db
-from ..models import ImportJob
-from ..tasks.import_csv import import_products_job
+from ..models import ImportJob, UploadSession
+from ..services.csv_chunks import is_supported_upload
+from ..services.csv_columns import validate_mapping
+from ..tasks.import_csv import (
+    ERROR_POLICIES,
+    LOAD_MODES,
+    SYNC_MODES,
+    find_completed_import,
+    import_products_job,
+)
 
 uploads_bp = Blueprint("uploads", __name__)
 
+_BLOCK_SIZE = 1024 * 1024
+
 
 @uploads_bp.post("/")
 def upload_csv():
@@ -21,30 +34,279 @@ def upload_csv():
         return jsonify({"error": "No selected file"}), 400
 
     filename = secure_filename(file.filename)
-    if not filename.lower().endswith(".csv"):
-        return jsonify({"error": "Only CSV files are supported"}), 400
+    if not is_supported_upload(filename):
+        return jsonify({"error": "Only CSV files (optionally .gz, .zst or .zip) are supported"}), 400
+
+    options, error = _parse_import_options(request.form)
+    if error:
+        return jsonify({"error": error}), 400
 
     upload_folder = current_app.config["UPLOAD_FOLDER"]
     os.makedirs(upload_folder, exist_ok=True)
 
     job_id = str(uuid.uuid4())
     file_path = os.path.join(upload_folder, f"{job_id}_{filename}")
-    file.save(file_path)
+    content_sha256 = _save_with_digest(file.stream, file_path)
+
+    return _start_import(job_id, filename, file_path, content_sha256, options)
+
+
+@uploads_bp.post("/sessions")
+def create_upload_session():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    filename = secure_filename(payload.get("filename") or "")
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    if not is_supported_upload(filename):
+        return jsonify({"error": "Only CSV files (optionally .gz, .zst or .zip) are supported"}), 400
+
+    expected_size = payload.get("size")
+    if expected_size is not None and (not isinstance(expected_size, int) or expected_size < 0):
+        return jsonify({"error": "size must be a non-negative integer"}), 400
+
+    options, error = _parse_import_options(payload)
+    if error:
+        return jsonify({"error": error}), 400
+
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    os.makedirs(upload_folder, exist_ok=True)
+
+    session_id = str(uuid.uuid4())
+    file_path = os.path.join(upload_folder, f"{session_id}_{filename}.part")
+    open(file_path, "wb").close()
+
+    upload_session = UploadSession(
+        session_id=session_id,
+        filename=filename,
+        file_path=file_path,
+        expected_size=expected_size,
+        options=options,
+    )
+    db.session.add(upload_session)
+    db.session.commit()
+    return jsonify(upload_session.to_dict()), 201
+
+
+@uploads_bp.get("/sessions/<string:session_id>")
+def get_upload_session(session_id: str):
+    upload_session = UploadSession.query.filter_by(session_id=session_id).first_or_404()
+    return jsonify(upload_session.to_dict())
+
+
+@uploads_bp.put("/sessions/<string:session_id>/chunks/<int:index>")
+def upload_chunk(session_id: str, index: int):
+    offset = request.args.get("offset", type=int)
+    if offset is None or offset < 0:
+        return jsonify({"error": "offset query parameter is required"}), 400
+
+    # The row lock serialises concurrent PUTs for the same session.
+    upload_session = (
+        UploadSession.query.filter_by(session_id=session_id).with_for_update().first_or_404()
+    )
+    if upload_session.status != "open":
+        return jsonify({"error": f"Upload session is {upload_session.status}"}), 409
+    if offset > upload_session.received_bytes:
+        return (
+            jsonify({"error": "Chunk is ahead of the received data", **upload_session.to_dict()}),
+            409,
+        )
+
+    # A retried chunk may overlap what is already on disk; drop the overlap and
+    # append the rest straight from the request stream.
+    skip = upload_session.received_bytes - offset
+    try:
+        with open(upload_session.file_path, "ab") as handle:
+            for block in iter(lambda: request.stream.read(_BLOCK_SIZE), b""):
+                if skip >= len(block):
+                    skip -= len(block)
+                    continue
+                handle.write(block[skip:])
+                skip = 0
+    except ClientDisconnected:
+        pass
+    finally:
+        # Whatever reached the disk counts, so a broken chunk resumes mid-way.
+        upload_session.received_bytes = os.path.getsize(upload_session.file_path)
+        upload_session.last_chunk = index
+        db.session.commit()
+
+    return jsonify(upload_session.to_dict())
+
+
+@uploads_bp.post("/sessions/<string:session_id>/finalize")
+def finalize_upload_session(session_id: str):
+    upload_session = (
+        UploadSession.query.filter_by(session_id=session_id).with_for_update().first_or_404()
+    )
+    if upload_session.status != "open":
+        return (
+            jsonify({"error": f"Upload session is {upload_session.status}", **upload_session.to_dict()}),
+            409,
+        )
+    if (
+        upload_session.expected_size is not None
+        and upload_session.received_bytes != upload_session.expected_size
+    ):
+        return jsonify({"error": "Upload is incomplete", **upload_session.to_dict()}), 409
 
+    job_id = str(uuid.uuid4())
+    part_path = upload_session.file_path
+    file_path = os.path.join(os.path.dirname(part_path), f"{job_id}_{upload_session.filename}")
+    os.replace(part_path, file_path)
+
+    upload_session.status = "finalized"
+    upload_session.job_id = job_id
+    upload_session.file_path = file_path
+    # The chunks were never seen as one stream, so hashing the file (and the
+    # duplicate check that needs it) is left to the worker.
     try:
-        import_job = ImportJob(
-            job_id=job_id,
-            filename=filename,
-            file_path=file_path,
-            status="queued",
+        import_job, _ = _record_import(
+            job_id, upload_session.filename, file_path, None, upload_session.options
         )
-        db.session.add(import_job)
-        db.session.commit()          # ✅ commit is safe now
+    except Exception as e:
+        # The rollback reopens the session; put its data back where it expects it.
+        db.session.rollback()
+        os.replace(file_path, part_path)
+        return jsonify({"error": str(e)}), 400
+    return _queue_import(import_job, None, upload_session.options)
+
+
+def _parse_import_options(source) -> tuple[dict, str | None]:
+    """Read the per-job import options from form fields or a JSON payload."""
+    load_mode = source.get("load_mode") or current_app.config["IMPORT_LOAD_MODE"]
+    if load_mode not in LOAD_MODES:
+        return {}, f"load_mode must be one of {', '.join(LOAD_MODES)}"
+
+    try:
+        chunk_count = int(source.get("chunks") or current_app.config["IMPORT_CHUNKS"])
+    except (TypeError, ValueError):
+        chunk_count = 0
+    if chunk_count < 1:
+        return {}, "chunks must be a positive integer"
+
+    column_mapping = source.get("column_mapping") or None
+    if isinstance(column_mapping, str):
+        try:
+            column_mapping = json.loads(column_mapping)
+        except ValueError:
+            return {}, "column_mapping must be valid JSON"
+    if column_mapping is not None:
+        error = validate_mapping(column_mapping)
+        if error:
+            return {}, error
+
+    sync_mode = source.get("sync_mode") or None
+    if sync_mode is not None and sync_mode not in SYNC_MODES:
+        return {}, f"sync_mode must be one of {', '.join(SYNC_MODES)}"
+
+    max_errors = source.get("max_errors")
+    if max_errors in (None, ""):
+        max_errors = current_app.config["IMPORT_MAX_ERRORS"]
+        default_policy = current_app.config["IMPORT_ERROR_POLICY"]
+    else:
+        try:
+            max_errors = int(max_errors)
+        except (TypeError, ValueError):
+            max_errors = -1
+        if max_errors < 0:
+            return {}, "max_errors must be a non-negative integer"
+        default_policy = "skip"  # an error budget only makes sense when bad rows are skipped
+    error_policy = source.get("error_policy") or default_policy
+    if error_policy not in ERROR_POLICIES:
+        return {}, f"error_policy must be one of {', '.join(ERROR_POLICIES)}"
+
+    force = str(source.get("force", "")).lower() == "true"
+    preview = str(source.get("preview", "")).lower() == "true"
+    return {
+        "load_mode": load_mode,
+        "chunk_count": chunk_count,
+        "column_mapping": column_mapping,
+        "sync_mode": sync_mode,
+        "error_policy": error_policy,
+        "max_errors": max_errors,
+        "force": force,
+        "preview": preview,
+    }, None
+
+
+def _start_import(
+    job_id: str, filename: str, file_path: str, content_sha256: str | None, options: dict
+):
+    try:
+        import_job, original = _record_import(job_id, filename, file_path, content_sha256, options)
     except Exception as e:
         db.session.rollback()        # ❗ REQUIRED FIX
         return jsonify({"error": str(e)}), 400
+    return _queue_import(import_job, original, options)
+
+
+def _record_import(
+    job_id: str, filename: str, file_path: str, content_sha256: str | None, options: dict
+) -> tuple[ImportJob, ImportJob | None]:
+    """Commit the job for an upload; returns it and the import it duplicates, if any."""
+    import_job = ImportJob(
+        job_id=job_id,
+        filename=filename,
+        file_path=file_path,
+        status="queued",
+        load_mode=options["load_mode"],
+        chunk_count=options["chunk_count"],
+        column_mapping=options["column_mapping"],
+        sync_mode=options.get("sync_mode"),
+        error_policy=options.get("error_policy", "fail_fast"),
+        max_errors=options.get("max_errors"),
+        preview=options.get("preview", False),
+        content_sha256=content_sha256,
+    )
+    original = (
+        find_completed_import(import_job)
+        if _check_duplicate(options) and content_sha256
+        else None
+    )
+    if original:
+        os.remove(file_path)
+        import_job.file_path = original.file_path
+        import_job.status = "skipped_duplicate"
+        import_job.duplicate_of = original.job_id
+    db.session.add(import_job)
+    db.session.commit()          # ✅ commit is safe now
+    return import_job, original
+
+
+def _queue_import(import_job: ImportJob, original: ImportJob | None, options: dict):
+    if original:
+        return jsonify(
+            {
+                "job_id": import_job.job_id,
+                "status": "skipped_duplicate",
+                "duplicate_of": original.job_id,
+            }
+        )
 
     # Trigger Celery (eager mode will run it instantly)
-    import_products_job.delay(job_id=job_id)
+    import_products_job.delay(
+        job_id=import_job.job_id,
+        digest=import_job.content_sha256 is None,
+        skip_duplicate=_check_duplicate(options),
+    )
+
+    return jsonify({"job_id": import_job.job_id}), 202
+
+
+def _check_duplicate(options: dict) -> bool:
+    # A preview is worth running even for a file that was already imported,
+    # and so is a sync: products added since the last run of the same file
+    # still have to be retired.
+    return not options["force"] and not options.get("preview") and not options.get("sync_mode")
+
 
-    return jsonify({"job_id": job_id}), 202
+def _save_with_digest(stream, file_path: str) -> str:
+    # Hash while writing so duplicate detection costs no extra pass over the file.
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as handle:
+        for block in iter(lambda: stream.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+            handle.write(block)
+    return digest.hexdigest()
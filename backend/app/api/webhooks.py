@@ -4,7 +4,8 @@ import requests
 from flask import Blueprint, jsonify, request
 
 from ..extensions import db
-from ..models import Webhook
+from ..models import Webhook, WebhookDelivery
+from ..tasks.webhook_delivery import deliver_webhooks
 
 webhooks_bp = Blueprint("webhooks", __name__)
 
@@ -23,6 +24,7 @@ def create_webhook():
         url=payload["url"],
         event_type=payload["event_type"],
         is_enabled=payload.get("is_enabled", True),
+        gzip=bool(payload.get("gzip", False)),
     )
     db.session.add(webhook)
     db.session.commit()
@@ -33,7 +35,7 @@ def create_webhook():
 def update_webhook(webhook_id: int):
     webhook = Webhook.query.get_or_404(webhook_id)
     payload = request.get_json() or {}
-    for field in ["name", "url", "event_type", "is_enabled"]:
+    for field in ["name", "url", "event_type", "is_enabled", "gzip"]:
         if field in payload:
             setattr(webhook, field, payload[field])
     db.session.commit()
@@ -71,3 +73,31 @@ def test_webhook(webhook_id: int):
         db.session.commit()
         return jsonify({"error": str(exc), "elapsed_ms": elapsed_ms}), 502
 
+
+@webhooks_bp.get("/<int:webhook_id>/deliveries")
+def list_deliveries(webhook_id: int):
+    Webhook.query.get_or_404(webhook_id)
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    deliveries = (
+        WebhookDelivery.query.filter_by(webhook_id=webhook_id)
+        .order_by(WebhookDelivery.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return jsonify([delivery.to_dict() for delivery in deliveries])
+
+
+@webhooks_bp.post("/deliveries/<int:delivery_id>/redeliver")
+def redeliver(delivery_id: int):
+    delivery = WebhookDelivery.query.get_or_404(delivery_id)
+    if delivery.status == "sending":
+        return jsonify({"error": "Delivery is being sent"}), 409
+
+    delivery.status = "pending"
+    delivery.attempts = 0
+    delivery.next_attempt_at = None
+    db.session.commit()
+
+    deliver_webhooks.delay([delivery.id])
+
+    return jsonify(delivery.to_dict()), 202
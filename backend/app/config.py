@@ -10,14 +10,61 @@ class BaseConfig:
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", str(Path("storage/uploads").resolve()))
     MAX_CONTENT_LENGTH = 1024 * 1024 * 1024  # 1GB
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
+    IMPORT_LOAD_MODE = os.getenv("IMPORT_LOAD_MODE", "insert")
+    IMPORT_CHUNKS = int(os.getenv("IMPORT_CHUNKS", "1"))
+    IMPORT_PIPELINE_DEPTH = int(os.getenv("IMPORT_PIPELINE_DEPTH", "3"))
+    IMPORT_STALE_AFTER = int(os.getenv("IMPORT_STALE_AFTER", "600"))
+    IMPORT_ERROR_POLICY = os.getenv("IMPORT_ERROR_POLICY", "fail_fast")
+    IMPORT_MAX_ERRORS = int(os.environ["IMPORT_MAX_ERRORS"]) if os.getenv("IMPORT_MAX_ERRORS") else None
+    IMPORT_PREVIEW_TTL = int(os.getenv("IMPORT_PREVIEW_TTL", str(24 * 3600)))
+    # Batches start at IMPORT_BATCH_SIZE rows and are resized to take about
+    # IMPORT_BATCH_TARGET_SECONDS to write, holding at most
+    # IMPORT_BATCH_MAX_BYTES of the file each.
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "2000"))
+    IMPORT_BATCH_TARGET_SECONDS = float(os.getenv("IMPORT_BATCH_TARGET_SECONDS", "1.0"))
+    IMPORT_BATCH_MAX_BYTES = int(os.getenv("IMPORT_BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+    # "database" writes progress to import_jobs with every batch; a Redis URL
+    # keeps live counters there and flushes them to the row at this interval.
+    IMPORT_PROGRESS_URL = os.getenv("IMPORT_PROGRESS_URL", "database")
+    IMPORT_PROGRESS_FLUSH_SECONDS = float(os.getenv("IMPORT_PROGRESS_FLUSH_SECONDS", "10"))
+    PRODUCT_COUNT_CACHE_SECONDS = int(os.getenv("PRODUCT_COUNT_CACHE_SECONDS", "30"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    BULK_UPSERT_INLINE_LIMIT = int(os.getenv("BULK_UPSERT_INLINE_LIMIT", str(8 * 1024 * 1024)))
+    WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "5"))
+    WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "8"))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "6"))
+    WEBHOOK_RETRY_BASE = int(os.getenv("WEBHOOK_RETRY_BASE", "10"))
+    WEBHOOK_RETRY_MAX = int(os.getenv("WEBHOOK_RETRY_MAX", "3600"))
+    WEBHOOK_BREAKER_THRESHOLD = int(os.getenv("WEBHOOK_BREAKER_THRESHOLD", "5"))
+    WEBHOOK_BREAKER_COOLDOWN = int(os.getenv("WEBHOOK_BREAKER_COOLDOWN", "60"))
+    WEBHOOK_PROGRESS_INTERVAL = int(os.getenv("WEBHOOK_PROGRESS_INTERVAL", "10"))
+    WEBHOOK_CHANGES_MAX_SKUS = int(os.getenv("WEBHOOK_CHANGES_MAX_SKUS", "1000"))
+    # With eager Celery there is no webhooks worker; deliveries are sent from
+    # a background thread of the process that recorded them.
+    WEBHOOK_EAGER_DELIVERY = os.getenv("WEBHOOK_EAGER_DELIVERY", "true").lower() == "true"
 
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
+    # Where workers push job progress for /api/jobs/<id>/events and long
+    # polls; the broker's Redis by default, so web processes hear workers.
+    # memory:// only reaches listeners in the same process (eager mode).
+    JOB_EVENTS_URL = os.getenv("JOB_EVENTS_URL", CELERY_BROKER_URL)
     CELERY = {
         "task_track_started": True,
         "task_serializer": "json",
         "result_serializer": "json",
         "accept_content": ["json"],
+        # Webhook sends wait on other people's servers; a separate queue keeps
+        # them from occupying the workers that run imports.
+        "task_routes": {
+            "deliver_webhooks": {"queue": "webhooks"},
+            "retry_webhook_deliveries": {"queue": "webhooks"},
+        },
+        "beat_schedule": {
+            "requeue-stale-imports": {"task": "requeue_stale_imports", "schedule": 300.0},
+            "expire-import-previews": {"task": "expire_import_previews", "schedule": 3600.0},
+            "retry-webhook-deliveries": {"task": "retry_webhook_deliveries", "schedule": 60.0},
+        },
     }
 
 
@@ -33,6 +80,8 @@ class ProductionConfig(BaseConfig):
 class TestingConfig(BaseConfig):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+    JOB_EVENTS_URL = "memory://"
+    WEBHOOK_EAGER_DELIVERY = False
 
 
 def get_config(config_name: str | None):
@@ -1,6 +1,18 @@
 from .product import Product
 from .webhook import Webhook
 from .import_job import ImportJob
+from .upload_session import UploadSession
+from .delete_job import DeleteJob
+from .import_staging import ImportStaging
+from .webhook_delivery import WebhookDelivery
 
-__all__ = ["Product", "Webhook", "ImportJob"]
+__all__ = [
+    "Product",
+    "Webhook",
+    "WebhookDelivery",
+    "ImportJob",
+    "UploadSession",
+    "DeleteJob",
+    "ImportStaging",
+]
 
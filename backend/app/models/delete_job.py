@@ -0,0 +1,51 @@
+from datetime import datetime
+import uuid
+
+from ..extensions import db
+
+
+class DeleteJob(db.Model):
+    __tablename__ = "delete_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(36), unique=True, default=lambda: str(uuid.uuid4()))
+    status = db.Column(db.String(32), default="queued", nullable=False)
+    filters = db.Column(db.JSON, nullable=True)
+    skus = db.Column(db.JSON, nullable=True)
+    strategy = db.Column(db.String(16), nullable=True)
+    total_rows = db.Column(db.Integer, nullable=True)
+    deleted_rows = db.Column(db.Integer, default=0, nullable=False)
+    chunks_done = db.Column(db.Integer, default=0, nullable=False)
+    error_message = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "filters": self.filters,
+            "sku_count": len(self.skus) if self.skus is not None else None,
+            "strategy": self.strategy,
+            "total_rows": self.total_rows,
+            "deleted_rows": self.deleted_rows,
+            "chunks_done": self.chunks_done,
+            "progress": self.progress(),
+            "error_message": self.error_message,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+    def progress(self) -> float | None:
+        if self.status == "completed":
+            return 100.0
+        if not self.total_rows:
+            return None
+        # total_rows may be a planner estimate, so never report past 100%.
+        return round(min(1.0, self.deleted_rows / self.total_rows) * 100, 1)
@@ -1,8 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 from ..extensions import db
 
+# "applying" is a previewed job merging its staged rows into products.
+RUNNING_STATUSES = ("processing", "applying")
+
 
 class ImportJob(db.Model):
     __tablename__ = "import_jobs"
@@ -14,12 +17,45 @@ class ImportJob(db.Model):
     status = db.Column(db.String(32), default="queued", nullable=False)
     total_rows = db.Column(db.Integer, nullable=True)
     processed_rows = db.Column(db.Integer, nullable=True)
+    rows_inserted = db.Column(db.Integer, default=0, nullable=False)
+    rows_updated = db.Column(db.Integer, default=0, nullable=False)
+    rows_unchanged = db.Column(db.Integer, default=0, nullable=False)
+    rows_collapsed = db.Column(db.Integer, default=0, nullable=False)
+    rows_rejected = db.Column(db.Integer, default=0, nullable=False)
+    bytes_total = db.Column(db.BigInteger, nullable=True)
+    bytes_processed = db.Column(db.BigInteger, nullable=True)
     error_message = db.Column(db.Text, nullable=True)
+    load_mode = db.Column(db.String(16), default="insert", nullable=False)
+    sync_mode = db.Column(db.String(16), nullable=True)
+    # A preview parses into import_staging and stops at "previewed"; applying
+    # it later merges the staged rows without reading the file again.
+    preview = db.Column(db.Boolean, default=False, nullable=False)
+    error_policy = db.Column(db.String(16), default="fail_fast", nullable=False)
+    max_errors = db.Column(db.Integer, nullable=True)
+    reject_file_path = db.Column(db.String(512), nullable=True)
+    chunk_count = db.Column(db.Integer, nullable=True)
+    column_mapping = db.Column(db.JSON, nullable=True)
+    content_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    duplicate_of = db.Column(db.String(36), nullable=True)
+    stats = db.Column(db.JSON, nullable=True)
+    checkpoint_offset = db.Column(db.BigInteger, nullable=True)
+    checkpoint_row = db.Column(db.BigInteger, nullable=True)
+    checkpoint_batch = db.Column(db.Integer, default=0, nullable=False)
+    # Size of the reject file as of the checkpoint; a resume truncates to it.
+    checkpoint_rejects_bytes = db.Column(db.BigInteger, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Counters as of started_at: a resumed run's rate covers only its own work.
+    rows_at_start = db.Column(db.BigInteger, nullable=True)
+    bytes_at_start = db.Column(db.BigInteger, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    __table_args__ = (db.Index("ix_import_jobs_status_heartbeat_at", "status", "heartbeat_at"),)
+
     def to_dict(self):
         return {
             "job_id": self.job_id,
@@ -28,8 +64,70 @@ class ImportJob(db.Model):
             "status": self.status,
             "total_rows": self.total_rows,
             "processed_rows": self.processed_rows,
+            "rows_inserted": self.rows_inserted,
+            "rows_updated": self.rows_updated,
+            "rows_unchanged": self.rows_unchanged,
+            "rows_collapsed": self.rows_collapsed,
+            "rows_rejected": self.rows_rejected,
+            "bytes_total": self.bytes_total,
+            "bytes_processed": self.bytes_processed,
+            "progress": self.progress(),
+            "eta_seconds": self.eta_seconds(),
+            "rows_per_second": self.rows_per_second(),
             "error_message": self.error_message,
+            "load_mode": self.load_mode,
+            "sync_mode": self.sync_mode,
+            "preview": self.preview,
+            "error_policy": self.error_policy,
+            "max_errors": self.max_errors,
+            "chunk_count": self.chunk_count,
+            "column_mapping": self.column_mapping,
+            "content_sha256": self.content_sha256,
+            "duplicate_of": self.duplicate_of,
+            "stats": self.stats,
+            "checkpoint": {
+                "offset": self.checkpoint_offset,
+                "row": self.checkpoint_row,
+                "batch": self.checkpoint_batch,
+            },
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
 
+    def progress(self) -> float | None:
+        if not self.bytes_total:
+            return None
+        return round(min(1.0, (self.bytes_processed or 0) / self.bytes_total) * 100, 1)
+
+    def is_stale(self, stale_after: int) -> bool:
+        if self.status not in RUNNING_STATUSES or not self.heartbeat_at:
+            return False
+        return datetime.utcnow() - self.heartbeat_at > timedelta(seconds=stale_after)
+
+    def eta_seconds(self) -> int | None:
+        if self.status not in RUNNING_STATUSES or not self.started_at:
+            return None
+        done = (self.bytes_processed or 0) - (self.bytes_at_start or 0)
+        if done <= 0:
+            return None
+        elapsed = (datetime.utcnow() - self.started_at).total_seconds()
+        remaining = max(0, (self.bytes_total or 0) - self.bytes_processed)
+        return int(elapsed * remaining / done)
+
+    def rows_per_second(self) -> float | None:
+        """Throughput of the current (or last) run, from ``started_at`` to now or ``finished_at``."""
+        end = datetime.utcnow() if self.status in RUNNING_STATUSES else self.finished_at
+        if not self.started_at or not end:
+            return None
+        # An apply merges staged rows; it parses none of its own.
+        if self.preview and self.status in ("applying", "completed"):
+            rows = (self.rows_inserted or 0) + (self.rows_updated or 0) + (self.rows_unchanged or 0)
+        else:
+            rows = self.processed_rows or 0
+        rows -= self.rows_at_start or 0
+        elapsed = (end - self.started_at).total_seconds()
+        return round(rows / elapsed, 1) if rows > 0 and elapsed > 0 else None
+
@@ -0,0 +1,30 @@
+from ..extensions import db
+
+
+class ImportStaging(db.Model):
+    """
+    Rows parsed by a preview import, held until the preview is applied. The
+    columns mirror ``ROW_COLUMNS``; ``import_job_id`` scopes them to their
+    job, which keeps one row per SKU (the last one in the file).
+    """
+
+    __tablename__ = "import_staging"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    sku = db.Column(db.String(128), nullable=False)
+    sku_normalized = db.Column(db.String(128), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    price = db.Column(db.Numeric(12, 2), nullable=True)
+    is_active = db.Column(db.Boolean, nullable=False)
+    row_hash = db.Column(db.String(32), nullable=True)
+    import_job_id = db.Column(db.String(36), nullable=False)
+    import_seq = db.Column(db.BigInteger, nullable=True)
+    sync_generation = db.Column(db.Integer, nullable=True)
+
+    # The unique key serves the staging upsert and the diff join; the id
+    # index lets apply walk one job's rows in primary-key slices.
+    __table_args__ = (
+        db.UniqueConstraint("import_job_id", "sku_normalized", name="uq_import_staging_job_sku"),
+        db.Index("ix_import_staging_import_job_id_id", "import_job_id", "id"),
+    )
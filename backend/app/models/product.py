@@ -1,7 +1,26 @@
+import hashlib
 from datetime import datetime
 
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
 from ..extensions import db
 
+SEARCH_CONFIG = "pg_catalog.english"
+
+# Postgres-only search structures: trigram indexes serve the substring filters
+# on SKU and name, and a trigger keeps ``search_vector`` in step with the
+# description for every write path (ORM, upsert and COPY merge alike).
+SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_sku_normalized_trgm "
+    "ON products USING gin (sku_normalized gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+    "CREATE TRIGGER products_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF description ON products FOR EACH ROW "
+    f"EXECUTE FUNCTION tsvector_update_trigger(search_vector, '{SEARCH_CONFIG}', description)",
+)
+
 
 class Product(db.Model):
     __tablename__ = "products"
@@ -13,12 +32,26 @@ class Product(db.Model):
     description = db.Column(db.Text, nullable=True)
     price = db.Column(db.Numeric(12, 2), nullable=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
+    row_hash = db.Column(db.String(32), nullable=True)
+    import_job_id = db.Column(db.String(36), nullable=True)
+    import_seq = db.Column(db.BigInteger, nullable=True)
+    # Id of the last sync-mode import that listed this SKU; see _retire_missing_products.
+    sync_generation = db.Column(db.Integer, nullable=True)
+    # Filled by a trigger on Postgres; stays empty on SQLite, where search falls back to LIKE.
+    search_vector = db.deferred(
+        db.Column(db.Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
-    __table_args__ = ()
+    # Keyset pagination walks (created_at, id) backwards; the is_active
+    # variant serves the status filter without a sort.
+    __table_args__ = (
+        db.Index("ix_products_created_at_id", "created_at", "id"),
+        db.Index("ix_products_is_active_created_at_id", "is_active", "created_at", "id"),
+    )
 
     def to_dict(self):
         return {
@@ -43,3 +76,30 @@ class Product(db.Model):
         self.sku = value.strip()
         self.sku_normalized = normalized
 
+    @staticmethod
+    def compute_row_hash(sku, name, description, price, is_active) -> str:
+        """Fingerprint of the imported fields, used to skip no-op upserts."""
+        content = "\x1f".join(
+            (
+                sku,
+                name or "",
+                description or "",
+                "" if price is None else str(price),
+                "1" if is_active else "0",
+            )
+        )
+        return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+@db.event.listens_for(Product, "before_insert")
+@db.event.listens_for(Product, "before_update")
+def _refresh_row_hash(mapper, connection, target: Product):
+    target.row_hash = Product.compute_row_hash(
+        target.sku, target.name, target.description, target.price, target.is_active
+    )
+
+
+for _statement in SEARCH_DDL:
+    db.event.listen(
+        Product.__table__, "after_create", db.DDL(_statement).execute_if(dialect="postgresql")
+    )
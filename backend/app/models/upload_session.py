@@ -0,0 +1,36 @@
+from datetime import datetime
+import uuid
+
+from ..extensions import db
+
+
+class UploadSession(db.Model):
+    __tablename__ = "upload_sessions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(36), unique=True, default=lambda: str(uuid.uuid4()))
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(512), nullable=False)
+    expected_size = db.Column(db.BigInteger, nullable=True)
+    received_bytes = db.Column(db.BigInteger, default=0, nullable=False)
+    last_chunk = db.Column(db.Integer, nullable=True)
+    options = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(32), default="open", nullable=False)
+    job_id = db.Column(db.String(36), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "filename": self.filename,
+            "expected_size": self.expected_size,
+            "offset": self.received_bytes,
+            "last_chunk": self.last_chunk,
+            "status": self.status,
+            "job_id": self.job_id,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
@@ -11,8 +11,14 @@ class Webhook(db.Model):
     url = db.Column(db.String(512), nullable=False)
     event_type = db.Column(db.String(64), nullable=False)
     is_enabled = db.Column(db.Boolean, default=True, nullable=False)
+    # Send bodies with Content-Encoding: gzip, for receivers that accept it.
+    gzip = db.Column(db.Boolean, default=False, nullable=False)
     last_response_code = db.Column(db.Integer, nullable=True)
     last_response_ms = db.Column(db.Integer, nullable=True)
+    # Circuit breaker: after enough failures in a row, deliveries to this
+    # endpoint wait until circuit_open_until instead of being attempted.
+    consecutive_failures = db.Column(db.Integer, default=0, nullable=False)
+    circuit_open_until = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -25,8 +31,13 @@ class Webhook(db.Model):
             "url": self.url,
             "event_type": self.event_type,
             "is_enabled": self.is_enabled,
+            "gzip": self.gzip,
             "last_response_code": self.last_response_code,
             "last_response_ms": self.last_response_ms,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_open_until": (
+                self.circuit_open_until.isoformat() if self.circuit_open_until else None
+            ),
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from ..extensions import db
+
+
+class WebhookDelivery(db.Model):
+    """One event sent (or still to be sent) to one webhook, with its latest attempt."""
+
+    __tablename__ = "webhook_deliveries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    webhook_id = db.Column(
+        db.Integer, db.ForeignKey("webhooks.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    event_type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    # pending -> sending -> delivered, or back to retrying until attempts run out (failed).
+    status = db.Column(db.String(16), default="pending", nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    response_code = db.Column(db.Integer, nullable=True)
+    latency_ms = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        db.Index("ix_webhook_deliveries_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "webhook_id": self.webhook_id,
+            "event_type": self.event_type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "response_code": self.response_code,
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "delivered_at": self.delivered_at.isoformat() if self.delivered_at else None,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
@@ -0,0 +1,105 @@
+# PostgreSQL refuses statements with more bind parameters than this.
+MAX_BIND_PARAMETERS = 65535
+MIN_BATCH_ROWS = 100
+# Per-batch entries kept in a job's stats; the summary covers every batch.
+_HISTORY_LIMIT = 500
+
+
+class BatchSizer:
+    """
+    Chooses how many rows go into the next batch from how the previous ones
+    went. Each batch is sized to take about ``target_seconds`` to write at
+    the throughput seen so far (smoothed), moving by at most a factor of two
+    per batch. The size never exceeds what fits in one statement's bind
+    parameters (``params_per_row``; ``None`` for COPY or INSERT ... SELECT)
+    or in ``max_bytes`` at the observed bytes per row.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        target_seconds: float,
+        max_bytes: int | None = None,
+        params_per_row: int | None = None,
+    ):
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.param_limit = MAX_BIND_PARAMETERS // params_per_row if params_per_row else None
+        self._min_rows = min(MIN_BATCH_ROWS, initial)
+        self._rows_per_second = None
+        self._bytes_per_row = None
+        self._rows = 0
+        self._seconds = 0.0
+        self._batches = 0
+        self._max_latency = 0.0
+        self._history = []
+        self.initial = self.size = self._clamp(initial)
+
+    def record(self, rows: int, seconds: float, nbytes: int = 0):
+        """Feed back one written batch: its rows, write latency and source bytes."""
+        if rows <= 0:
+            return
+        self._rows += rows
+        self._seconds += seconds
+        self._batches += 1
+        self._max_latency = max(self._max_latency, seconds)
+        if len(self._history) < _HISTORY_LIMIT:
+            self._history.append([rows, round(seconds * 1000, 1)])
+
+        self._rows_per_second = _smooth(self._rows_per_second, rows / max(seconds, 1e-3))
+        if nbytes:
+            self._bytes_per_row = _smooth(self._bytes_per_row, nbytes / rows)
+        wanted = self._rows_per_second * self.target_seconds
+        self.size = self._clamp(int(min(max(wanted, self.size / 2), self.size * 2)))
+
+    def stats(self) -> dict:
+        return {
+            "initial_size": self.initial,
+            "final_size": self.size,
+            "param_limit": self.param_limit,
+            "target_seconds": self.target_seconds,
+            "batches": self._batches,
+            "rows": self._rows,
+            "seconds": round(self._seconds, 3),
+            "rows_per_second": round(self._rows / self._seconds, 1) if self._seconds else None,
+            "latency_ms_avg": round(self._seconds * 1000 / self._batches, 1) if self._batches else None,
+            "latency_ms_max": round(self._max_latency * 1000, 1),
+            # [rows, write latency in ms] per batch, in order.
+            "history": self._history,
+        }
+
+    def _clamp(self, rows: int) -> int:
+        limits = [rows]
+        if self.param_limit:
+            limits.append(self.param_limit)
+        if self.max_bytes and self._bytes_per_row:
+            limits.append(int(self.max_bytes / self._bytes_per_row))
+        return max(self._min_rows, min(limits))
+
+
+def merge_batch_stats(stats: list[dict]) -> dict:
+    """Combine the sizing statistics of chunk tasks that loaded one job side by side."""
+    stats = [entry for entry in stats if entry]
+    if not stats:
+        return {}
+
+    rows = sum(entry["rows"] for entry in stats)
+    seconds = sum(entry["seconds"] for entry in stats)
+    batches = sum(entry["batches"] for entry in stats)
+    return {
+        "initial_size": stats[0]["initial_size"],
+        "final_size": max(entry["final_size"] for entry in stats),
+        "param_limit": stats[0]["param_limit"],
+        "target_seconds": stats[0]["target_seconds"],
+        "batches": batches,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        "latency_ms_avg": round(seconds * 1000 / batches, 1) if batches else None,
+        "latency_ms_max": max(entry["latency_ms_max"] for entry in stats),
+        "history": [item for entry in stats for item in entry["history"]][:_HISTORY_LIMIT],
+    }
+
+
+def _smooth(current: float | None, sample: float) -> float:
+    return sample if current is None else current * 0.5 + sample * 0.5
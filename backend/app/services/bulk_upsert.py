@@ -0,0 +1,173 @@
+import csv
+import json
+import time
+from typing import Iterable, Iterator
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import db
+from ..tasks.import_csv import build_row, check_product_fields, upsert_rows
+from .batch_sizer import BatchSizer
+from .product_export import CSV_COLUMNS
+from .webhook_events import emit_product_changes
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def iter_records(stream, content_type: str | None) -> Iterator[object]:
+    """
+    Yield the records of a bulk-upsert body: one per line for NDJSON (read
+    straight from ``stream``), or the items of a JSON array. Lines that are
+    not valid JSON are yielded as ``ValueError`` so they count as row errors.
+    """
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    if mimetype in NDJSON_TYPES:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ValueError(f"Invalid JSON: {exc}")
+        return
+
+    try:
+        records = json.load(stream)
+    except ValueError as exc:
+        raise ValueError(f"Body must be a JSON array or NDJSON: {exc}") from exc
+    if not isinstance(records, list):
+        raise ValueError("Body must be a JSON array of products")
+    yield from records
+
+
+def clean_record(record) -> dict:
+    """
+    Validate one product record and return its field values. Missing fields
+    take the same defaults as an empty CSV column, because an upsert replaces
+    the whole product.
+    """
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    sku = record.get("sku")
+    if not isinstance(sku, str) or not sku.strip():
+        raise ValueError("SKU is required")
+
+    name = record.get("name") or ""
+    if not isinstance(name, str):
+        raise ValueError("name must be a string")
+    description = record.get("description") or None
+    if description is not None and not isinstance(description, str):
+        raise ValueError("description must be a string")
+
+    price = record.get("price")
+    if isinstance(price, (bool, dict, list)):
+        raise ValueError("price must be a number")
+    price = check_product_fields(sku.strip(), name, price)
+
+    is_active = record.get("is_active")
+    if is_active is None or is_active == "":
+        is_active = True
+    elif isinstance(is_active, str):
+        is_active = is_active.strip().lower() in {"1", "true", "yes", "active"}
+
+    return {
+        "sku": sku.strip(),
+        "name": name,
+        "description": description,
+        "price": price,
+        "is_active": bool(is_active),
+    }
+
+
+def apply_records(records: Iterable, batch_id: str, sizer: BatchSizer) -> dict:
+    """
+    Upsert ``records`` in batches sized by ``sizer``, committing each batch on
+    its own. Invalid records are skipped and reported by index; a batch the
+    database rejects is rolled back and reported without stopping the rest.
+    ``batch_id`` stamps the rows, so within one request the last record for
+    a SKU wins, both inside a batch and across batches.
+    """
+    batches = []
+    errors = []
+    pending = []
+
+    def flush():
+        number = len(batches) + 1
+        started = time.perf_counter()
+        try:
+            inserted_skus, updated_skus, collapsed = upsert_rows(pending)
+            db.session.commit()
+            sizer.record(len(pending), time.perf_counter() - started)
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            error = str(getattr(exc, "orig", None) or exc)
+            batches.append({"batch": number, "rows": len(pending), "error": error})
+        else:
+            emit_product_changes(inserted_skus, updated_skus, source={"bulk_upsert": batch_id})
+            inserted, updated = len(inserted_skus), len(updated_skus)
+            batches.append(
+                {
+                    "batch": number,
+                    "rows": len(pending),
+                    "inserted": inserted,
+                    "updated": updated,
+                    "unchanged": len(pending) - inserted - updated - collapsed,
+                    "collapsed": collapsed,
+                }
+            )
+        pending.clear()
+
+    for index, record in enumerate(records):
+        try:
+            fields = clean_record(record)
+        except ValueError as exc:
+            errors.append({"index": index, "error": str(exc)})
+            continue
+        pending.append(build_row(job_id=batch_id, seq=index, **fields))
+        if len(pending) >= sizer.size:
+            flush()
+    if pending:
+        flush()
+
+    return {
+        "batches": batches,
+        "errors": errors,
+        "inserted": sum(batch.get("inserted", 0) for batch in batches),
+        "updated": sum(batch.get("updated", 0) for batch in batches),
+        "unchanged": sum(batch.get("unchanged", 0) for batch in batches),
+        "collapsed": sum(batch.get("collapsed", 0) for batch in batches),
+        "failed_batches": sum(1 for batch in batches if "error" in batch),
+        "batching": sizer.stats(),
+    }
+
+
+def spool_records(records: Iterable, path) -> tuple[int, list[dict]]:
+    """
+    Write the valid ``records`` to ``path`` as an import CSV, so a background
+    ``ImportJob`` can load them. Returns the row count and the skipped records.
+    """
+    rows = 0
+    errors = []
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        for index, record in enumerate(records):
+            try:
+                fields = clean_record(record)
+            except ValueError as exc:
+                errors.append({"index": index, "error": str(exc)})
+                continue
+            writer.writerow(
+                (
+                    fields["sku"],
+                    fields["name"],
+                    fields["description"] or "",
+                    "" if fields["price"] is None else str(fields["price"]),
+                    "true" if fields["is_active"] else "false",
+                )
+            )
+            rows += 1
+    return rows, errors
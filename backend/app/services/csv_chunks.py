@@ -0,0 +1,212 @@
+import csv
+import gzip
+import io
+import os
+import zipfile
+
+COMPRESSED_EXTENSIONS = (".csv.gz", ".csv.zst", ".zip")
+SUPPORTED_EXTENSIONS = (".csv",) + COMPRESSED_EXTENSIONS
+
+
+def plan_chunks(path, count: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Split a CSV file into at most ``count`` byte ranges that start and end on
+    record boundaries. Returns the header fieldnames and the ranges, which
+    together cover every record after the header.
+    """
+    size = os.path.getsize(path)
+    targets = [0] + [size * index // count for index in range(1, count)]
+    boundaries = _record_boundaries(path, targets)
+    if not boundaries:
+        return [], []
+
+    header_end = boundaries[0]
+    edges = sorted({header_end, size, *(b for b in boundaries[1:] if header_end < b < size)})
+    return _parse_header(path, header_end), [(start, end) for start, end in zip(edges, edges[1:])]
+
+
+def read_header(path) -> tuple[list[str], int]:
+    """Return the header fieldnames and the (decompressed) offset of the first record."""
+    if is_compressed(path):
+        with open_csv(path) as handle:
+            return next(csv.reader(handle), []), handle.offset
+
+    boundaries = _record_boundaries(path, [0])
+    header_end = boundaries[0] if boundaries else os.path.getsize(path)
+    return _parse_header(path, header_end), header_end
+
+
+def is_supported_upload(filename: str) -> bool:
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def is_compressed(path) -> bool:
+    return str(path).lower().endswith(COMPRESSED_EXTENSIONS)
+
+
+def open_chunk(path, start: int, end: int) -> "ChunkReader":
+    """Open the byte range ``[start, end)`` of a plain CSV file as decoded lines for ``csv.reader``."""
+    raw = _ByteRange(open(path, "rb", buffering=0), start, end)
+    return ChunkReader(io.BufferedReader(raw), start)
+
+
+def open_csv(path, start: int = 0) -> "ChunkReader":
+    """
+    Open a plain or compressed CSV upload from ``start`` (an offset in the
+    decompressed stream) to the end. Compressed files are decoded on the fly;
+    ``consumed()`` reports bytes of the stored file read so far, so progress
+    can be measured against its on-disk size.
+    """
+    size = os.path.getsize(path)
+    if not is_compressed(path):
+        return open_chunk(path, start, size)
+
+    name = str(path).lower()
+    if name.endswith(".zip"):
+        archive = zipfile.ZipFile(path)
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        if len(entries) != 1:
+            archive.close()
+            raise ValueError("ZIP uploads must contain exactly one CSV file")
+        entry = entries[0]
+        stream = _ClosingStream(archive.open(entry), archive)
+        ratio = entry.compress_size / entry.file_size if entry.file_size else 1
+        reader = ChunkReader(stream, 0, progress=lambda offset: int(offset * ratio))
+    else:
+        raw = _ByteRange(open(path, "rb", buffering=0), 0, size)
+        compressed = io.BufferedReader(raw)
+        if name.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=compressed)
+        else:
+            stream = io.BufferedReader(_zstd_reader(compressed))
+        stream = _ClosingStream(stream, compressed)
+        reader = ChunkReader(stream, 0, progress=lambda offset: raw.consumed())
+
+    # Compressed streams cannot seek, so a resume decodes and skips the lines
+    # before ``start``; checkpoints always fall on line boundaries.
+    while reader.offset < start:
+        line = stream.readline()
+        if not line:
+            break
+        reader.offset += len(line)
+    return reader
+
+
+class ChunkReader:
+    """
+    Iterates the lines of a binary stream, keeping ``offset`` at the position
+    just past the last line handed out. ``csv.reader`` pulls lines only as far
+    as the record it is building, so after each row ``offset`` is the exact
+    position where the next record starts.
+    """
+
+    def __init__(self, stream, offset: int, progress=None):
+        self._stream = stream
+        self._start = offset
+        self._progress = progress
+        self.offset = offset
+
+    def consumed(self) -> int:
+        """Bytes of the stored file read so far; by default the bytes handed out."""
+        if self._progress:
+            return self._progress(self.offset)
+        return self.offset - self._start
+
+    def __iter__(self):
+        for line in self._stream:
+            self.offset += len(line)
+            yield line.decode("utf-8")
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ClosingStream(io.BufferedIOBase):
+    """Line-iterable wrapper that also closes the container a stream was opened from."""
+
+    def __init__(self, stream, container):
+        self._stream = stream
+        self._container = container
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def readline(self, size=-1):
+        return self._stream.readline(size)
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def close(self):
+        self._stream.close()
+        self._container.close()
+        super().close()
+
+
+def _zstd_reader(compressed):
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ValueError("zstd uploads require the zstandard package") from exc
+    return zstandard.ZstdDecompressor().stream_reader(compressed)
+
+
+def _parse_header(path, header_end: int) -> list[str]:
+    with open(path, "rb") as handle:
+        header = handle.read(header_end).decode("utf-8")
+    return next(csv.reader(io.StringIO(header, newline="")), [])
+
+
+def _record_boundaries(path, targets: list[int]) -> list[int]:
+    # Returns, for each target, the offset where the first record ending past
+    # it ends. Records are found with the CSV parser itself: a stray quote in
+    # an unquoted field (``TV 55" screen``) or a newline inside a quoted
+    # description must not be mistaken for a record boundary.
+    pending = iter(sorted(targets))
+    target = next(pending, None)
+    boundaries = []
+
+    with open_chunk(path, 0, os.path.getsize(path)) as handle:
+        for _ in csv.reader(handle):
+            if target is None:
+                break
+            if handle.offset > target:
+                boundaries.append(handle.offset)
+                while target is not None and target < handle.offset:
+                    target = next(pending, None)
+
+    return boundaries
+
+
+class _ByteRange(io.RawIOBase):
+    def __init__(self, raw, start: int, end: int):
+        raw.seek(start)
+        self._raw = raw
+        self._remaining = end - start
+        self._length = end - start
+
+    def consumed(self) -> int:
+        return self._length - self._remaining
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        read = self._raw.readinto(memoryview(buffer)[: self._remaining])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._raw.close()
+        super().close()
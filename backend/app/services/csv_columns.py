@@ -0,0 +1,45 @@
+FIELDS = ("sku", "name", "description", "price", "is_active")
+
+DEFAULT_ALIASES = {
+    "sku": ("sku",),
+    "name": ("name",),
+    "description": ("description",),
+    "price": ("price",),
+    "is_active": ("is_active", "active"),
+}
+
+
+def resolve_columns(header: list[str], column_mapping: dict | None = None) -> dict[str, int | None]:
+    """
+    Map each product field to its column index in ``header``, or ``None`` when
+    the file has no such column. Header names match case-insensitively;
+    ``column_mapping`` entries (a header name or list of names per field)
+    replace the default aliases for that field.
+    """
+    positions = {}
+    for index, title in enumerate(header):
+        positions.setdefault(title.strip().lower(), index)
+
+    resolved = {}
+    for field in FIELDS:
+        candidates = (column_mapping or {}).get(field) or DEFAULT_ALIASES[field]
+        if isinstance(candidates, str):
+            candidates = (candidates,)
+        resolved[field] = next(
+            (positions[name.strip().lower()] for name in candidates if name.strip().lower() in positions),
+            None,
+        )
+    return resolved
+
+
+def validate_mapping(column_mapping) -> str | None:
+    if not isinstance(column_mapping, dict):
+        return "column_mapping must be an object of field -> header name(s)"
+    for field, names in column_mapping.items():
+        if field not in FIELDS:
+            return f"Unknown field in column_mapping: {field}"
+        if isinstance(names, str):
+            continue
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return f"column_mapping.{field} must be a header name or list of names"
+    return None
@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from sqlalchemy import and_, case, exists, func, select
+
+from ..extensions import db
+from ..models import ImportJob, ImportStaging, Product
+
+PREVIEW_SAMPLE_SIZE = 20
+_COMPARED_FIELDS = ("sku", "name", "description", "price", "is_active")
+
+
+def summarize_preview(job: ImportJob, sample_size: int = PREVIEW_SAMPLE_SIZE) -> dict:
+    """
+    Diff the rows staged for ``job`` against ``products``: how many would be
+    inserted, updated or left unchanged (and, for a sync, retired), plus a
+    sample of the inserts and updates. Every figure comes from a set-based
+    query joining ``import_staging`` to ``products`` on ``sku_normalized``,
+    with ``row_hash`` telling an update from a no-op as the upsert does.
+    """
+    is_new = Product.id.is_(None)
+    is_changed = and_(
+        Product.id.isnot(None), Product.row_hash.is_distinct_from(ImportStaging.row_hash)
+    )
+
+    staged, inserts, updates = db.session.execute(
+        _staged_join(
+            job,
+            func.count(),
+            func.coalesce(func.sum(case((is_new, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_changed, 1), else_=0)), 0),
+        )
+    ).one()
+
+    staged_columns = [getattr(ImportStaging, field) for field in _COMPARED_FIELDS]
+    current_columns = [
+        getattr(Product, field).label(f"current_{field}") for field in _COMPARED_FIELDS
+    ]
+    insert_sample = db.session.execute(
+        _staged_join(job, *staged_columns)
+        .where(is_new)
+        .order_by(ImportStaging.import_seq)
+        .limit(sample_size)
+    ).all()
+    update_sample = db.session.execute(
+        _staged_join(job, *staged_columns, *current_columns)
+        .where(is_changed)
+        .order_by(ImportStaging.import_seq)
+        .limit(sample_size)
+    ).all()
+
+    return {
+        "insert": inserts,
+        "update": updates,
+        "unchanged": staged - inserts - updates,
+        "rejected": job.rows_rejected,
+        # Repeats in different batches only meet in staging, so everything
+        # parsed that did not end up as a staged row counts as collapsed.
+        "collapsed": (job.processed_rows or 0) - job.rows_rejected - staged,
+        "retire": _retire_count(job) if job.sync_mode else None,
+        "sample": {
+            "insert": [
+                {field: _jsonable(getattr(row, field)) for field in _COMPARED_FIELDS}
+                for row in insert_sample
+            ],
+            "update": [_changes(row) for row in update_sample],
+        },
+    }
+
+
+def discard_staged_rows(job: ImportJob) -> int:
+    return ImportStaging.query.filter_by(import_job_id=job.job_id).delete(
+        synchronize_session=False
+    )
+
+
+def _staged_join(job: ImportJob, *columns):
+    return (
+        select(*columns)
+        .select_from(ImportStaging)
+        .outerjoin(Product, Product.sku_normalized == ImportStaging.sku_normalized)
+        .where(ImportStaging.import_job_id == job.job_id)
+    )
+
+
+def _retire_count(job: ImportJob) -> int | None:
+    # Mirrors _retire_missing_products, which skips the sync when rows were rejected.
+    if job.rows_rejected:
+        return None
+    missing = Product.query.filter(
+        ~exists().where(
+            ImportStaging.import_job_id == job.job_id,
+            ImportStaging.sku_normalized == Product.sku_normalized,
+        ),
+        Product.created_at < job.created_at,
+    )
+    if job.sync_mode != "delete":
+        missing = missing.filter(Product.is_active.is_(True))
+    return missing.count()
+
+
+def _changes(row) -> dict:
+    changes = {}
+    for field in _COMPARED_FIELDS:
+        before, after = getattr(row, f"current_{field}"), getattr(row, field)
+        if before != after:
+            changes[field] = {"from": _jsonable(before), "to": _jsonable(after)}
+    return {"sku": row.sku, "changes": changes}
+
+
+def _jsonable(value):
+    return float(value) if isinstance(value, Decimal) else value
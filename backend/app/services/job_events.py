@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+from datetime import datetime
+
+import redis
+from flask import current_app
+
+from ..extensions import db
+from ..models import ImportJob
+from .progress_store import overlay_live_progress
+
+MAX_WAIT_SECONDS = 60
+# Statuses after which a job only changes again if someone acts on it.
+SETTLED_STATUSES = ("completed", "failed", "skipped_duplicate", "previewed", "expired")
+
+_EPOCH = datetime(1970, 1, 1)
+_STATE_TTL = 24 * 3600
+_MEMORY_LIMIT = 1000
+
+_backends: dict[str, object] = {}
+_backends_lock = threading.Lock()
+
+
+def job_version(job: ImportJob) -> int:
+    """
+    Version of a job's state: ``updated_at`` in microseconds. Every write to
+    the job bumps it, so the worker's pushes and a database read agree on it.
+    """
+    return int((job.updated_at - _EPOCH).total_seconds() * 1_000_000)
+
+
+def job_state(job: ImportJob) -> dict:
+    """The job as the API reports it: the row, with a running job's live counters laid over it."""
+    version = job_version(job)
+    live_version = overlay_live_progress(job)
+    state = job.to_dict()
+    state["stale"] = job.is_stale(current_app.config["IMPORT_STALE_AFTER"])
+    state["version"] = max(version, live_version or 0)
+    return state
+
+
+def publish_job(job: ImportJob):
+    """Push ``job``'s current state to anyone waiting on it. Call after committing."""
+    job_events().publish(job.job_id, job_state(job))
+
+
+def wait_for_job(job_id: str, since: int | None, timeout: float) -> dict | None:
+    """
+    Return the job's state once its version passes ``since``, waiting up to
+    ``timeout`` seconds for the worker to publish one. A job that already
+    moved on, or has settled and will not move, comes back at once. The
+    database is only read when the backend holds nothing for the job or the
+    wait runs out, so a missed publish still shows up on the next wait.
+    ``None`` means no such job.
+    """
+    events = job_events()
+    state = events.latest(job_id) or read_job_state(job_id)
+    if state is None or _is_newer(state, since) or state["status"] in SETTLED_STATUSES:
+        return state
+    return events.wait(job_id, since, min(timeout, MAX_WAIT_SECONDS)) or read_job_state(job_id)
+
+
+def read_job_state(job_id: str) -> dict | None:
+    # A stream holds its session open between reads: refresh the row instead
+    # of trusting the identity map, and hand the connection back afterwards.
+    job = ImportJob.query.filter_by(job_id=job_id).populate_existing().first()
+    state = job_state(job) if job else None
+    db.session.close()
+    return state
+
+
+def job_events():
+    """The event backend named by ``JOB_EVENTS_URL``: Redis pub/sub, or in-process (``memory://``)."""
+    url = current_app.config["JOB_EVENTS_URL"]
+    with _backends_lock:
+        backend = _backends.get(url)
+        if backend is None:
+            if url.startswith(("redis://", "rediss://", "unix://")):
+                backend = RedisJobEvents(url)
+            else:
+                backend = MemoryJobEvents()
+            _backends[url] = backend
+    return backend
+
+
+class MemoryJobEvents:
+    """
+    Keeps the latest state per job in this process and wakes waiters with a
+    condition variable. Only sees jobs run in the same process (tests, eager
+    mode); across processes use Redis.
+    """
+
+    def __init__(self):
+        self._states: dict[str, dict] = {}
+        self._changed = threading.Condition()
+
+    def publish(self, job_id: str, state: dict):
+        with self._changed:
+            current = self._states.pop(job_id, None)
+            if current is not None and current["version"] > state["version"]:
+                state = current
+            self._states[job_id] = state
+            if len(self._states) > _MEMORY_LIMIT:
+                self._states.pop(next(iter(self._states)))
+            self._changed.notify_all()
+
+    def latest(self, job_id: str) -> dict | None:
+        return self._states.get(job_id)
+
+    def wait(self, job_id: str, since: int | None, timeout: float) -> dict | None:
+        with self._changed:
+            self._changed.wait_for(lambda: _is_newer(self._states.get(job_id), since), timeout)
+            state = self._states.get(job_id)
+        return state if _is_newer(state, since) else None
+
+
+class RedisJobEvents:
+    """
+    Stores the latest state per job under a key and announces each update on
+    a per-job channel, so waiting requests in any web process wake up as soon
+    as the worker publishes.
+    """
+
+    def __init__(self, url: str):
+        self._redis = redis.Redis.from_url(url)
+
+    def publish(self, job_id: str, state: dict):
+        message = json.dumps(state)
+        try:
+            pipeline = self._redis.pipeline()
+            pipeline.set(_state_key(job_id), message, ex=_STATE_TTL)
+            pipeline.publish(_channel(job_id), message)
+            pipeline.execute()
+        except redis.RedisError:
+            # Progress pushes are best effort; listeners fall back to the database.
+            pass
+
+    def latest(self, job_id: str) -> dict | None:
+        try:
+            message = self._redis.get(_state_key(job_id))
+        except redis.RedisError:
+            return None
+        return json.loads(message) if message else None
+
+    def wait(self, job_id: str, since: int | None, timeout: float) -> dict | None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        deadline = time.monotonic() + timeout
+        try:
+            # Subscribe before checking the stored state, so an update landing
+            # in between is caught on the channel rather than missed.
+            pubsub.subscribe(_channel(job_id))
+            state = self.latest(job_id)
+            if _is_newer(state, since):
+                return state
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = pubsub.get_message(timeout=remaining)
+                if message is None:
+                    continue
+                state = json.loads(message["data"])
+                if _is_newer(state, since):
+                    return state
+            return None
+        except redis.RedisError:
+            # Wait out the timeout anyway: callers fall back to reading the
+            # row, and returning at once would turn their loops into a poll
+            # of the database for as long as Redis is down.
+            time.sleep(max(deadline - time.monotonic(), 0))
+            return None
+        finally:
+            pubsub.close()
+
+
+def _is_newer(state: dict | None, since: int | None) -> bool:
+    return state is not None and (since is None or state["version"] > since)
+
+
+def _state_key(job_id: str) -> str:
+    return f"import-job:{job_id}:state"
+
+
+def _channel(job_id: str) -> str:
+    return f"import-job:{job_id}:events"
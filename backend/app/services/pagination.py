@@ -0,0 +1,82 @@
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select, tuple_
+
+from ..extensions import db
+
+_COUNT_CACHE_LIMIT = 256
+_count_cache: dict[str, tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ``ValueError`` for anything it did not produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_page(query, model, cursor: str | None, per_page: int) -> tuple[list, str | None]:
+    """
+    Fetch the page after ``cursor`` in ``(created_at, id)`` descending order.
+    Seeking past the cursor keeps every page as cheap as the first, and one
+    extra row tells whether another page follows.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    rows = query.limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def approximate_count(query, cache_seconds: int) -> int:
+    """
+    Row count for ``query`` without a full ``COUNT(*)`` scan: the planner's
+    estimate on Postgres, otherwise an exact count cached for ``cache_seconds``.
+    """
+    statement = query.order_by(None).statement
+    if db.engine.dialect.name == "postgresql":
+        return _planner_estimate(statement)
+
+    compiled = statement.compile(db.engine)
+    key = f"{compiled}|{sorted(compiled.params.items())!r}"
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    count = db.session.execute(select(func.count()).select_from(statement.subquery())).scalar()
+    with _count_cache_lock:
+        if len(_count_cache) >= _COUNT_CACHE_LIMIT:
+            _count_cache.clear()
+        _count_cache[key] = (now + cache_seconds, count)
+    return count
+
+
+def _planner_estimate(statement) -> int:
+    compiled = statement.compile(db.engine)
+    result = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
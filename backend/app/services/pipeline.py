@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+_DONE = object()
+
+
+def run_pipeline(produce: Iterator, consume: Callable[[Any], None], depth: int) -> dict:
+    """
+    Iterate ``produce`` on a background thread and hand each item to ``consume``
+    on the calling thread through a queue of at most ``depth`` items. The
+    producer blocks when the queue is full, so memory stays bounded.
+
+    Exceptions from either side stop both and are re-raised here. Returns
+    queue depth and stall statistics.
+    """
+    ready = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    producer_stall = 0.0
+
+    def hand_off(item) -> bool:
+        nonlocal producer_stall
+        started = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            producer_stall += time.perf_counter() - started
+
+    def run_producer():
+        try:
+            for item in produce:
+                if not hand_off(item):
+                    return
+            hand_off(_DONE)
+        except BaseException as exc:
+            hand_off(exc)
+
+    producer = threading.Thread(target=run_producer, name="pipeline-producer", daemon=True)
+    producer.start()
+
+    items = 0
+    depth_total = 0
+    depth_max = 0
+    consumer_stall = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            item = ready.get()
+            consumer_stall += time.perf_counter() - started
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+
+            waiting = ready.qsize()
+            depth_total += waiting
+            depth_max = max(depth_max, waiting)
+            items += 1
+            consume(item)
+    finally:
+        stop.set()
+        producer.join()
+
+    return {
+        "batches": items,
+        "queue_capacity": ready.maxsize,
+        "queue_depth_max": depth_max,
+        "queue_depth_avg": round(depth_total / items, 2) if items else 0,
+        "producer_stall_seconds": round(producer_stall, 3),
+        "consumer_stall_seconds": round(consumer_stall, 3),
+    }
+
+
+def merge_pipeline_stats(stats: list[dict]) -> dict:
+    """Combine the statistics of pipelines that ran side by side (e.g. chunk tasks)."""
+    stats = [entry for entry in stats if entry]
+    if not stats:
+        return {}
+
+    batches = sum(entry["batches"] for entry in stats)
+    return {
+        "batches": batches,
+        "queue_capacity": max(entry["queue_capacity"] for entry in stats),
+        "queue_depth_max": max(entry["queue_depth_max"] for entry in stats),
+        "queue_depth_avg": (
+            round(sum(entry["queue_depth_avg"] * entry["batches"] for entry in stats) / batches, 2)
+            if batches
+            else 0
+        ),
+        "producer_stall_seconds": round(sum(entry["producer_stall_seconds"] for entry in stats), 3),
+        "consumer_stall_seconds": round(sum(entry["consumer_stall_seconds"] for entry in stats), 3),
+    }
@@ -0,0 +1,57 @@
+import csv
+import io
+import zlib
+from typing import Iterable, Iterator
+
+from ..extensions import db
+from ..models import Product
+from .product_fields import encode_json, project, serialize_rows
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# The columns ``import_products_job`` reads, so an exported file re-imports as-is.
+CSV_COLUMNS = ("sku", "name", "description", "price", "is_active")
+
+
+def export_chunks(query, export_format: str, fields: tuple[str, ...], batch_size: int) -> Iterator[bytes]:
+    """
+    Stream the products matched by ``query`` as encoded chunks, one per
+    ``batch_size`` rows. Rows come from a server-side cursor (``yield_per``)
+    in primary-key order, so memory stays flat however large the catalog is.
+    """
+    if export_format == "csv":
+        fields = CSV_COLUMNS
+    statement = project(query, fields).order_by(Product.id).statement
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+
+    if export_format == "csv":
+        yield _csv_lines([CSV_COLUMNS])
+    for rows in result.partitions():
+        if export_format == "csv":
+            yield _csv_lines(
+                (
+                    row.sku,
+                    row.name,
+                    row.description or "",
+                    "" if row.price is None else str(row.price),
+                    "true" if row.is_active else "false",
+                )
+                for row in rows
+            )
+        else:
+            yield b"".join(encode_json(item) + b"\n" for item in serialize_rows(rows, fields))
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _csv_lines(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from flask import current_app
+
+from ..models import Product
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+LIST_FIELDS = ("id", "sku", "name", "description", "price", "is_active", "created_at", "updated_at")
+
+# Keyset pagination needs these on every row, whether or not they are returned.
+_ALWAYS_SELECTED = ("id", "created_at")
+
+
+def parse_fields(value: str | None) -> tuple[str, ...]:
+    """
+    Parse a sparse fieldset such as ``sku,name,price`` into the fields to
+    return, in ``LIST_FIELDS`` order. ``id`` is always included; an empty
+    value means every field. Raises ``ValueError`` for unknown names.
+    """
+    if not value:
+        return LIST_FIELDS
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(LIST_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(field for field in LIST_FIELDS if field in requested)
+
+
+def project(query, fields: tuple[str, ...]):
+    """Select only the columns behind ``fields`` so rows come back as plain tuples, not ORM objects."""
+    selected = [field for field in LIST_FIELDS if field in fields or field in _ALWAYS_SELECTED]
+    return query.with_entities(*(getattr(Product, field) for field in selected))
+
+
+def serialize_rows(rows, fields: tuple[str, ...]) -> list[dict]:
+    """Turn projected rows into the same shape ``Product.to_dict`` produces, limited to ``fields``."""
+    convert_price = "price" in fields
+    items = []
+    for row in rows:
+        item = {field: getattr(row, field) for field in fields}
+        if convert_price and item["price"] is not None:
+            item["price"] = float(item["price"])
+        items.append(item)
+    return items
+
+
+def encode_json(payload) -> bytes:
+    """
+    Encode ``payload`` with orjson when it is installed, which also formats
+    datetimes natively (same output as ``isoformat()``), else with the stdlib.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_encode_default, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(payload, status: int = 200):
+    return current_app.response_class(encode_json(payload), status=status, mimetype="application/json")
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
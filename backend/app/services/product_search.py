@@ -0,0 +1,80 @@
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models import Product
+from ..models.product import SEARCH_CONFIG
+
+FILTER_FIELDS = ("sku", "name", "description", "is_active")
+
+
+def uses_search_indexes() -> bool:
+    """The trigram indexes and ``search_vector`` only exist on Postgres."""
+    return db.engine.dialect.name == "postgresql"
+
+
+def apply_filters(query, args):
+    """
+    Apply the product listing filters (``sku``, ``name``, ``description``,
+    ``is_active``) from ``args`` to ``query``.
+
+    SKU and name are substring matches, which the pg_trgm GIN indexes serve
+    on Postgres. Description is a full-text match against ``search_vector``
+    there, and a plain substring match everywhere else.
+    """
+    sku = args.get("sku")
+    name = args.get("name")
+    description = args.get("description")
+    is_active = args.get("is_active")
+
+    if sku:
+        query = query.filter(Product.sku_normalized.contains(sku.lower()))
+    if name:
+        query = query.filter(Product.name.ilike(f"%{name}%"))
+    if description:
+        if uses_search_indexes():
+            query = query.filter(Product.search_vector.op("@@")(_description_query(description)))
+        else:
+            query = query.filter(Product.description.ilike(f"%{description}%"))
+    if is_active is not None:
+        if is_active.lower() == "true":
+            query = query.filter(Product.is_active.is_(True))
+        elif is_active.lower() == "false":
+            query = query.filter(Product.is_active.is_(False))
+    return query
+
+
+def has_filters(args) -> bool:
+    """Whether ``apply_filters`` would narrow the query at all for ``args``."""
+    if args.get("sku") or args.get("name") or args.get("description"):
+        return True
+    return (args.get("is_active") or "").lower() in ("true", "false")
+
+
+def relevance(args):
+    """
+    Ranking expression for ``sort=relevance``: trigram similarity of the SKU
+    and name filters plus the full-text rank of the description filter.
+    Returns ``None`` when there is nothing to rank by or the database is not
+    Postgres, in which case callers keep their default ordering.
+    """
+    if not uses_search_indexes():
+        return None
+
+    scores = []
+    if args.get("sku"):
+        scores.append(func.similarity(Product.sku_normalized, args["sku"].lower()))
+    if args.get("name"):
+        scores.append(func.similarity(Product.name, args["name"]))
+    if args.get("description"):
+        scores.append(func.ts_rank(Product.search_vector, _description_query(args["description"])))
+    if not scores:
+        return None
+
+    score = scores[0]
+    for extra in scores[1:]:
+        score = score + extra
+    return score
+
+
+def _description_query(text: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, text)
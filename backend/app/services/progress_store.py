@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import redis
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..extensions import db
+from ..models import ImportJob
+from ..models.import_job import RUNNING_STATUSES
+
+# Counters a running job accumulates batch by batch.
+PROGRESS_COUNTERS = (
+    "processed_rows",
+    "rows_inserted",
+    "rows_updated",
+    "rows_unchanged",
+    "rows_collapsed",
+    "rows_rejected",
+    "bytes_processed",
+)
+_STATE_TTL = 24 * 3600
+
+_stores: dict[str, object] = {}
+_stores_lock = threading.Lock()
+
+
+def progress_store():
+    """The store named by ``IMPORT_PROGRESS_URL``: a Redis hash, or the ``import_jobs`` row (``database``)."""
+    url = current_app.config["IMPORT_PROGRESS_URL"]
+    with _stores_lock:
+        store = _stores.get(url)
+        if store is None:
+            if url.startswith(("redis://", "rediss://", "unix://")):
+                store = RedisProgressStore(url)
+            else:
+                store = DatabaseProgressStore()
+            _stores[url] = store
+    return store
+
+
+def overlay_live_progress(job: ImportJob) -> int | None:
+    """
+    Replace a running job's counters with the store's live ones, without
+    marking the row dirty, so ``to_dict`` (progress, ETA, throughput)
+    reflects batches not yet flushed. The counters only grow during a run,
+    so each keeps the larger of the two: a task that lost Redis flushes to
+    the row alone, and a hash left from before is then behind. Returns the
+    live version, if any.
+    """
+    if job.status not in RUNNING_STATUSES:
+        return None
+    live = progress_store().read(job.job_id)
+    if not live:
+        return None
+    for column in PROGRESS_COUNTERS:
+        if column in live:
+            set_committed_value(job, column, max(live[column], getattr(job, column) or 0))
+    return live.get("version")
+
+
+class DatabaseProgressStore:
+    """
+    Keeps progress on the ``import_jobs`` row itself: each batch's counters
+    are written in the batch's transaction. Needs nothing but the database,
+    which makes it the default and the one tests run against.
+    """
+
+    def __init__(self):
+        self._slots: dict[tuple[str, str], float] = {}
+        self._slots_lock = threading.Lock()
+
+    def start(self, job: ImportJob):
+        pass
+
+    def add(self, job_id: str, counts: dict, values: dict) -> dict | None:
+        # No totals of its own; JobProgress flushes every batch instead.
+        return None
+
+    def read(self, job_id: str) -> dict | None:
+        return None
+
+    def clear(self, job_id: str):
+        pass
+
+    def claim_slot(self, job_id: str, name: str, seconds: float) -> bool:
+        # Only shared within this process; parallel chunk workers each keep
+        # their own, so a job may notify once per worker per interval.
+        now = time.monotonic()
+        key = (job_id, name)
+        with self._slots_lock:
+            if self._slots.get(key, 0.0) > now:
+                return False
+            self._slots = {slot: until for slot, until in self._slots.items() if until > now}
+            self._slots[key] = now + seconds
+            return True
+
+
+class RedisProgressStore:
+    """
+    Keeps a running job's counters in a Redis hash, bumped with HINCRBY per
+    batch, so parallel chunk tasks share one set of totals and readers get
+    them without touching ``import_jobs``.
+    """
+
+    def __init__(self, url: str):
+        self._redis = redis.Redis.from_url(url)
+
+    def start(self, job: ImportJob):
+        """Seed the hash from the row, which is where a resumed job's counters left off."""
+        key = _progress_key(job.job_id)
+        pipeline = self._redis.pipeline()
+        pipeline.delete(key)
+        pipeline.hset(
+            key,
+            mapping={
+                **{column: getattr(job, column) or 0 for column in PROGRESS_COUNTERS},
+                "version": _now_version(),
+            },
+        )
+        pipeline.expire(key, _STATE_TTL)
+        try:
+            pipeline.execute()
+        except redis.RedisError:
+            # The job still runs; its first add fails too and the tracker
+            # falls back to the row.
+            pass
+
+    def add(self, job_id: str, counts: dict, values: dict) -> dict | None:
+        key = _progress_key(job_id)
+        pipeline = self._redis.pipeline()
+        for column, amount in counts.items():
+            pipeline.hincrby(key, column, amount)
+        pipeline.hset(key, mapping={**values, "version": _now_version()})
+        pipeline.expire(key, _STATE_TTL)
+        pipeline.hgetall(key)
+        try:
+            return _decode(pipeline.execute()[-1])
+        except redis.RedisError:
+            # No totals: JobProgress flushes this batch to the row and stops
+            # using Redis for the rest of the task.
+            return None
+
+    def read(self, job_id: str) -> dict | None:
+        try:
+            return _decode(self._redis.hgetall(_progress_key(job_id))) or None
+        except redis.RedisError:
+            # Readers fall back to the last flush on the row.
+            return None
+
+    def clear(self, job_id: str):
+        try:
+            self._redis.delete(_progress_key(job_id))
+        except redis.RedisError:
+            pass  # The hash expires on its own; readers ignore it once the job settles.
+
+    def claim_slot(self, job_id: str, name: str, seconds: float) -> bool:
+        """
+        Take the job's ``name`` slot for ``seconds``; False while another
+        task (in any process) holds it. Used to rate-limit notifications.
+        """
+        try:
+            key = f"{_progress_key(job_id)}:{name}"
+            return bool(self._redis.set(key, 1, nx=True, px=max(int(seconds * 1000), 1)))
+        except redis.RedisError:
+            return False
+
+
+class JobProgress:
+    """
+    One task's side of a job's progress. ``add`` records each batch in the
+    store and keeps its counters here; ``flush`` writes them to the
+    ``import_jobs`` row as increments, in the caller's transaction so the
+    checkpoint still commits with the products it covers. Between flushes
+    (``IMPORT_PROGRESS_FLUSH_SECONDS``) the row is not touched at all.
+    """
+
+    def __init__(self, job: ImportJob):
+        self.job_id = job.job_id
+        self._job_pk = job.id
+        self._store = progress_store()
+        self._interval = current_app.config["IMPORT_PROGRESS_FLUSH_SECONDS"]
+        self._pending = Counter()
+        self._values = {}
+        self._flushed_at = time.monotonic()
+
+    def add(self, counts: dict, values: dict | None = None) -> dict:
+        """
+        Record one batch: ``counts`` are increments and ``values`` replace
+        the current ones (``checkpoint_*`` only reach the row). Returns the
+        job-wide totals of ``PROGRESS_COUNTERS``.
+        """
+        values = values or {}
+        self._pending.update(counts)
+        self._values.update(values)
+        totals = self._store.add(
+            self.job_id,
+            {column: amount for column, amount in counts.items() if column in PROGRESS_COUNTERS},
+            {column: value for column, value in values.items() if column in PROGRESS_COUNTERS},
+        )
+        if totals is None:
+            # The store keeps no totals (the database store), or failed to
+            # (Redis down). Either way the row is the record from here on:
+            # a recovered Redis hash would be missing this batch.
+            self._store = _ROW_ONLY
+            totals = self.flush()
+        return totals
+
+    def flush(self, force: bool = True) -> dict | None:
+        """Write pending counters to the row; with ``force=False`` only once the interval has passed."""
+        if not self._pending and not self._values:
+            return None
+        if not force and time.monotonic() - self._flushed_at < self._interval:
+            return None
+
+        changes = {
+            getattr(ImportJob, column): getattr(ImportJob, column) + amount
+            for column, amount in self._pending.items()
+        }
+        changes.update({getattr(ImportJob, column): value for column, value in self._values.items()})
+        totals = db.session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == self._job_pk)
+            .values({**changes, ImportJob.heartbeat_at: datetime.utcnow()})
+            .returning(*(getattr(ImportJob, column) for column in PROGRESS_COUNTERS))
+        ).one()
+        self._pending.clear()
+        self._values.clear()
+        self._flushed_at = time.monotonic()
+        return dict(totals._mapping)
+
+
+_ROW_ONLY = DatabaseProgressStore()
+
+
+def _decode(fields: dict) -> dict:
+    return {key.decode(): int(value) for key, value in fields.items()}
+
+
+def _now_version() -> int:
+    return time.time_ns() // 1000
+
+
+def _progress_key(job_id: str) -> str:
+    return f"import-job:{job_id}:progress"
@@ -0,0 +1,91 @@
+import csv
+import os
+
+# Leading columns of a reject file; the original columns follow, so the file
+# can be corrected and imported again with the same column mapping.
+REJECT_COLUMNS = ("_row", "_offset", "_error")
+
+
+def reject_path(upload_path: str, job_id: str) -> str:
+    return os.path.join(os.path.dirname(upload_path), f"{job_id}_rejects.csv")
+
+
+class RejectWriter:
+    """
+    Appends rejected records to a CSV, creating it (with a header) on the
+    first write so clean imports leave no file behind.
+    """
+
+    def __init__(self, path: str, header: list[str]):
+        self.path = path
+        self._header = header
+        self._handle = None
+        self._writer = None
+
+    def write(self, rejects: list[tuple]):
+        """Write ``(row_number, offset, error, fields)`` entries and flush them to disk."""
+        if not rejects:
+            return
+        if self._handle is None:
+            is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._handle = open(self.path, "a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._handle)
+            if is_new:
+                self._writer.writerow([*REJECT_COLUMNS, *self._header])
+        self._writer.writerows(
+            ["" if row_number is None else row_number, offset, error, *fields]
+            for row_number, offset, error, fields in rejects
+        )
+        self._handle.flush()
+
+    def size(self) -> int:
+        """Bytes in the file so far, recorded with a checkpoint to cut it back on resume."""
+        if self._handle is not None:
+            return self._handle.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def truncate_rejects(path: str, size: int | None):
+    """Cut a resumed job's reject file back to its size at the checkpoint."""
+    if size is not None and os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, "r+b") as handle:
+            handle.truncate(size)
+
+
+def merge_reject_files(parts: list[tuple[str | None, int | None]], path: str) -> bool:
+    """
+    Concatenate per-chunk reject files (in order) into ``path``, keeping one
+    header. Each part comes with the file row number of its chunk's first
+    record, which turns the chunk-local ``_row`` values into file rows;
+    ``None`` (a chunk after one that failed, whose length is unknown)
+    leaves ``_row`` empty, and ``_offset`` still locates the record.
+    """
+    parts = [(part, first_row) for part, first_row in parts if part and os.path.exists(part)]
+    if not parts:
+        return False
+
+    with open(path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        for index, (part, first_row) in enumerate(parts):
+            with open(part, newline="", encoding="utf-8") as source:
+                reader = csv.reader(source)
+                header = next(reader, None)
+                if index == 0 and header:
+                    writer.writerow(header)
+                for row in reader:
+                    local = row[0]
+                    row[0] = int(local) + first_row - 1 if local and first_row else ""
+                    writer.writerow(row)
+            os.remove(part)
+    return True
@@ -1,27 +1,51 @@
-import json
-import time
+import threading
 
-import requests
+from flask import current_app
 
+from ..celery_app import celery
 from ..extensions import db
-from ..models import Webhook
+from ..models import Webhook, WebhookDelivery
+from ..tasks.webhook_delivery import deliver_webhooks
 
 
-def dispatch_webhooks(event_type: str, payload: dict):
+def dispatch_webhooks(event_type: str, payload: dict) -> list[int]:
+    """
+    Record a delivery for every enabled webhook subscribed to ``event_type``
+    and queue them for the ``webhooks`` workers. Nothing is sent on the
+    caller's thread, so a slow receiver never holds up an import. In eager
+    mode queuing would mean sending inline, so the deliveries are sent from
+    a background thread instead; any it does not get through are left to
+    ``retry_webhook_deliveries``.
+    """
     webhooks = Webhook.query.filter_by(event_type=event_type, is_enabled=True).all()
-    for webhook in webhooks:
-        start = time.perf_counter()
-        try:
-            response = requests.post(
-                webhook.url,
-                data=json.dumps(payload),
-                headers={"Content-Type": "application/json"},
-                timeout=5,
-            )
-            webhook.last_response_code = response.status_code
-        except requests.RequestException:
-            webhook.last_response_code = None
-        finally:
-            webhook.last_response_ms = int((time.perf_counter() - start) * 1000)
+    if not webhooks:
+        return []
+
+    deliveries = [
+        WebhookDelivery(webhook_id=webhook.id, event_type=event_type, payload=payload)
+        for webhook in webhooks
+    ]
+    db.session.add_all(deliveries)
     db.session.commit()
 
+    delivery_ids = [delivery.id for delivery in deliveries]
+    if not celery.conf.task_always_eager:
+        deliver_webhooks.delay(delivery_ids)
+    elif current_app.config["WEBHOOK_EAGER_DELIVERY"]:
+        _deliver_in_background(delivery_ids)
+    return delivery_ids
+
+
+def _deliver_in_background(delivery_ids: list[int]) -> threading.Thread:
+    app = current_app._get_current_object()
+
+    def deliver():
+        with app.app_context():
+            try:
+                deliver_webhooks(delivery_ids)
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=deliver, name="webhook-delivery", daemon=True)
+    thread.start()
+    return thread
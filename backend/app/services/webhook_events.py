@@ -0,0 +1,89 @@
+import time
+from typing import Iterable
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import ImportJob, Webhook
+from .progress_store import progress_store
+from .webhook_dispatcher import dispatch_webhooks
+
+PROGRESS_EVENT = "product.import.progress"
+CHANGES_EVENT = "products.changed"
+
+_SUBSCRIBER_CACHE_SECONDS = 10
+_subscriber_cache: dict[str, tuple[float, bool]] = {}
+
+
+def has_subscribers(event_type: str) -> bool:
+    """
+    Whether any enabled webhook listens for ``event_type``. Cached for a few
+    seconds, because per-batch events would otherwise cost an extra query on
+    every batch of every import even when nobody is subscribed.
+    """
+    now = time.monotonic()
+    cached = _subscriber_cache.get(event_type)
+    if cached and cached[0] > now:
+        return cached[1]
+    subscribed = db.session.query(
+        Webhook.query.filter_by(event_type=event_type, is_enabled=True).exists()
+    ).scalar()
+    _subscriber_cache[event_type] = (now + _SUBSCRIBER_CACHE_SECONDS, subscribed)
+    return subscribed
+
+
+def emit_product_changes(
+    inserted: Iterable[str] = (),
+    updated: Iterable[str] = (),
+    deleted: Iterable[str] = (),
+    source: dict | None = None,
+):
+    """
+    Dispatch ``products.changed`` for the given SKUs, split into events of at
+    most ``WEBHOOK_CHANGES_MAX_SKUS`` SKUs so no payload grows with the batch.
+    ``source`` says what made the change (an import job, the API).
+    """
+    changes = [
+        *(("inserted", sku) for sku in inserted),
+        *(("updated", sku) for sku in updated),
+        *(("deleted", sku) for sku in deleted),
+    ]
+    if not changes or not has_subscribers(CHANGES_EVENT):
+        return
+
+    limit = current_app.config["WEBHOOK_CHANGES_MAX_SKUS"]
+    for start in range(0, len(changes), limit):
+        payload = {"source": source or {}, "inserted": [], "updated": [], "deleted": []}
+        for kind, sku in changes[start : start + limit]:
+            payload[kind].append(sku)
+        dispatch_webhooks(CHANGES_EVENT, payload)
+
+
+def emit_import_progress(job: ImportJob, totals: dict):
+    """
+    Dispatch ``product.import.progress`` for ``job`` at most once per
+    ``WEBHOOK_PROGRESS_INTERVAL`` seconds. The slot is taken in the progress
+    store, so with Redis parallel chunk tasks share one rate limit and no
+    batch writes to ``import_jobs`` for it.
+    """
+    if not has_subscribers(PROGRESS_EVENT):
+        return
+    interval = current_app.config["WEBHOOK_PROGRESS_INTERVAL"]
+    if not progress_store().claim_slot(job.job_id, "progress-webhook", interval):
+        return
+
+    bytes_total = job.bytes_total or 0
+    dispatch_webhooks(
+        PROGRESS_EVENT,
+        {
+            "job_id": job.job_id,
+            "filename": job.filename,
+            **totals,
+            "bytes_total": bytes_total,
+            "progress": (
+                round(min(1.0, totals["bytes_processed"] / bytes_total) * 100, 1)
+                if bytes_total
+                else None
+            ),
+        },
+    )
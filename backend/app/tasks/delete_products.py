@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from sqlalchemy import delete, text
+
+from ..celery_app import celery
+from ..extensions import db
+from ..models import DeleteJob, Product
+from ..services.pagination import approximate_count
+from ..services.product_search import apply_filters, has_filters
+from ..services.webhook_events import CHANGES_EVENT, emit_product_changes, has_subscribers
+
+DELETE_CHUNK_SIZE = 5000
+SKU_CHUNK_SIZE = 1000
+
+
+@celery.task(name="delete_products_job")
+def delete_products_job(job_id: str):
+    job = DeleteJob.query.filter_by(job_id=job_id).first()
+    if not job:
+        return
+
+    job.status = "processing"
+    job.deleted_rows = 0
+    job.chunks_done = 0
+    job.started_at = datetime.utcnow()
+    job.heartbeat_at = job.started_at
+    db.session.commit()
+
+    filters = job.filters or {}
+    try:
+        if job.skus is not None:
+            _delete_skus(job, filters)
+        elif has_filters(filters):
+            _delete_ranges(job, filters)
+        elif filters.get("all") is True and has_subscribers(CHANGES_EVENT):
+            # TRUNCATE cannot say what it removed; walk the table instead.
+            _delete_ranges(job, {})
+        elif filters.get("all") is True:
+            _truncate(job)
+        else:
+            raise ValueError("No filters or SKUs given; deleting every product needs all=true")
+
+        job.status = "completed"
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        job.status = "failed"
+        job.error_message = str(exc)
+        db.session.commit()
+        raise
+
+
+def _truncate(job: DeleteJob):
+    # The whole catalog is going: TRUNCATE drops it in one metadata operation
+    # instead of writing a dead tuple and WAL record per row.
+    job.strategy = "truncate"
+    if db.engine.dialect.name != "postgresql":
+        job.total_rows = Product.query.delete(synchronize_session=False)
+        _record_chunk(job, job.total_rows)
+        return
+
+    # TRUNCATE reports no row count; the planner estimate stands in for it.
+    job.total_rows = approximate_count(Product.query, 0)
+    db.session.execute(text(f"TRUNCATE TABLE {Product.__tablename__}"))
+    _record_chunk(job, job.total_rows)
+
+
+def _delete_ranges(job: DeleteJob, filters: dict):
+    # Walk the primary key in windows of at most DELETE_CHUNK_SIZE matching
+    # rows. Each window is its own short transaction, so locks and WAL stay
+    # bounded and concurrent writers are never blocked for long.
+    job.strategy = "chunked"
+    job.total_rows = approximate_count(apply_filters(Product.query, filters), 0)
+    db.session.commit()
+
+    last_id = 0
+    while True:
+        matching = apply_filters(Product.query, filters).filter(Product.id > last_id)
+        upper = (
+            matching.with_entities(Product.id)
+            .order_by(Product.id)
+            .offset(DELETE_CHUNK_SIZE - 1)
+            .limit(1)
+            .scalar()
+        )
+        window = matching if upper is None else matching.filter(Product.id <= upper)
+        _delete_where(job, window)
+        if upper is None:
+            return
+        last_id = upper
+
+
+def _delete_skus(job: DeleteJob, filters: dict):
+    job.strategy = "skus"
+    skus = sorted({Product.normalize_sku(sku) for sku in job.skus})
+    job.total_rows = len(skus)
+    db.session.commit()
+
+    for start in range(0, len(skus), SKU_CHUNK_SIZE):
+        chunk = skus[start : start + SKU_CHUNK_SIZE]
+        matching = apply_filters(Product.query, filters).filter(Product.sku_normalized.in_(chunk))
+        _delete_where(job, matching)
+
+
+def _delete_where(job: DeleteJob, query):
+    """Delete the products ``query`` matches as one chunk, announcing their SKUs once committed."""
+    statement = (
+        delete(Product).where(query.whereclause).execution_options(synchronize_session=False)
+    )
+    if not has_subscribers(CHANGES_EVENT):
+        _record_chunk(job, db.session.execute(statement).rowcount)
+        return
+    skus = db.session.scalars(statement.returning(Product.sku)).all()
+    _record_chunk(job, len(skus))
+    emit_product_changes(deleted=skus, source={"bulk_delete": job.job_id})
+
+
+def _record_chunk(job: DeleteJob, deleted: int):
+    job.deleted_rows += deleted
+    job.chunks_done += 1
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
@@ -1,110 +1,974 @@
 import csv
-from decimal import Decimal
+import hashlib
+import io
+import os
+import time
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
 from pathlib import Path
 
+from celery import chord
+from flask import current_app
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    String,
+    and_,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    update,
+    values,
+)
 from sqlalchemy.dialects.postgresql import insert
 
 from ..celery_app import celery
 from ..extensions import db
-from ..models import ImportJob, Product
+from ..models import ImportJob, ImportStaging, Product
+from ..services.batch_sizer import BatchSizer, merge_batch_stats
+from ..services.csv_chunks import is_compressed, open_chunk, open_csv, plan_chunks, read_header
+from ..services.csv_columns import resolve_columns
+from ..services.import_preview import discard_staged_rows, summarize_preview
+from ..services.job_events import publish_job
+from ..services.pipeline import merge_pipeline_stats, run_pipeline
+from ..services.progress_store import JobProgress, progress_store
+from ..services.reject_file import (
+    RejectWriter,
+    merge_reject_files,
+    reject_path,
+    truncate_rejects,
+)
 from ..services.webhook_dispatcher import dispatch_webhooks
+from ..services.webhook_events import (
+    CHANGES_EVENT,
+    emit_import_progress,
+    emit_product_changes,
+    has_subscribers,
+)
+
+LOAD_MODES = ("insert", "copy")
+SYNC_MODES = ("deactivate", "delete")
+ERROR_POLICIES = ("fail_fast", "skip")
+_DIGEST_BLOCK_SIZE = 1024 * 1024
+# Hash slots used to spot SKUs that recur across chunks (2 bytes each)
+_REPEAT_SLOTS = 1 << 22
+# Bounds of the products columns; rows outside them are rejected up front
+# rather than failing the whole batch in the database.
+_SKU_MAX_LENGTH = Product.__table__.c.sku.type.length
+_NAME_MAX_LENGTH = Product.__table__.c.name.type.length
+_PRICE_LIMIT = Decimal(10) ** (
+    Product.__table__.c.price.type.precision - Product.__table__.c.price.type.scale
+)
+
+STAGING_TABLE = "products_staging"
+ROW_COLUMNS = (
+    "sku",
+    "sku_normalized",
+    "name",
+    "description",
+    "price",
+    "is_active",
+    "row_hash",
+    "import_job_id",
+    "import_seq",
+    "sync_generation",
+)
+_SKU = ROW_COLUMNS.index("sku")
+_SKU_NORMALIZED = ROW_COLUMNS.index("sku_normalized")
+_IMPORT_SEQ = ROW_COLUMNS.index("import_seq")
+# A multi-VALUES insert can bind a parameter for every column of the table.
+UPSERT_PARAMS_PER_ROW = len(Product.__table__.columns)
+# Job-wide counters reported by the progress event.
+_PROGRESS_EVENT_FIELDS = (
+    "processed_rows",
+    "rows_inserted",
+    "rows_updated",
+    "rows_unchanged",
+    "rows_rejected",
+    "bytes_processed",
+)
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
 
 
 @celery.task(name="import_products_job")
-def import_products_job(job_id: str):
+def import_products_job(job_id: str, digest: bool = False, skip_duplicate: bool = False):
+    """
+    Load a job's file into products. With ``digest`` the file is hashed here
+    first (uploads that arrived in chunks are not hashed on the request
+    path), and with ``skip_duplicate`` a file that was already imported the
+    same way settles as ``skipped_duplicate`` instead of loading again.
+    """
     job = ImportJob.query.filter_by(job_id=job_id).first()
     if not job:
         return
 
+    if digest and os.path.exists(job.file_path):
+        job.content_sha256 = _file_digest(job.file_path)
+        # A sync always runs; the same file retires whatever was added since.
+        original = find_completed_import(job) if skip_duplicate and not job.sync_mode else None
+        if original:
+            os.remove(job.file_path)
+            job.file_path = original.file_path
+            job.duplicate_of = original.job_id
+            _finish_job(job, "skipped_duplicate")
+            return
+        db.session.commit()
+
+    if is_compressed(job.file_path):
+        job.chunk_count = 1  # a compressed stream can only be read front to back
+    chunked = (job.chunk_count or 1) > 1
+    resume_from = job.checkpoint_offset if not chunked else None
+
     job.status = "processing"
-    job.processed_rows = 0
+    if resume_from is None:
+        job.processed_rows = 0
+        job.rows_inserted = 0
+        job.rows_updated = 0
+        job.rows_unchanged = 0
+        job.rows_collapsed = 0
+        job.rows_rejected = 0
+        job.bytes_processed = 0
+        job.checkpoint_row = None
+        job.checkpoint_batch = 0
+        job.checkpoint_rejects_bytes = None
+    job.started_at = datetime.utcnow()
+    job.heartbeat_at = job.started_at
+    job.finished_at = None
+    job.rows_at_start = job.processed_rows or 0
+    job.bytes_at_start = job.bytes_processed or 0
+    job.load_mode = _resolve_load_mode(job.load_mode)
+    job.reject_file_path = reject_path(job.file_path, job.job_id)
+    if resume_from is None and os.path.exists(job.reject_file_path):
+        os.remove(job.reject_file_path)
+    elif resume_from is not None:
+        truncate_rejects(job.reject_file_path, job.checkpoint_rejects_bytes)
+    if resume_from is None and job.preview:
+        discard_staged_rows(job)
     db.session.commit()
+    progress_store().start(job)
+    publish_job(job)
+    load_batch = _select_loader(job)
 
     csv_path = Path(job.file_path)
     if not csv_path.exists():
-        job.status = "failed"
         job.error_message = "Uploaded file not found"
+        _finish_job(job, "failed")
+        return
+
+    if not job.preview:
+        dispatch_webhooks(
+            "product.import.started",
+            {"job_id": job.job_id, "filename": job.filename},
+        )
+
+    try:
+        job.bytes_total = csv_path.stat().st_size
         db.session.commit()
+
+        if chunked:
+            _fan_out(job, csv_path)
+            return
+
+        # A resumed job seeks straight to the last committed record.
+        fieldnames, seq_offset = None, 0
+        if resume_from is not None:
+            fieldnames, _ = read_header(csv_path)
+            seq_offset = job.checkpoint_row + 1 if job.checkpoint_row is not None else 0
+
+        with open_csv(csv_path, resume_from or 0) as handle:
+            _, _, pipeline_stats, batching = _import_rows(
+                handle,
+                job,
+                load_batch,
+                fieldnames=fieldnames,
+                seq_offset=seq_offset,
+                checkpoint=True,
+                rejects_path=job.reject_file_path,
+            )
+
+        job.total_rows = job.processed_rows
+        job.stats = {**(job.stats or {}), "pipeline": pipeline_stats}
+        _record_batching(job, "load", batching)
+        _complete_job(job)
+
+    except Exception as exc:
+        db.session.rollback()
+        _fail_job(job, str(exc))
+        raise
+
+
+@celery.task(name="requeue_stale_imports")
+def requeue_stale_imports():
+    # Jobs whose worker died stop sending heartbeats; pick them up again from
+    # their last checkpoint.
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config["IMPORT_STALE_AFTER"])
+    stale = ImportJob.query.filter(
+        ImportJob.status.in_(("processing", "applying")), ImportJob.heartbeat_at < cutoff
+    ).all()
+    # An interrupted apply merges from staging again; the file is not re-read.
+    tasks = [(resume_task(job), job.job_id) for job in stale]
+    for job in stale:
+        job.status = "queued"
+    db.session.commit()
+    for job in stale:
+        publish_job(job)
+
+    for task, job_id in tasks:
+        task.delay(job_id=job_id)
+    return [job_id for _, job_id in tasks]
+
+
+@celery.task(name="expire_import_previews")
+def expire_import_previews():
+    # Staged rows of a preview nobody applied would otherwise stay forever.
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config["IMPORT_PREVIEW_TTL"])
+    expired = ImportJob.query.filter(
+        ImportJob.status == "previewed", ImportJob.updated_at < cutoff
+    ).all()
+    for job in expired:
+        discard_staged_rows(job)
+        job.status = "expired"
+    db.session.commit()
+    for job in expired:
+        publish_job(job)
+    return [job.job_id for job in expired]
+
+
+@celery.task(name="apply_import_preview")
+def apply_import_preview(job_id: str):
+    """
+    Merge the rows a preview staged into ``products`` in slices of the
+    staging table sized by a ``BatchSizer`` (INSERT ... SELECT binds no
+    per-row parameters, so only latency limits them), each in its own
+    transaction, then retire missing
+    SKUs for a sync and drop the staged rows. Merging is idempotent, so a
+    retried apply simply finds the rows already written as unchanged.
+    """
+    job = ImportJob.query.filter_by(job_id=job_id).first()
+    if not job:
         return
 
+    staged = ImportStaging.query.filter_by(import_job_id=job.job_id)
+    job.status = "applying"
+    job.rows_inserted = 0
+    job.rows_updated = 0
+    job.rows_unchanged = 0
+    job.bytes_processed = 0
+    job.started_at = datetime.utcnow()
+    job.heartbeat_at = job.started_at
+    job.finished_at = None
+    job.rows_at_start = 0
+    job.bytes_at_start = 0
+    db.session.commit()
+    progress_store().start(job)
+    publish_job(job)
+
     dispatch_webhooks(
         "product.import.started",
         {"job_id": job.job_id, "filename": job.filename},
     )
 
     try:
-        total_rows = _count_rows(csv_path)
-        job.total_rows = total_rows
+        tracker = JobProgress(job)
+        sizer = _batch_sizer()
+        total = staged.count()
+        merged = 0
+        after = 0
+        while True:
+            size = sizer.size
+            upto = (
+                staged.with_entities(ImportStaging.id)
+                .filter(ImportStaging.id > after)
+                .order_by(ImportStaging.id)
+                .offset(size - 1)
+                .limit(1)
+                .scalar()
+            )
+            rows = size if upto is not None else total - merged
+            window = [ImportStaging.import_job_id == job.job_id, ImportStaging.id > after]
+            if upto is not None:
+                window.append(ImportStaging.id <= upto)
+
+            started = time.perf_counter()
+            inserted_skus, updated_skus = _merge_staged(window)
+            inserted, updated = len(inserted_skus), len(updated_skus)
+            if job.sync_mode and rows > inserted + updated:
+                _stamp_generation(
+                    db.session.query(ImportStaging.sku_normalized).filter(*window).scalar_subquery(),
+                    job.id,
+                )
+            merged += rows
+            # Bytes were all read by the preview; progress now scales the
+            # file size by the share of staged rows merged so far.
+            totals = tracker.add(
+                {
+                    "rows_inserted": inserted,
+                    "rows_updated": updated,
+                    "rows_unchanged": rows - inserted - updated,
+                },
+                {"bytes_processed": (job.bytes_total or 0) * merged // max(total, 1)},
+            )
+            tracker.flush(force=False)
+            db.session.commit()
+            sizer.record(rows, time.perf_counter() - started)
+            publish_job(job)
+            _emit_batch_events(job, inserted_skus, updated_skus, totals)
+            if upto is None:
+                break
+            after = upto
+
+        tracker.flush()
         db.session.commit()
+        db.session.refresh(job)
+        discard_staged_rows(job)
+        _record_batching(job, "apply", sizer.stats())
+        _complete_job(job)
 
-        with csv_path.open("r", newline="", encoding="utf-8") as handle:
-            reader = csv.DictReader(handle)
-            batch = []
+    except Exception as exc:
+        db.session.rollback()
+        _fail_job(job, str(exc))
+        raise
 
-            for row in reader:
-                batch.append(_transform_row(row))
 
-                if len(batch) >= 2000:
-                    _upsert_batch(batch)
-                    batch = []
+def resume_task(job: ImportJob):
+    """The task that picks ``job`` up again: an apply resumes from staging, anything else re-reads the file."""
+    return apply_import_preview if job.status == "applying" else import_products_job
 
-                    # ---- IMPORTANT FIX ----
-                    db.session.expire_all()
-                    job.processed_rows = (job.processed_rows or 0) + 2000
-                    db.session.commit()
 
-            if batch:
-                _upsert_batch(batch)
-                db.session.expire_all()
-                job.processed_rows = (job.processed_rows or 0) + len(batch)
-                db.session.commit()
+@celery.task(name="import_products_chunk")
+def import_products_chunk(
+    job_id: str, fieldnames: list[str], start: int, end: int, repeated: list[str] | None = None
+):
+    job = ImportJob.query.filter_by(job_id=job_id).first()
+    if not job:
+        return {"rows": 0, "error": "Import job not found"}
 
-        job.status = "completed"
-        db.session.commit()
+    load_batch = _select_loader(job)
+    # A chunk always runs from its first byte, so earlier rejects are void.
+    rejects_path = f"{job.reject_file_path}.{start}.part"
+    if os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    try:
+        with open_chunk(job.file_path, start, end) as handle:
+            rows, records, pipeline_stats, batching = _import_rows(
+                handle,
+                job,
+                load_batch,
+                fieldnames=fieldnames,
+                seq_offset=start,
+                rejects_path=rejects_path,
+                numbered_rows=False,
+                repeated=frozenset(repeated or ()),
+            )
+    except Exception as exc:
+        db.session.rollback()
+        return {"rows": 0, "error": f"bytes {start}-{end}: {exc}", "rejects": rejects_path}
+    return {
+        "rows": rows,
+        "records": records,
+        "pipeline": pipeline_stats,
+        "batching": batching,
+        "rejects": rejects_path,
+    }
 
-        dispatch_webhooks(
-            "product.import.completed",
-            {"job_id": job.job_id, "filename": job.filename},
+
+@celery.task(name="finalize_chunked_import")
+def finalize_chunked_import(results: list[dict], job_id: str):
+    job = ImportJob.query.filter_by(job_id=job_id).first()
+    if not job:
+        return
+
+    # Chunk rejects are numbered within the chunk; its first record's file
+    # row follows from the record counts of the chunks before it.
+    parts = []
+    first_row = 2  # the header is row 1
+    for result in results:
+        parts.append((result.get("rejects"), first_row))
+        records = result.get("records")
+        first_row = first_row + records if first_row is not None and records is not None else None
+    merge_reject_files(parts, job.reject_file_path)
+    errors = [result["error"] for result in results if result.get("error")]
+    if errors:
+        _fail_job(job, "; ".join(errors))
+        return
+
+    job.total_rows = sum(result["rows"] for result in results)
+    job.stats = {
+        **(job.stats or {}),
+        "pipeline": merge_pipeline_stats([result.get("pipeline") for result in results]),
+    }
+    _record_batching(job, "load", merge_batch_stats([result.get("batching") for result in results]))
+    _complete_job(job)
+
+
+def _fan_out(job: ImportJob, csv_path: Path):
+    fieldnames, ranges = plan_chunks(csv_path, job.chunk_count)
+    repeated = _repeated_skus(csv_path, fieldnames, ranges, job.column_mapping)
+    job.chunk_count = len(ranges)
+    job.bytes_processed = ranges[0][0] if ranges else job.bytes_total
+    db.session.commit()
+
+    header = [
+        import_products_chunk.s(job.job_id, fieldnames, start, end, skus)
+        for (start, end), skus in zip(ranges, repeated)
+    ]
+    chord(header)(finalize_chunked_import.s(job.job_id))
+
+
+def _repeated_skus(path, fieldnames: list[str], ranges, column_mapping) -> list[list[str]]:
+    """
+    For each chunk, the normalised SKUs that also occur in an earlier chunk;
+    only those rows can be overtaken by a duplicate from another chunk.
+    SKUs are tracked by hash slot instead of being kept, so memory stays
+    fixed: a slot collision can list a SKU that does not repeat, which
+    costs a needless restamp but never misses a repeat.
+    """
+    sku_at = resolve_columns(fieldnames, column_mapping)["sku"]
+    if sku_at is None:
+        return [[] for _ in ranges]
+
+    first_chunk = array("H", bytes(2 * _REPEAT_SLOTS))
+    repeated = []
+    for number, (start, end) in enumerate(ranges, start=1):
+        found = set()
+        with open_chunk(path, start, end) as handle:
+            for row in csv.reader(handle):
+                if len(row) <= sku_at:
+                    continue
+                sku = row[sku_at].strip().lower()
+                slot = hash(sku) % _REPEAT_SLOTS
+                if not first_chunk[slot]:
+                    first_chunk[slot] = number
+                elif first_chunk[slot] != number:
+                    found.add(sku)
+        repeated.append(sorted(found))
+    return repeated
+
+
+def _import_rows(
+    handle,
+    job: ImportJob,
+    load_batch,
+    fieldnames: list[str] | None = None,
+    seq_offset: int = 0,
+    checkpoint: bool = False,
+    rejects_path: str | None = None,
+    numbered_rows: bool = True,
+    repeated: frozenset = frozenset(),
+) -> tuple[int, int, dict, dict]:
+    """
+    Parse ``handle`` and write it in batches. Returns the rows read, the
+    records read (rows plus blank lines), and the pipeline and batch sizing
+    statistics.
+    """
+    # Rows carry (job, seq) so the upsert can let the last row in the file win
+    # for a duplicated SKU, even when chunks are written concurrently. A chunk
+    # numbers its rows from its starting byte offset; every record takes at
+    # least one byte, so seq stays strictly increasing across the whole file.
+    reported_bytes = handle.consumed()
+    reader = csv.reader(handle)
+    if fieldnames is None:
+        fieldnames = next(reader, [])
+    transform = _compile_transform(
+        fieldnames, job.column_mapping, job.job_id, job.id if job.sync_mode else None
+    )
+    skip_errors = job.error_policy == "skip"
+    reject_writer = RejectWriter(rejects_path, fieldnames) if rejects_path else None
+    tracker = JobProgress(job)
+    sizer = _batch_sizer(_params_per_row(load_batch))
+
+    def parse_batches():
+        # Keyed by normalised SKU, a repeat within the batch replaces the
+        # earlier row: the last occurrence wins and ON CONFLICT never sees a
+        # key twice. Only one batch worth of keys is held at a time; repeats
+        # across batches are settled by the upsert's (job, seq) ordering.
+        # The size is read per batch, so the writer's feedback applies to
+        # the next batch parsed; a batch is also cut once it holds
+        # IMPORT_BATCH_MAX_BYTES of the file, whatever its row count.
+        nonlocal records
+        batch = {}
+        parsed = 0
+        rejects = []
+        record_start = batch_start = handle.offset
+        for seq, row in enumerate(reader, start=seq_offset):
+            records += 1
+            if not row:
+                record_start = handle.offset
+                continue
+            try:
+                values = transform(row, seq)
+            except ValueError as exc:
+                # Single-stream seqs count records from the first data row, so
+                # the header is row 1. Chunk seqs are byte based: the reject
+                # gets its row within the chunk, which merge_reject_files
+                # turns into a file row, and errors cite the byte offset.
+                row_number = seq + 2 if numbered_rows else seq - seq_offset + 1
+                if not skip_errors:
+                    where = f"Row {row_number}" if numbered_rows else f"Byte {record_start}"
+                    raise ValueError(f"{where}: {exc}") from exc
+                rejects.append((row_number, record_start, str(exc), row))
+            else:
+                batch[values[_SKU_NORMALIZED]] = values
+            parsed += 1
+            record_start = handle.offset
+            if parsed >= sizer.size or handle.offset - batch_start >= sizer.max_bytes:
+                yield list(batch.values()), parsed, rejects, handle.offset, handle.consumed(), seq
+                batch = {}
+                parsed = 0
+                rejects = []
+                batch_start = handle.offset
+        if parsed:
+            yield list(batch.values()), parsed, rejects, handle.offset, handle.consumed(), seq
+
+    rows = 0
+    records = 0
+    written_offset = handle.offset
+
+    def write_batch(item):
+        nonlocal rows, reported_bytes, written_offset
+        batch, parsed, rejects, offset, consumed, last_seq = item
+        counts = {"bytes_processed": consumed - reported_bytes}
+        values = {}
+        # Rejects reach the disk before the batch commits. The checkpoint
+        # records the file's size with the offset, and a resumed job cuts the
+        # file back to it, so batches after the last flush are not listed twice.
+        if reject_writer:
+            reject_writer.write(rejects)
+        if checkpoint:
+            counts["checkpoint_batch"] = 1
+            values = {
+                "checkpoint_offset": offset,
+                "checkpoint_row": last_seq,
+                "checkpoint_rejects_bytes": reject_writer.size() if reject_writer else None,
+            }
+        seconds = _write_batch(
+            batch,
+            job,
+            load_batch,
+            tracker,
+            counts,
+            values,
+            collapsed=parsed - len(batch) - len(rejects),
+            rejected=len(rejects),
+            repeated=repeated,
         )
+        sizer.record(parsed, seconds, offset - written_offset)
+        rows += parsed
+        reported_bytes = consumed
+        written_offset = offset
 
-    except Exception as exc:
-        job.status = "failed"
-        job.error_message = str(exc)
+    # Parsing runs on a background thread while this one waits on the database.
+    try:
+        stats = run_pipeline(
+            parse_batches(), write_batch, current_app.config["IMPORT_PIPELINE_DEPTH"]
+        )
+        tracker.flush()
         db.session.commit()
+    finally:
+        if reject_writer:
+            reject_writer.close()
+    return rows, records, stats, sizer.stats()
 
-        dispatch_webhooks(
-            "product.import.failed",
-            {"job_id": job.job_id, "filename": job.filename, "error": str(exc)},
+
+def _write_batch(
+    batch: list[tuple],
+    job: ImportJob,
+    load_batch,
+    tracker: JobProgress,
+    counts: dict,
+    values: dict,
+    collapsed: int = 0,
+    rejected: int = 0,
+    repeated: frozenset = frozenset(),
+) -> float:
+    """Load and commit one batch; returns the seconds spent in the database."""
+    started = time.perf_counter()
+    # Sorting gives concurrent chunk writers a consistent row-lock order.
+    batch.sort(key=itemgetter(_SKU_NORMALIZED))
+    inserted_skus, updated_skus = load_batch(batch)
+    inserted, updated = len(inserted_skus), len(updated_skus)
+    if not job.preview and len(batch) > inserted + updated:
+        _stamp_unchanged(batch, {*inserted_skus, *updated_skus}, job, repeated)
+
+    # Progress is tracked in bytes consumed from the file, so no pre-scan is
+    # needed to know how far along the import is. The progress store adds
+    # the batch to job-wide totals shared by concurrent chunk tasks; the
+    # import_jobs row only catches up when the tracker flushes, and then in
+    # this transaction, so the checkpoint stays in step with products.
+    totals = tracker.add(
+        {
+            **counts,
+            "processed_rows": len(batch) + collapsed + rejected,
+            "rows_collapsed": collapsed,
+            "rows_rejected": rejected,
+            "rows_inserted": inserted,
+            "rows_updated": updated,
+            "rows_unchanged": len(batch) - inserted - updated,
+        },
+        values,
+    )
+    # Checked against the job-wide total so parallel chunks share one budget;
+    # the batch that crosses the threshold is rolled back with the failure.
+    if job.max_errors is not None and totals["rows_rejected"] > job.max_errors:
+        raise ValueError(
+            f"{totals['rows_rejected']} rows rejected, more than the allowed {job.max_errors}"
         )
-        raise
+    tracker.flush(force=False)
+    db.session.commit()
+    seconds = time.perf_counter() - started
+    publish_job(job)
+    if not job.preview:
+        _emit_batch_events(job, inserted_skus, updated_skus, totals)
+    return seconds
 
 
-def _count_rows(path: Path) -> int:
-    with path.open("r", encoding="utf-8") as handle:
-        return sum(1 for _ in handle) - 1  # discount header
+def _emit_batch_events(job: ImportJob, inserted_skus: list, updated_skus: list, totals: dict):
+    # Sent only once the batch is committed, so subscribers never hear about
+    # rows a rollback later takes back.
+    emit_product_changes(inserted_skus, updated_skus, source={"job_id": job.job_id})
+    emit_import_progress(job, {field: totals[field] for field in _PROGRESS_EVENT_FIELDS})
 
 
-def _transform_row(row: dict) -> dict:
-    sku = row.get("sku") or row.get("SKU") or row.get("Sku")
-    if not sku:
-        raise ValueError("SKU column is required")
+def _stamp_unchanged(batch: list[tuple], written: set, job: ImportJob, repeated: frozenset):
+    """
+    Bring the rows of ``batch`` the upsert skipped (SKUs not in ``written``)
+    up to date with ``job``. A sync needs its generation on all of them, or
+    it would treat them as missing. A chunk task also restamps the skipped
+    rows whose SKU occurs in an earlier chunk (``repeated``) with this job's
+    (job, seq): otherwise that earlier duplicate, landing later, would pass
+    the upsert's stamp guard and overwrite the row the file's last
+    occurrence left in place. Other rows cannot be overtaken and keep their
+    stamp, so an unchanged file writes nothing. One UPDATE does both.
+    """
+    chunked = (job.chunk_count or 1) > 1
+    if not job.sync_mode and not (chunked and repeated):
+        return
+    skipped = [row for row in batch if row[_SKU] not in written]
+    if not chunked:
+        _stamp_generation([row[_SKU_NORMALIZED] for row in skipped], job.id)
+        return
+    if not job.sync_mode:
+        skipped = [row for row in skipped if row[_SKU_NORMALIZED] in repeated]
+        if not skipped:
+            return
 
-    return {
-        "sku": sku.strip(),
-        "sku_normalized": Product.normalize_sku(sku),
-        "name": row.get("name") or row.get("Name") or "",
-        "description": row.get("description") or row.get("Description"),
-        "price": _safe_decimal(row.get("price") or row.get("Price")),
-        "is_active": _parse_bool(row.get("is_active") or row.get("active") or "true"),
+    stamps = values(
+        column("sku_normalized", String), column("import_seq", BigInteger), name="stamps"
+    ).data([(row[_SKU_NORMALIZED], row[_IMPORT_SEQ]) for row in skipped])
+    # Assigning updated_at to itself keeps its onupdate from firing: the
+    # product's content has not changed.
+    changes = {
+        Product.import_job_id: job.job_id,
+        Product.import_seq: stamps.c.import_seq,
+        Product.updated_at: Product.updated_at,
     }
+    if job.sync_mode:
+        changes[Product.sync_generation] = job.id
+    db.session.execute(
+        update(Product)
+        .where(
+            Product.sku_normalized == stamps.c.sku_normalized,
+            or_(
+                Product.import_job_id.is_distinct_from(job.job_id),
+                Product.import_seq < stamps.c.import_seq,
+            ),
+        )
+        .values(changes)
+        .execution_options(synchronize_session=False)
+    )
 
 
-def _upsert_batch(batch: list[dict]):
-    if not batch:
+def _stamp_generation(skus, generation: int):
+    # Written rows already carry the generation; rows the upsert skipped as
+    # unchanged still need it, or the sync would treat them as missing. Their
+    # content is untouched, so updated_at keeps its value.
+    db.session.execute(
+        update(Product)
+        .where(
+            Product.sku_normalized.in_(skus),
+            Product.sync_generation.is_distinct_from(generation),
+        )
+        .values(sync_generation=generation, updated_at=Product.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _complete_job(job: ImportJob):
+    # A preview stops once its rows are staged and diffed; nothing in
+    # products has changed, so no completion webhook goes out.
+    applying = job.status == "applying"
+    timings = {"apply" if applying else "load": _seconds_since(job.started_at)}
+    if not applying:
+        timings["queued"] = (job.started_at - job.created_at).total_seconds()
+    job.bytes_processed = job.bytes_total
+    if job.preview and not applying:
+        job.rows_inserted = 0
+        job.rows_updated = 0
+        job.rows_unchanged = 0
+        started = time.monotonic()
+        job.stats = {**(job.stats or {}), "preview": summarize_preview(job)}
+        timings["preview"] = time.monotonic() - started
+        _finish_job(job, "previewed", timings)
         return
 
-    stmt = insert(Product).values(batch)
+    retired_skus = []
+    if job.sync_mode:
+        started = time.monotonic()
+        retired_skus = _retire_missing_products(job)
+        timings["sync"] = time.monotonic() - started
+    _finish_job(job, "completed", timings)
+    if job.sync_mode == "delete":
+        emit_product_changes(deleted=retired_skus, source={"job_id": job.job_id})
+    else:
+        emit_product_changes(updated=retired_skus, source={"job_id": job.job_id})
 
+    dispatch_webhooks(
+        "product.import.completed",
+        {"job_id": job.job_id, "filename": job.filename},
+    )
+
+
+def _finish_job(job: ImportJob, status: str, timings: dict | None = None):
+    """Settle ``job`` in ``status``, adding this run's phase ``timings`` (seconds) to its stats."""
+    if timings:
+        stats = job.stats or {}
+        job.stats = {
+            **stats,
+            "timings": {
+                **stats.get("timings", {}),
+                **{phase: round(seconds, 3) for phase, seconds in timings.items()},
+            },
+        }
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    progress_store().clear(job.job_id)
+    publish_job(job)
+
+
+def _record_batching(job: ImportJob, phase: str, batching: dict):
+    stats = job.stats or {}
+    job.stats = {**stats, "batching": {**stats.get("batching", {}), phase: batching}}
+
+
+def _seconds_since(moment: datetime | None) -> float:
+    return (datetime.utcnow() - moment).total_seconds() if moment else 0.0
+
+
+def _retire_missing_products(job: ImportJob) -> list[str]:
+    """
+    Deactivate or delete every product the sync file did not contain: those
+    not stamped with this job's generation, in one set-based statement.
+    Products created after the upload are left alone. Returns the retired
+    SKUs, for the caller to announce once committed; without
+    ``products.changed`` subscribers they are not fetched at all.
+    """
+    if job.rows_rejected:
+        # A rejected row's SKU was never stamped; retiring now would drop it.
+        job.stats = {
+            **(job.stats or {}),
+            "sync": {"mode": job.sync_mode, "rows": 0, "skipped": "rows were rejected"},
+        }
+        return []
+
+    missing = (
+        Product.sync_generation.is_distinct_from(job.id),
+        Product.created_at < job.created_at,
+    )
+    if job.sync_mode == "delete":
+        statement = delete(Product).where(*missing)
+    else:
+        # Clearing row_hash makes the next import that lists the SKU again
+        # rewrite it (and so reactivate it) instead of skipping it as unchanged.
+        statement = (
+            update(Product)
+            .where(*missing, Product.is_active.is_(True))
+            .values(is_active=False, row_hash=None, updated_at=datetime.utcnow())
+        )
+    statement = statement.execution_options(synchronize_session=False)
+    if has_subscribers(CHANGES_EVENT):
+        retired_skus = db.session.scalars(statement.returning(Product.sku)).all()
+        retired = len(retired_skus)
+    else:
+        retired_skus = []
+        retired = db.session.execute(statement).rowcount
+    job.stats = {**(job.stats or {}), "sync": {"mode": job.sync_mode, "rows": retired}}
+    return retired_skus
+
+
+def _fail_job(job: ImportJob, error: str):
+    # Counters stay as of the last flush, which is also where the checkpoint
+    # points, so a resume picks up both from the same batch.
+    job.error_message = error
+    _finish_job(job, "failed")
+
+    dispatch_webhooks(
+        "product.import.failed",
+        {"job_id": job.job_id, "filename": job.filename, "error": error},
+    )
+
+
+def _compile_transform(
+    header: list[str], column_mapping: dict | None, job_id: str, generation: int | None = None
+):
+    """
+    Resolve the header once and return ``transform(row, seq)``, which turns a
+    ``csv.reader`` row into a tuple ordered like ``ROW_COLUMNS``.
+    """
+    columns = resolve_columns(header, column_mapping)
+    sku_at = columns["sku"]
+    if sku_at is None:
+        raise ValueError("SKU column is required")
+    name_at = columns["name"]
+    description_at = columns["description"]
+    price_at = columns["price"]
+    active_at = columns["is_active"]
+    width = len(header)
+
+    def transform(row: list[str], seq: int) -> tuple:
+        if len(row) < width:
+            row += [""] * (width - len(row))
+
+        sku = row[sku_at].strip()
+        if not sku:
+            raise ValueError("SKU column is required")
+        if len(sku) > _SKU_MAX_LENGTH:
+            raise ValueError(f"SKU is longer than {_SKU_MAX_LENGTH} characters")
+
+        name = row[name_at] if name_at is not None else ""
+        if len(name) > _NAME_MAX_LENGTH:
+            raise ValueError(f"name is longer than {_NAME_MAX_LENGTH} characters")
+        description = (row[description_at] or None) if description_at is not None else None
+        price = _parse_price(row[price_at]) if price_at is not None else None
+        is_active = _parse_bool(row[active_at] or "true") if active_at is not None else True
+
+        return (
+            sku,
+            sku.lower(),  # Product.normalize_sku on an already stripped value
+            name,
+            description,
+            price,
+            is_active,
+            Product.compute_row_hash(sku, name, description, price, is_active),
+            job_id,
+            seq,
+            generation,
+        )
+
+    return transform
+
+
+def build_row(
+    sku: str,
+    name: str,
+    description,
+    price,
+    is_active: bool,
+    job_id: str,
+    seq: int,
+    generation: int | None = None,
+) -> tuple:
+    """Assemble a ``ROW_COLUMNS`` tuple from field values validated by the caller."""
+    sku = sku.strip()
+    return (
+        sku,
+        Product.normalize_sku(sku),
+        name,
+        description,
+        price,
+        is_active,
+        Product.compute_row_hash(sku, name, description, price, is_active),
+        job_id,
+        seq,
+        generation,
+    )
+
+
+def find_completed_import(job: ImportJob) -> ImportJob | None:
+    """The latest completed import of the same file content with the same options as ``job``."""
+    candidates = (
+        ImportJob.query.filter_by(content_sha256=job.content_sha256, status="completed")
+        .order_by(ImportJob.created_at.desc())
+        .all()
+    )
+    # A sync run retires SKUs a plain import leaves alone, so it only matches its own kind.
+    return next(
+        (
+            candidate
+            for candidate in candidates
+            if candidate.column_mapping == job.column_mapping
+            and candidate.sync_mode == job.sync_mode
+        ),
+        None,
+    )
+
+
+def check_product_fields(sku: str, name: str, price) -> Decimal | None:
+    """
+    Apply the CSV import's limits to fields from another source: SKU and
+    name lengths, and a finite price that fits the column. Returns the
+    parsed price; raises ``ValueError`` like a rejected CSV row.
+    """
+    if len(sku) > _SKU_MAX_LENGTH:
+        raise ValueError(f"SKU is longer than {_SKU_MAX_LENGTH} characters")
+    if len(name) > _NAME_MAX_LENGTH:
+        raise ValueError(f"name is longer than {_NAME_MAX_LENGTH} characters")
+    return _parse_price(None if price is None else str(price))
+
+
+def upsert_rows(batch: list[tuple]) -> tuple[list[str], list[str], int]:
+    """
+    Upsert ``ROW_COLUMNS`` tuples outside an import job and return
+    ``(inserted_skus, updated_skus, collapsed)``, where ``collapsed`` counts
+    rows dropped because a later row in the batch had the same SKU. The
+    caller owns the transaction.
+    """
+    rows = list({row[_SKU_NORMALIZED]: row for row in batch}.values())
+    rows.sort(key=itemgetter(_SKU_NORMALIZED))
+    inserted, updated = _upsert_batch(rows)
+    return inserted, updated, len(batch) - len(rows)
+
+
+# Loaders take a batch of ROW_COLUMNS tuples and return the SKUs they
+# inserted and updated; rows skipped as unchanged appear in neither list.
+
+
+def _upsert_batch(batch: list[tuple]) -> tuple[list[str], list[str]]:
+    if not batch:
+        return [], []
+
+    stmt = insert(Product).values([dict(zip(ROW_COLUMNS, row)) for row in batch])
+    return _split_written(db.session.execute(_on_conflict_merge(stmt)))
+
+
+def _merge_staged(window: list) -> tuple[list[str], list[str]]:
+    """Upsert the ``import_staging`` rows matching ``window`` with one INSERT ... SELECT."""
+    now = literal(datetime.utcnow(), DateTime)
+    source = select(
+        *(getattr(ImportStaging, column) for column in ROW_COLUMNS),
+        now.label("created_at"),
+        now.label("updated_at"),
+    ).where(*window)
+    stmt = insert(Product).from_select([*ROW_COLUMNS, "created_at", "updated_at"], source)
+    return _split_written(db.session.execute(_on_conflict_merge(stmt)))
+
+
+def _split_written(result) -> tuple[list[str], list[str]]:
+    inserted, updated = [], []
+    for sku, was_inserted in result:
+        (inserted if was_inserted else updated).append(sku)
+    return inserted, updated
+
+
+def _on_conflict_merge(stmt):
     update_cols = {
         "sku": stmt.excluded.sku,
         "name": stmt.excluded.name,
@@ -112,22 +976,168 @@ def _upsert_batch(batch: list[dict]):
         "price": stmt.excluded.price,
         "is_active": stmt.excluded.is_active,
         "sku_normalized": stmt.excluded.sku_normalized,
+        "row_hash": stmt.excluded.row_hash,
+        "import_job_id": stmt.excluded.import_job_id,
+        "import_seq": stmt.excluded.import_seq,
+        # Only a sync run stamps a generation; any other write keeps the
+        # product's, or the next sync would see it as missing.
+        "sync_generation": func.coalesce(stmt.excluded.sync_generation, Product.sync_generation),
+        "updated_at": stmt.excluded.updated_at,
     }
 
+    # Rows whose content hash matches are left alone: no new tuple, no WAL.
+    # They keep their previous (job, seq) stamp here; chunked imports restamp
+    # those a duplicate in another chunk could overtake in _stamp_unchanged,
+    # so the last row in the file still wins.
     stmt = stmt.on_conflict_do_update(
         index_elements=["sku_normalized"],
         set_=update_cols,
-    )
+        where=and_(
+            Product.row_hash.is_distinct_from(stmt.excluded.row_hash),
+            or_(
+                Product.import_job_id.is_distinct_from(stmt.excluded.import_job_id),
+                Product.import_seq < stmt.excluded.import_seq,
+            ),
+        ),
+    ).returning(Product.sku, literal_column("xmax = 0", Boolean))
+    return stmt
+
 
+def _stage_batch(batch: list[tuple]) -> tuple[list[str], list[str]]:
+    # A preview writes to import_staging instead of products. Staging keeps
+    # one row per SKU with the same last-in-file-wins rule; the diff is taken
+    # once everything is staged, so nothing counts as written here.
+    if not batch:
+        return [], []
+
+    stmt = insert(ImportStaging).values([dict(zip(ROW_COLUMNS, row)) for row in batch])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_import_staging_job_sku",
+        set_={
+            column: stmt.excluded[column]
+            for column in ROW_COLUMNS
+            if column not in ("sku_normalized", "import_job_id")
+        },
+        where=ImportStaging.import_seq < stmt.excluded.import_seq,
+    )
     db.session.execute(stmt)
-    db.session.commit()
+    return [], []
 
 
-def _safe_decimal(value):
+def _copy_batch(batch: list[tuple]) -> tuple[list[str], list[str]]:
+    if not batch:
+        return [], []
+
+    connection = db.session.connection()
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+            "sku varchar(128), sku_normalized varchar(128), name varchar(255), "
+            "description text, price numeric(12, 2), is_active boolean, row_hash varchar(32), "
+            "import_job_id varchar(36), import_seq bigint, sync_generation integer"
+            ") ON COMMIT DELETE ROWS"
+        )
+    )
+
+    cursor = connection.connection.cursor()
     try:
-        return Decimal(str(value)) if value not in (None, "", "null") else None
-    except Exception:
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(ROW_COLUMNS)}) FROM STDIN",
+            _copy_buffer(batch),
+        )
+    finally:
+        cursor.close()
+
+    written = connection.execute(
+        text(
+            "INSERT INTO products "
+            f"({', '.join(ROW_COLUMNS)}, created_at, updated_at) "
+            f"SELECT {', '.join(ROW_COLUMNS)}, "
+            "now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc' "
+            f"FROM {STAGING_TABLE} "
+            "ON CONFLICT (sku_normalized) DO UPDATE SET "
+            "sku = EXCLUDED.sku, name = EXCLUDED.name, description = EXCLUDED.description, "
+            "price = EXCLUDED.price, is_active = EXCLUDED.is_active, row_hash = EXCLUDED.row_hash, "
+            "import_job_id = EXCLUDED.import_job_id, import_seq = EXCLUDED.import_seq, "
+            "sync_generation = COALESCE(EXCLUDED.sync_generation, products.sync_generation), "
+            "updated_at = EXCLUDED.updated_at "
+            "WHERE products.row_hash IS DISTINCT FROM EXCLUDED.row_hash "
+            "AND (products.import_job_id IS DISTINCT FROM EXCLUDED.import_job_id "
+            "OR products.import_seq < EXCLUDED.import_seq) "
+            "RETURNING sku, (xmax = 0) AS inserted"
+        )
+    )
+    return _split_written(written)
+
+
+def _copy_buffer(batch: list[tuple]) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in batch:
+        buffer.write("\t".join(map(_copy_value, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _batch_sizer(params_per_row: int | None = None) -> BatchSizer:
+    config = current_app.config
+    return BatchSizer(
+        config["IMPORT_BATCH_SIZE"],
+        config["IMPORT_BATCH_TARGET_SECONDS"],
+        config["IMPORT_BATCH_MAX_BYTES"],
+        params_per_row,
+    )
+
+
+def _params_per_row(load_batch) -> int | None:
+    # COPY streams rows as data, so only the VALUES loaders are bound by
+    # the parameter limit.
+    if load_batch is _upsert_batch:
+        return UPSERT_PARAMS_PER_ROW
+    if load_batch is _stage_batch:
+        return len(ImportStaging.__table__.columns)
+    return None
+
+
+def _select_loader(job: ImportJob):
+    if job.preview:
+        return _stage_batch
+    return _copy_batch if job.load_mode == "copy" else _upsert_batch
+
+
+def _resolve_load_mode(mode: str | None) -> str:
+    # COPY needs psycopg2's copy_expert; anything else takes the multi-VALUES upsert.
+    if mode == "copy" and db.engine.dialect.driver == "psycopg2":
+        return "copy"
+    return "insert"
+
+
+def _file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_DIGEST_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_price(value: str):
+    if not value or value == "null":
         return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid price: {value!r}") from None
+    if not price.is_finite() or abs(price) >= _PRICE_LIMIT:
+        raise ValueError(f"Price out of range: {value!r}")
+    return price
 
 
 def _parse_bool(value):
@@ -0,0 +1,237 @@
+import gzip
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from sqlalchemy import or_, update
+
+from ..celery_app import celery
+from ..extensions import db
+from ..models import Webhook, WebhookDelivery
+
+SWEEP_LIMIT = 500
+_SWEEP_BATCH = 50
+# A delivery claimed this long ago belongs to a worker that died mid-send.
+_SENDING_TIMEOUT = timedelta(minutes=5)
+
+_session = None
+
+
+def http_session() -> requests.Session:
+    """
+    Process-wide session, so deliveries reuse keep-alive connections (and TLS
+    sessions) per host instead of a new handshake per call. Created on first
+    use, so each forked worker process gets its own pool.
+    """
+    global _session
+    if _session is None:
+        size = current_app.config["WEBHOOK_CONCURRENCY"]
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
+
+@celery.task(name="deliver_webhooks")
+def deliver_webhooks(delivery_ids: list[int]):
+    """
+    Send the given deliveries concurrently and record each attempt. Failures
+    are rescheduled with exponential backoff until ``WEBHOOK_MAX_ATTEMPTS``;
+    an endpoint that keeps failing has its circuit opened, which defers its
+    deliveries (without spending attempts) while the others go out as usual.
+    """
+    deliveries = _claim(delivery_ids)
+    if not deliveries:
+        return []
+
+    config = current_app.config
+    now = datetime.utcnow()
+    webhooks = {
+        webhook.id: webhook
+        for webhook in Webhook.query.filter(
+            Webhook.id.in_({delivery.webhook_id for delivery in deliveries})
+        )
+    }
+
+    ready = []
+    deferred = []
+    for delivery in deliveries:
+        webhook = webhooks.get(delivery.webhook_id)
+        if webhook is None or not webhook.is_enabled:
+            delivery.status = "cancelled"
+        elif webhook.circuit_open_until and webhook.circuit_open_until > now:
+            delivery.status = "retrying"
+            delivery.next_attempt_at = webhook.circuit_open_until
+            deferred.append(delivery)
+        else:
+            ready.append((delivery, webhook))
+
+    # Only plain values cross into the sender threads; the ORM objects stay here.
+    requests_out = [(webhook.url, *_encode(delivery, webhook)) for delivery, webhook in ready]
+    session = http_session()
+    timeout = config["WEBHOOK_TIMEOUT"]
+    workers = max(1, min(len(requests_out), config["WEBHOOK_CONCURRENCY"]))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda request: _send(session, *request, timeout), requests_out))
+
+    for (delivery, webhook), (status_code, latency_ms, error) in zip(ready, results):
+        _record_attempt(delivery, webhook, status_code, latency_ms, error, now)
+        if delivery.status == "retrying":
+            deferred.append(delivery)
+    db.session.commit()
+
+    _schedule(deferred, now)
+    return [delivery.id for delivery in deliveries if delivery.status == "delivered"]
+
+
+@celery.task(name="retry_webhook_deliveries")
+def retry_webhook_deliveries():
+    """
+    Safety net for the countdown retries: resend deliveries that are due but
+    whose message was lost, plus any stuck in ``sending`` by a dead worker.
+    """
+    now = datetime.utcnow()
+    db.session.execute(
+        update(WebhookDelivery)
+        .where(
+            WebhookDelivery.status == "sending",
+            WebhookDelivery.updated_at < now - _SENDING_TIMEOUT,
+        )
+        .values(status="retrying", next_attempt_at=now, updated_at=now)
+    )
+    db.session.commit()
+
+    due = (
+        db.session.query(WebhookDelivery.id)
+        .filter(
+            WebhookDelivery.status.in_(("pending", "retrying")),
+            or_(WebhookDelivery.next_attempt_at.is_(None), WebhookDelivery.next_attempt_at <= now),
+        )
+        .order_by(WebhookDelivery.id)
+        .limit(SWEEP_LIMIT)
+        .all()
+    )
+    ids = [delivery_id for (delivery_id,) in due]
+    for start in range(0, len(ids), _SWEEP_BATCH):
+        deliver_webhooks.delay(ids[start : start + _SWEEP_BATCH])
+    return len(ids)
+
+
+def _claim(delivery_ids: list[int]) -> list[WebhookDelivery]:
+    # A due delivery can be reached by both its countdown task and the sweep;
+    # the conditional update lets exactly one of them send it.
+    now = datetime.utcnow()
+    claimed = (
+        db.session.execute(
+            update(WebhookDelivery)
+            .where(
+                WebhookDelivery.id.in_(delivery_ids),
+                WebhookDelivery.status.in_(("pending", "retrying")),
+                or_(
+                    WebhookDelivery.next_attempt_at.is_(None),
+                    WebhookDelivery.next_attempt_at <= now,
+                ),
+            )
+            .values(status="sending", updated_at=now)
+            .returning(WebhookDelivery.id)
+        )
+        .scalars()
+        .all()
+    )
+    db.session.commit()
+    if not claimed:
+        return []
+    return WebhookDelivery.query.filter(WebhookDelivery.id.in_(claimed)).all()
+
+
+def _encode(delivery: WebhookDelivery, webhook: Webhook) -> tuple[bytes, dict]:
+    # Retries can repeat a delivery, so receivers get an id to deduplicate on.
+    headers = {
+        "Content-Type": "application/json",
+        "X-Webhook-Event": delivery.event_type,
+        "X-Webhook-Delivery": str(delivery.id),
+    }
+    body = json.dumps(delivery.payload, separators=(",", ":")).encode("utf-8")
+    if webhook.gzip:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def _send(
+    session: requests.Session, url: str, body: bytes, headers: dict, timeout: float
+) -> tuple[int | None, int, str | None]:
+    start = time.perf_counter()
+    try:
+        response = session.post(url, data=body, headers=headers, timeout=timeout)
+    except requests.RequestException as exc:
+        return None, int((time.perf_counter() - start) * 1000), str(exc)
+    latency_ms = int((time.perf_counter() - start) * 1000)
+    error = None if 200 <= response.status_code < 300 else f"HTTP {response.status_code}"
+    return response.status_code, latency_ms, error
+
+
+def _record_attempt(
+    delivery: WebhookDelivery,
+    webhook: Webhook,
+    status_code: int | None,
+    latency_ms: int,
+    error: str | None,
+    now: datetime,
+):
+    config = current_app.config
+    delivery.attempts += 1
+    delivery.response_code = status_code
+    delivery.latency_ms = latency_ms
+    delivery.error = error
+    delivery.next_attempt_at = None
+    webhook.last_response_code = status_code
+    webhook.last_response_ms = latency_ms
+
+    # Any answer other than a timeout, 429 or 5xx shows the receiver is up:
+    # a 2xx is delivered, and other 4xx responses will not improve on retry.
+    if error is None or not _is_retryable(status_code):
+        webhook.consecutive_failures = 0
+        webhook.circuit_open_until = None
+        if error is None:
+            delivery.status = "delivered"
+            delivery.delivered_at = now
+        else:
+            delivery.status = "failed"
+        return
+
+    webhook.consecutive_failures += 1
+    if webhook.consecutive_failures >= config["WEBHOOK_BREAKER_THRESHOLD"]:
+        webhook.circuit_open_until = now + timedelta(seconds=config["WEBHOOK_BREAKER_COOLDOWN"])
+
+    if delivery.attempts >= config["WEBHOOK_MAX_ATTEMPTS"]:
+        delivery.status = "failed"
+        return
+    backoff = min(
+        config["WEBHOOK_RETRY_MAX"], config["WEBHOOK_RETRY_BASE"] * 2 ** (delivery.attempts - 1)
+    )
+    # Jitter spreads out retries of deliveries that failed together.
+    retry_at = now + timedelta(seconds=backoff * random.uniform(1.0, 1.25))
+    delivery.status = "retrying"
+    delivery.next_attempt_at = max(retry_at, webhook.circuit_open_until or retry_at)
+
+
+def _is_retryable(status_code: int | None) -> bool:
+    return status_code is None or status_code >= 500 or status_code in (408, 429)
+
+
+def _schedule(deliveries: list[WebhookDelivery], now: datetime):
+    # Eager mode would run a countdown task at once; there the beat sweep
+    # picks retries up when they fall due.
+    if celery.conf.task_always_eager:
+        return
+    for delivery in deliveries:
+        countdown = max(0, (delivery.next_attempt_at - now).total_seconds())
+        deliver_webhooks.apply_async(args=[[delivery.id]], countdown=countdown)
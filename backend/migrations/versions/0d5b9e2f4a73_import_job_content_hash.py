@@ -0,0 +1,30 @@
+"""import job content hash
+
+Revision ID: 0d5b9e2f4a73
+Revises: 71f0e3a8c2d5
+Create Date: 2026-10-18 17:02:58.613054
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d5b9e2f4a73'
+down_revision = '71f0e3a8c2d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('duplicate_of', sa.String(length=36), nullable=True))
+        batch_op.create_index(batch_op.f('ix_import_jobs_content_sha256'), ['content_sha256'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_import_jobs_content_sha256'))
+        batch_op.drop_column('duplicate_of')
+        batch_op.drop_column('content_sha256')
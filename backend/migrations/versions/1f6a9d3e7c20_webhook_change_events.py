@@ -0,0 +1,32 @@
+"""webhook change events
+
+Revision ID: 1f6a9d3e7c20
+Revises: e5b8c3a1d964
+Create Date: 2026-10-18 23:41:52.370846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6a9d3e7c20'
+down_revision = 'e5b8c3a1d964'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress_notified_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('webhooks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('gzip', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('webhooks', schema=None) as batch_op:
+        batch_op.drop_column('gzip')
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('progress_notified_at')
@@ -0,0 +1,32 @@
+"""import job error policy
+
+Revision ID: 2b9e4f1a6c38
+Revises: f3a7d2c6b851
+Create Date: 2026-10-18 21:48:09.531274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b9e4f1a6c38'
+down_revision = 'f3a7d2c6b851'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_rejected', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('error_policy', sa.String(length=16), server_default='fail_fast', nullable=False))
+        batch_op.add_column(sa.Column('max_errors', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('reject_file_path', sa.String(length=512), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('reject_file_path')
+        batch_op.drop_column('max_errors')
+        batch_op.drop_column('error_policy')
+        batch_op.drop_column('rows_rejected')
@@ -0,0 +1,34 @@
+"""chunked imports
+
+Revision ID: 3f6b2c9d1e47
+Revises: 8c1d4e7a9b02
+Create Date: 2026-10-18 10:04:17.552391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6b2c9d1e47'
+down_revision = '8c1d4e7a9b02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chunk_count', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('import_job_id', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('import_seq', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('import_seq')
+        batch_op.drop_column('import_job_id')
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('chunk_count')
@@ -0,0 +1,69 @@
+"""product search indexes
+
+Revision ID: 4e8a1c7f2b93
+Revises: 9b2e6d0c3f18
+Create Date: 2026-10-18 18:47:05.316842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a1c7f2b93'
+down_revision = '9b2e6d0c3f18'
+branch_labels = None
+depends_on = None
+
+
+# Rows per backfill statement; each slice commits on its own.
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', sa.Text().with_variant(postgresql.TSVECTOR(), 'postgresql'), nullable=True))
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # The trigger fills search_vector for rows written from here on, so the
+    # backfill only has to catch up on rows that existed before it.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE TRIGGER products_search_vector_update '
+        'BEFORE INSERT OR UPDATE OF description ON products FOR EACH ROW '
+        "EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', description)"
+    )
+
+    # Outside the migration transaction: the backfill commits one id slice at
+    # a time instead of locking every row in one UPDATE, and the indexes are
+    # built concurrently, without blocking writes to products.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text('SELECT max(id) FROM products')).scalar() or 0
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    "UPDATE products SET search_vector = to_tsvector('pg_catalog.english', coalesce(description, '')) "
+                    'WHERE id >= :start AND id < :end AND search_vector IS NULL'
+                ),
+                {'start': start, 'end': start + BACKFILL_BATCH_SIZE},
+            )
+
+        op.create_index('ix_products_sku_normalized_trgm', 'products', ['sku_normalized'], unique=False, postgresql_using='gin', postgresql_ops={'sku_normalized': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_products_name_trgm', 'products', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS products_search_vector_update ON products')
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_products_search_vector', table_name='products', postgresql_concurrently=True)
+            op.drop_index('ix_products_name_trgm', table_name='products', postgresql_concurrently=True)
+            op.drop_index('ix_products_sku_normalized_trgm', table_name='products', postgresql_concurrently=True)
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
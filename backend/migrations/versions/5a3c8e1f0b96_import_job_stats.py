@@ -0,0 +1,26 @@
+"""import job stats
+
+Revision ID: 5a3c8e1f0b96
+Revises: e2a94f6c7d51
+Create Date: 2026-10-18 13:52:09.770412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a3c8e1f0b96'
+down_revision = 'e2a94f6c7d51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stats', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('stats')
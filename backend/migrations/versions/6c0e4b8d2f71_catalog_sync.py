@@ -0,0 +1,32 @@
+"""catalog sync
+
+Revision ID: 6c0e4b8d2f71
+Revises: d18f5c2a7e09
+Create Date: 2026-10-18 20:36:44.190528
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c0e4b8d2f71'
+down_revision = 'd18f5c2a7e09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_generation', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_mode', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('sync_mode')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('sync_generation')
@@ -0,0 +1,36 @@
+"""product row hash
+
+Revision ID: 71f0e3a8c2d5
+Revises: c94d1b7e2a60
+Create Date: 2026-10-18 16:20:31.487209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71f0e3a8c2d5'
+down_revision = 'c94d1b7e2a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('row_hash', sa.String(length=32), nullable=True))
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_inserted', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rows_updated', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rows_unchanged', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('rows_unchanged')
+        batch_op.drop_column('rows_updated')
+        batch_op.drop_column('rows_inserted')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('row_hash')
@@ -0,0 +1,26 @@
+"""import job finished_at
+
+Revision ID: 7c4e2b9a1d35
+Revises: 1f6a9d3e7c20
+Create Date: 2026-10-18 23:58:14.602913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2b9a1d35'
+down_revision = '1f6a9d3e7c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('finished_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('finished_at')
@@ -0,0 +1,49 @@
+"""import preview staging
+
+Revision ID: 7d4c1e9a3b52
+Revises: 2b9e4f1a6c38
+Create Date: 2026-10-18 22:31:40.118562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4c1e9a3b52'
+down_revision = '2b9e4f1a6c38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_staging',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('sku', sa.String(length=128), nullable=False),
+    sa.Column('sku_normalized', sa.String(length=128), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('row_hash', sa.String(length=32), nullable=True),
+    sa.Column('import_job_id', sa.String(length=36), nullable=False),
+    sa.Column('import_seq', sa.BigInteger(), nullable=True),
+    sa.Column('sync_generation', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('import_job_id', 'sku_normalized', name='uq_import_staging_job_sku')
+    )
+    with op.batch_alter_table('import_staging', schema=None) as batch_op:
+        batch_op.create_index('ix_import_staging_import_job_id_id', ['import_job_id', 'id'], unique=False)
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('preview', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('preview')
+
+    with op.batch_alter_table('import_staging', schema=None) as batch_op:
+        batch_op.drop_index('ix_import_staging_import_job_id_id')
+
+    op.drop_table('import_staging')
@@ -0,0 +1,26 @@
+"""import job load mode
+
+Revision ID: 8c1d4e7a9b02
+Revises: 205f2a33476d
+Create Date: 2026-10-18 09:12:41.318275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d4e7a9b02'
+down_revision = '205f2a33476d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('load_mode', sa.String(length=16), server_default='insert', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('load_mode')
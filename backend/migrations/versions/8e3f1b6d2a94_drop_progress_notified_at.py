@@ -0,0 +1,26 @@
+"""drop import job progress_notified_at
+
+Revision ID: 8e3f1b6d2a94
+Revises: 7c4e2b9a1d35
+Create Date: 2026-10-18 23:59:31.184520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3f1b6d2a94'
+down_revision = '7c4e2b9a1d35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('progress_notified_at')
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress_notified_at', sa.DateTime(), nullable=True))
@@ -0,0 +1,39 @@
+"""upload sessions
+
+Revision ID: 9b2e6d0c3f18
+Revises: 0d5b9e2f4a73
+Create Date: 2026-10-18 18:14:20.935518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e6d0c3f18'
+down_revision = '0d5b9e2f4a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=True),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('file_path', sa.String(length=512), nullable=False),
+    sa.Column('expected_size', sa.BigInteger(), nullable=True),
+    sa.Column('received_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('last_chunk', sa.Integer(), nullable=True),
+    sa.Column('options', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=32), nullable=False),
+    sa.Column('job_id', sa.String(length=36), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+
+
+def downgrade():
+    op.drop_table('upload_sessions')
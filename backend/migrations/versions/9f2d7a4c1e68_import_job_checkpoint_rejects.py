@@ -0,0 +1,26 @@
+"""import job checkpoint_rejects_bytes
+
+Revision ID: 9f2d7a4c1e68
+Revises: 8e3f1b6d2a94
+Create Date: 2026-10-18 23:59:44.507219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f2d7a4c1e68'
+down_revision = '8e3f1b6d2a94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checkpoint_rejects_bytes', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('checkpoint_rejects_bytes')
@@ -0,0 +1,28 @@
+"""import job counters at run start
+
+Revision ID: a3c5e8f1b274
+Revises: 9f2d7a4c1e68
+Create Date: 2026-10-18 23:59:52.830164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e8f1b274'
+down_revision = '9f2d7a4c1e68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_at_start', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('bytes_at_start', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('bytes_at_start')
+        batch_op.drop_column('rows_at_start')
@@ -0,0 +1,28 @@
+"""product keyset indexes
+
+Revision ID: a6d3f9b1e054
+Revises: 4e8a1c7f2b93
+Create Date: 2026-10-18 19:21:48.602117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f9b1e054'
+down_revision = '4e8a1c7f2b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_is_active_created_at_id', ['is_active', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_is_active_created_at_id')
+        batch_op.drop_index('ix_products_created_at_id')
@@ -0,0 +1,30 @@
+"""import job byte progress
+
+Revision ID: b7e0a5d43c18
+Revises: 3f6b2c9d1e47
+Create Date: 2026-10-18 11:26:03.904112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e0a5d43c18'
+down_revision = '3f6b2c9d1e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bytes_total', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('bytes_processed', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('started_at')
+        batch_op.drop_column('bytes_processed')
+        batch_op.drop_column('bytes_total')
@@ -0,0 +1,34 @@
+"""import job checkpoints
+
+Revision ID: c94d1b7e2a60
+Revises: 5a3c8e1f0b96
+Create Date: 2026-10-18 15:08:44.126930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c94d1b7e2a60'
+down_revision = '5a3c8e1f0b96'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checkpoint_offset', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_row', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_batch', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_import_jobs_status_heartbeat_at', ['status', 'heartbeat_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_import_jobs_status_heartbeat_at')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('checkpoint_batch')
+        batch_op.drop_column('checkpoint_row')
+        batch_op.drop_column('checkpoint_offset')
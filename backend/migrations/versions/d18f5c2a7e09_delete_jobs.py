@@ -0,0 +1,41 @@
+"""delete jobs
+
+Revision ID: d18f5c2a7e09
+Revises: a6d3f9b1e054
+Create Date: 2026-10-18 19:58:12.774031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd18f5c2a7e09'
+down_revision = 'a6d3f9b1e054'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('delete_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(length=36), nullable=True),
+    sa.Column('status', sa.String(length=32), nullable=False),
+    sa.Column('filters', sa.JSON(), nullable=True),
+    sa.Column('skus', sa.JSON(), nullable=True),
+    sa.Column('strategy', sa.String(length=16), nullable=True),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('deleted_rows', sa.Integer(), nullable=False),
+    sa.Column('chunks_done', sa.Integer(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+
+
+def downgrade():
+    op.drop_table('delete_jobs')
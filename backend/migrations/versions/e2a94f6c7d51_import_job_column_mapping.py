@@ -0,0 +1,26 @@
+"""import job column mapping
+
+Revision ID: e2a94f6c7d51
+Revises: b7e0a5d43c18
+Create Date: 2026-10-18 12:41:55.210867
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a94f6c7d51'
+down_revision = 'b7e0a5d43c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('column_mapping', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('column_mapping')
@@ -0,0 +1,26 @@
+"""import job rows collapsed
+
+Revision ID: f3a7d2c6b851
+Revises: 6c0e4b8d2f71
+Create Date: 2026-10-18 21:05:37.842106
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7d2c6b851'
+down_revision = '6c0e4b8d2f71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_collapsed', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('rows_collapsed')
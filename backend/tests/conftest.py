@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import Webhook, WebhookDelivery
+from app.services.webhook_events import _subscriber_cache
+
+
+def pytest_collection_modifyitems(config, items):
+    # The import pipeline relies on ON CONFLICT ... RETURNING xmax, COPY and
+    # pg_trgm; without a PostgreSQL database those tests cannot run.
+    if os.getenv("TEST_DATABASE_URL", "").startswith("postgresql"):
+        return
+    skip = pytest.mark.skip(reason="set TEST_DATABASE_URL to a PostgreSQL database")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def _app(tmp_path_factory):
+    # Celery tasks bind to the app they were first registered with, so the
+    # whole session shares one.
+    app = create_app("testing")
+    app.config["UPLOAD_FOLDER"] = str(tmp_path_factory.mktemp("uploads"))
+    return app
+
+
+@pytest.fixture
+def app(_app):
+    with _app.app_context():
+        yield _app
+        db.session.remove()
+        # Emptying rather than dropping keeps a PostgreSQL schema (extensions,
+        # triggers) in place between tests.
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        _subscriber_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(name: str, lines: list[str]) -> str:
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n")
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def subscribe(app):
+    """Subscribe a webhook to an event; returns a reader for the payloads recorded for it."""
+
+    def subscribe(event_type: str):
+        webhook = Webhook(name=event_type, url="http://127.0.0.1:9/hook", event_type=event_type)
+        db.session.add(webhook)
+        db.session.commit()
+        _subscriber_cache.clear()
+        return lambda: [
+            delivery.payload
+            for delivery in WebhookDelivery.query.filter_by(webhook_id=webhook.id).order_by(
+                WebhookDelivery.id
+            )
+        ]
+
+    return subscribe
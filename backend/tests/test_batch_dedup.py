@@ -0,0 +1,47 @@
+from app.extensions import db
+from app.models import ImportJob
+from app.services.csv_chunks import open_csv
+from app.tasks.import_csv import ROW_COLUMNS, _import_rows
+
+SKU = ROW_COLUMNS.index("sku")
+NAME = ROW_COLUMNS.index("name")
+SEQ = ROW_COLUMNS.index("import_seq")
+
+
+def test_last_occurrence_wins_within_a_batch(app, write_csv, monkeypatch):
+    # Four rows per batch: the first holds A-1 twice (different case), the
+    # second repeats it again, which only the upsert's (job, seq) guard settles.
+    monkeypatch.setitem(app.config, "IMPORT_BATCH_SIZE", 4)
+    path = write_csv(
+        "dupes.csv",
+        [
+            "sku,name,description,price",
+            "A-1,First,,1",
+            "B-1,Bolt,,1",
+            "a-1,Second,,1",
+            "C-1,Cog,,1",
+            "A-1,Third,,1",
+        ],
+    )
+    job = ImportJob(filename="dupes.csv", file_path=path, status="processing", processed_rows=0)
+    db.session.add(job)
+    db.session.commit()
+
+    batches = []
+
+    def load_batch(batch):
+        batches.append([(row[SKU], row[NAME], row[SEQ]) for row in batch])
+        return [row[SKU] for row in batch], []
+
+    with open_csv(path) as handle:
+        rows, records, _, _ = _import_rows(handle, job, load_batch)
+
+    assert (rows, records) == (5, 5)
+    assert batches == [
+        [("a-1", "Second", 2), ("B-1", "Bolt", 1), ("C-1", "Cog", 3)],
+        [("A-1", "Third", 4)],
+    ]
+    db.session.refresh(job)
+    assert job.rows_collapsed == 1
+    assert job.rows_inserted == 4
+    assert job.processed_rows == 5
@@ -0,0 +1,76 @@
+from app.services.batch_sizer import MAX_BIND_PARAMETERS, BatchSizer, merge_batch_stats
+from app.tasks.import_csv import UPSERT_PARAMS_PER_ROW
+
+
+def test_size_moves_at_most_two_fold_per_batch():
+    sizer = BatchSizer(2000, target_seconds=1.0)
+
+    sizer.record(2000, 0.01)  # 200k rows/s would ask for 200,000 rows
+    assert sizer.size == 4000
+    sizer.record(4000, 0.01)
+    assert sizer.size == 8000
+
+    slow = BatchSizer(2000, target_seconds=1.0)
+    slow.record(2000, 100)  # 20 rows/s would ask for 20 rows
+    assert slow.size == 1000
+
+
+def test_size_never_drops_below_the_floor():
+    sizer = BatchSizer(2000, target_seconds=1.0)
+    for _ in range(10):
+        sizer.record(sizer.size, 100)
+    assert sizer.size == 100
+
+
+def test_bind_parameter_limit_caps_the_size():
+    sizer = BatchSizer(50_000, target_seconds=1.0, params_per_row=UPSERT_PARAMS_PER_ROW)
+    limit = MAX_BIND_PARAMETERS // UPSERT_PARAMS_PER_ROW
+
+    assert UPSERT_PARAMS_PER_ROW == 14
+    assert sizer.param_limit == limit == 4681
+    assert sizer.initial == limit
+    sizer.record(limit, 0.001)
+    assert sizer.size == limit
+
+
+def test_copy_has_no_parameter_limit():
+    sizer = BatchSizer(50_000, target_seconds=1.0)
+    assert sizer.param_limit is None
+    assert sizer.size == 50_000
+
+
+def test_max_bytes_caps_the_size_at_the_observed_row_width():
+    sizer = BatchSizer(2000, target_seconds=1.0, max_bytes=100_000)
+
+    sizer.record(2000, 0.01, nbytes=200_000)  # 100 bytes per row
+
+    assert sizer.size == 1000
+
+
+def test_throughput_is_smoothed_across_batches():
+    sizer = BatchSizer(1000, target_seconds=1.0)
+
+    sizer.record(1000, 1.0)  # 1000 rows/s
+    assert sizer.size == 1000
+    sizer.record(1000, 0.5)  # 2000 rows/s, averaged with the last: 1500
+    assert sizer.size == 1500
+    sizer.record(1500, 0.5)  # 3000 rows/s, averaged: 2250
+    assert sizer.size == 2250
+
+
+def test_stats_and_merge():
+    first = BatchSizer(1000, target_seconds=1.0)
+    first.record(1000, 1.0)
+    second = BatchSizer(1000, target_seconds=1.0)
+    second.record(500, 0.25)
+    second.record(0, 1.0)  # empty batches are ignored
+
+    merged = merge_batch_stats([first.stats(), None, second.stats()])
+
+    assert second.stats()["batches"] == 1
+    assert merged["batches"] == 2
+    assert merged["rows"] == 1500
+    assert merged["rows_per_second"] == 1200.0
+    assert merged["latency_ms_max"] == 1000.0
+    assert merged["history"] == [[1000, 1000.0], [500, 250.0]]
+    assert merge_batch_stats([None]) == {}
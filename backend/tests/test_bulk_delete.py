@@ -0,0 +1,64 @@
+from app.extensions import db
+from app.models import Product
+
+
+def _seed(*skus):
+    for sku in skus:
+        db.session.add(
+            Product(sku=sku, sku_normalized=Product.normalize_sku(sku), name=sku, is_active=True)
+        )
+    db.session.commit()
+
+
+def test_unknown_filter_is_rejected(client):
+    _seed("A-1", "A-2")
+    response = client.post("/api/products/bulk-delete", json={"activ": True})
+    assert response.status_code == 400
+    assert "activ" in response.get_json()["error"]
+    assert Product.query.count() == 2
+
+
+def test_unknown_query_argument_is_rejected(client):
+    _seed("A-1")
+    response = client.post("/api/products/bulk-delete?nmae=A")
+    assert response.status_code == 400
+    assert Product.query.count() == 1
+
+
+def test_empty_request_does_not_delete_everything(client):
+    _seed("A-1")
+    for body in ({}, {"sku": ""}):
+        assert client.post("/api/products/bulk-delete", json=body).status_code == 400
+    assert Product.query.count() == 1
+
+
+def test_all_cannot_be_combined_with_filters(client):
+    response = client.post("/api/products/bulk-delete", json={"all": True, "name": "A"})
+    assert response.status_code == 400
+
+
+def test_all_deletes_every_product(client):
+    _seed("A-1", "B-1")
+    response = client.post("/api/products/bulk-delete", json={"all": True})
+    assert response.status_code == 202
+    job = client.get(f"/api/products/bulk-delete/{response.get_json()['job_id']}").get_json()
+    assert job["status"] == "completed"
+    assert job["strategy"] == "truncate"
+    assert Product.query.count() == 0
+
+
+def test_filtered_delete_keeps_other_products(client):
+    _seed("A-1", "B-1")
+    response = client.post("/api/products/bulk-delete", json={"skus": ["a-1"]})
+    assert response.status_code == 202
+    assert [product.sku for product in Product.query.all()] == ["B-1"]
+
+
+def test_deleted_skus_are_announced(client, subscribe):
+    _seed("A-1", "B-1", "C-1")
+    changes = subscribe("products.changed")
+    client.post("/api/products/bulk-delete", json={"name": "A-1"})
+    client.post("/api/products/bulk-delete", json={"all": True})
+
+    assert [payload["deleted"] for payload in changes()] == [["A-1"], ["B-1", "C-1"]]
+    assert changes()[0]["source"]["bulk_delete"]
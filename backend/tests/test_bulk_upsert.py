@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+import pytest
+
+from app.api import products
+from app.models import ImportJob
+from app.services.bulk_upsert import clean_record
+
+
+def test_clean_record_applies_csv_defaults():
+    assert clean_record({"sku": " A-1 ", "price": 1.5}) == {
+        "sku": "A-1",
+        "name": "",
+        "description": None,
+        "price": Decimal("1.5"),
+        "is_active": True,
+    }
+
+
+@pytest.mark.parametrize(
+    "record, message",
+    [
+        ({"sku": "A" * 129}, "SKU is longer"),
+        ({"sku": "A-1", "name": "n" * 256}, "name is longer"),
+        ({"sku": "A-1", "price": float("nan")}, "out of range"),
+        ({"sku": "A-1", "price": float("inf")}, "out of range"),
+        ({"sku": "A-1", "price": "Infinity"}, "out of range"),
+        ({"sku": "A-1", "price": 10**10}, "out of range"),
+        ({"sku": "A-1", "price": "cheap"}, "Invalid price"),
+        ({"sku": "A-1", "price": True}, "must be a number"),
+    ],
+)
+def test_clean_record_rejects_values_the_columns_cannot_hold(record, message):
+    with pytest.raises(ValueError, match=message):
+        clean_record(record)
+
+
+def test_invalid_records_are_reported_as_row_errors(client):
+    response = client.post(
+        "/api/products/bulk-upsert",
+        json=[{"sku": "A-1", "price": "NaN"}, {"sku": "B" * 200}],
+    )
+    assert response.status_code == 200
+    assert [error["index"] for error in response.get_json()["errors"]] == [0, 1]
+
+
+def test_background_upsert_job_takes_the_configured_error_policy(app, client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(products.import_products_job, "delay", lambda job_id: queued.append(job_id))
+    monkeypatch.setitem(app.config, "IMPORT_ERROR_POLICY", "skip")
+    monkeypatch.setitem(app.config, "IMPORT_MAX_ERRORS", 3)
+
+    response = client.post("/api/products/bulk-upsert?background=true", json=[{"sku": "A-1"}])
+
+    assert response.status_code == 202
+    job = ImportJob.query.filter_by(job_id=response.get_json()["job_id"]).one()
+    assert queued == [job.job_id]
+    assert (job.error_policy, job.max_errors) == ("skip", 3)
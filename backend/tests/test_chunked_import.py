@@ -0,0 +1,73 @@
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob, Product
+from app.services.csv_chunks import plan_chunks
+from app.tasks.import_csv import _repeated_skus, import_products_chunk
+
+pytestmark = pytest.mark.postgres
+
+
+def test_last_duplicate_wins_when_chunks_finish_out_of_order(app, write_csv, tmp_path):
+    # The file's last A-1 row matches what is stored, so its upsert is a no-op;
+    # the earlier A-1 row, in another chunk that lands afterwards, must not win.
+    kept = Product(sku="A-1", sku_normalized="a-1", name="Kept", price=1, is_active=True)
+    db.session.add(kept)
+    db.session.commit()
+    updated_at = kept.updated_at
+    filler = [f"F-{index},Filler {index},,2" for index in range(200)]
+    path = write_csv(
+        "dupes.csv",
+        ["sku,name,description,price", "A-1,Overwritten,,1", *filler, "A-1,Kept,,1"],
+    )
+    job = ImportJob(
+        filename="dupes.csv",
+        file_path=path,
+        status="processing",
+        chunk_count=2,
+        reject_file_path=str(tmp_path / "dupes.rejects.csv"),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    fieldnames, ranges = plan_chunks(path, 2)
+    assert len(ranges) == 2
+    repeated = _repeated_skus(path, fieldnames, ranges, None)
+    assert repeated == [[], ["a-1"]]
+    for (start, end), skus in reversed(list(zip(ranges, repeated))):
+        result = import_products_chunk(job.job_id, fieldnames, start, end, skus)
+        assert "error" not in result
+
+    db.session.expire_all()
+    product = Product.query.filter_by(sku_normalized="a-1").one()
+    assert product.name == "Kept"
+    assert product.import_job_id == job.job_id
+    assert product.updated_at == updated_at
+    assert Product.query.count() == 201
+
+
+def test_unchanged_rows_without_repeats_keep_their_stamp(app, write_csv, tmp_path):
+    # Re-importing an unchanged file in chunks must not rewrite its rows.
+    path = write_csv(
+        "catalog.csv",
+        ["sku,name,description,price", *(f"F-{index},Filler {index},,2" for index in range(200))],
+    )
+    first = ImportJob(filename="catalog.csv", file_path=path, status="processing", chunk_count=2)
+    db.session.add(first)
+    db.session.commit()
+    fieldnames, ranges = plan_chunks(path, 2)
+    for start, end in ranges:
+        import_products_chunk(first.job_id, fieldnames, start, end, [])
+    before = {product.sku: (product.import_job_id, product.updated_at) for product in Product.query}
+
+    second = ImportJob(filename="catalog.csv", file_path=path, status="processing", chunk_count=2)
+    db.session.add(second)
+    db.session.commit()
+    for start, end in ranges:
+        result = import_products_chunk(second.job_id, fieldnames, start, end, [])
+        assert "error" not in result
+
+    db.session.expire_all()
+    after = {product.sku: (product.import_job_id, product.updated_at) for product in Product.query}
+    assert after == before
+    assert set(job_id for job_id, _ in after.values()) == {first.job_id}
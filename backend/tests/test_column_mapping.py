@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import pytest
+
+from app.services.csv_columns import resolve_columns, validate_mapping
+from app.tasks.import_csv import ROW_COLUMNS, _compile_transform, build_row
+
+
+def _row(values: tuple) -> dict:
+    return dict(zip(ROW_COLUMNS, values))
+
+
+def test_headers_match_case_insensitively():
+    transform = _compile_transform([" SKU ", "Name", "DESCRIPTION", "Price", "Active"], None, "job")
+
+    row = _row(transform([" AB-1 ", "Widget", "", "9.50", "no"], 7))
+
+    assert row["sku"] == "AB-1"
+    assert row["sku_normalized"] == "ab-1"
+    assert row["name"] == "Widget"
+    assert row["description"] is None
+    assert row["price"] == Decimal("9.50")
+    assert row["is_active"] is False
+    assert (row["import_job_id"], row["import_seq"], row["sync_generation"]) == ("job", 7, None)
+
+
+@pytest.mark.parametrize(
+    "header, values, expected",
+    [
+        (["sku", "name", "Price EUR", "Price"], ["A-1", "Widget", "2", "3"], Decimal("2")),
+        (["sku", "name", "price"], ["A-1", "Widget", "3"], Decimal("3")),
+    ],
+)
+def test_mapping_lists_fall_back_in_order(header, values, expected):
+    transform = _compile_transform(header, {"price": ["Price EUR", "Price"], "sku": "SKU"}, "job")
+
+    assert _row(transform(values, 0))["price"] == expected
+
+
+def test_mapping_replaces_the_default_aliases():
+    mapping = {"sku": "Item_Code", "name": ["title"]}
+
+    columns = resolve_columns(["item_code", "sku", "title"], mapping)
+
+    assert columns == {"sku": 0, "name": 2, "description": None, "price": None, "is_active": None}
+
+
+def test_missing_required_column():
+    with pytest.raises(ValueError, match="SKU column is required"):
+        _compile_transform(["name", "price"], None, "job")
+    with pytest.raises(ValueError, match="SKU column is required"):
+        _compile_transform(["sku", "name"], {"sku": ["code", "item"]}, "job")
+
+
+def test_short_rows_and_blank_skus():
+    transform = _compile_transform(["sku", "name", "description", "price"], None, "job")
+
+    assert _row(transform(["A-1"], 0))["name"] == ""
+    with pytest.raises(ValueError, match="SKU column is required"):
+        transform(["  ", "Widget", "", "1"], 1)
+
+
+def test_build_row_matches_the_csv_transform():
+    header = ["sku", "name", "description", "price", "is_active"]
+    transform = _compile_transform(header, None, "job", 4)
+
+    parsed = transform([" AB-1", "Widget", "Blue", "9.50", "true"], 3)
+    built = build_row(" AB-1", "Widget", "Blue", Decimal("9.50"), True, "job", 3, 4)
+
+    assert built == parsed
+
+
+def test_validate_mapping():
+    assert validate_mapping({"price": ["Price EUR", "Price"], "sku": "Code"}) is None
+    assert validate_mapping(["sku"]).startswith("column_mapping must be an object")
+    assert validate_mapping({"cost": "Cost"}) == "Unknown field in column_mapping: cost"
+    assert validate_mapping({"price": [1]}) == (
+        "column_mapping.price must be a header name or list of names"
+    )
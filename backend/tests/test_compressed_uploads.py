@@ -0,0 +1,91 @@
+import csv
+import gzip
+import os
+import zipfile
+
+import pytest
+import zstandard
+
+from app.services.csv_chunks import is_compressed, is_supported_upload, open_csv, read_header
+
+ROWS = [["sku", "name", "description", "price"]] + [
+    [f"SKU-{index}", f"Item {index}", "two\nlines" if index % 7 == 0 else "", str(index)]
+    for index in range(500)
+]
+
+
+def _csv_bytes() -> bytes:
+    lines = [
+        ",".join(f'"{value}"' if "\n" in value else value for value in row) + "\r\n"
+        for row in ROWS
+    ]
+    return "".join(lines).encode("utf-8")
+
+
+def _write(tmp_path, kind: str) -> str:
+    data = _csv_bytes()
+    if kind == "gz":
+        path = tmp_path / "products.csv.gz"
+        path.write_bytes(gzip.compress(data))
+    elif kind == "zst":
+        path = tmp_path / "products.csv.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(data))
+    elif kind == "zip":
+        path = tmp_path / "products.zip"
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("products.csv", data)
+    else:
+        path = tmp_path / "products.csv"
+        path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("kind", ["csv", "gz", "zst", "zip"])
+def test_round_trip(tmp_path, kind):
+    path = _write(tmp_path, kind)
+
+    with open_csv(path) as handle:
+        rows = list(csv.reader(handle))
+        consumed = handle.consumed()
+
+    assert rows == ROWS
+    assert is_compressed(path) == (kind != "csv")
+    # Progress is measured against the stored file, compressed or not.
+    assert consumed == pytest.approx(os.path.getsize(path), rel=0.05)
+
+
+@pytest.mark.parametrize("kind", ["csv", "gz", "zst", "zip"])
+def test_resume_from_an_offset_inside_the_stream(tmp_path, kind):
+    path = _write(tmp_path, kind)
+    fieldnames, first_record = read_header(path)
+    assert fieldnames == ROWS[0]
+
+    # A checkpoint is the decompressed offset after the last written row.
+    with open_csv(path, first_record) as handle:
+        reader = csv.reader(handle)
+        for _ in range(100):
+            next(reader)
+        checkpoint = handle.offset
+
+    with open_csv(path, checkpoint) as handle:
+        rows = list(csv.reader(handle))
+
+    assert rows == ROWS[101:]
+
+
+def test_zip_must_hold_exactly_one_file(tmp_path):
+    path = tmp_path / "products.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("a.csv", "sku\nA-1\n")
+        archive.writestr("b.csv", "sku\nB-1\n")
+
+    with pytest.raises(ValueError, match="exactly one CSV file"):
+        open_csv(str(path))
+
+
+def test_supported_uploads():
+    assert is_supported_upload("Catalog.CSV.GZ")
+    assert is_supported_upload("catalog.zip")
+    assert is_supported_upload("catalog.csv.zst")
+    assert not is_supported_upload("catalog.xlsx")
+    assert not is_supported_upload("catalog.gz")
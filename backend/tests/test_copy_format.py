@@ -0,0 +1,67 @@
+import re
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.tasks.import_csv import ROW_COLUMNS, _copy_buffer, _copy_value, build_row
+
+NASTY = "tab\there, new\nline, cr\r, back\\slash, \\N literal, \\t literal"
+ROW_HASH = ROW_COLUMNS.index("row_hash")
+_UNESCAPES = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+
+
+def _parse_copy_line(line: str) -> list[str | None]:
+    # The reading side of PostgreSQL's COPY text format, for the escapes
+    # _copy_value produces.
+    return [
+        None if field == "\\N" else re.sub(r"\\[\\tnr]", lambda match: _UNESCAPES[match[0]], field)
+        for field in line.split("\t")
+    ]
+
+
+@pytest.mark.parametrize("value", [NASTY, "\\", "\t", "\n", "\r\n", "", "plain"])
+def test_text_survives_the_copy_format(value):
+    encoded = _copy_value(value)
+
+    assert "\t" not in encoded and "\n" not in encoded and "\r" not in encoded
+    assert _parse_copy_line(encoded) == [value]
+
+
+def test_null_is_not_confused_with_the_text_backslash_n():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value("\\N") == "\\\\N"
+    assert _parse_copy_line(_copy_value("\\N")) == ["\\N"]
+
+
+def test_buffer_writes_one_line_per_row():
+    first = build_row("A-1", NASTY, None, Decimal("9.50"), True, "job", 1)
+    second = build_row("B-1", "Plain", "two\nlines", None, False, "job", 2, 3)
+
+    lines = _copy_buffer([first, second]).getvalue().split("\n")
+
+    assert len(lines) == 3 and lines[-1] == ""
+    first_hash, second_hash = first[ROW_HASH], second[ROW_HASH]
+    assert _parse_copy_line(lines[0]) == [
+        "A-1", "a-1", NASTY, None, "9.50", "t", first_hash, "job", "1", None
+    ]
+    assert _parse_copy_line(lines[1]) == [
+        "B-1", "b-1", "Plain", "two\nlines", None, "f", second_hash, "job", "2", "3"
+    ]
+
+
+@pytest.mark.postgres
+def test_copy_round_trip_through_postgres(app):
+    connection = db.session.connection()
+    connection.exec_driver_sql("CREATE TEMP TABLE copy_check (value text) ON COMMIT DROP")
+    values = [NASTY, None, "\\N", "", "\\"]
+    buffer = _copy_buffer([(value,) for value in values])
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert("COPY copy_check (value) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+    assert [row[0] for row in connection.exec_driver_sql("SELECT value FROM copy_check")] == values
+    db.session.rollback()
@@ -0,0 +1,101 @@
+import csv
+
+from app.services.csv_chunks import open_chunk, plan_chunks, read_header
+
+
+def _write(tmp_path, data: bytes) -> str:
+    path = tmp_path / "products.csv"
+    path.write_bytes(data)
+    return str(path)
+
+
+def _read_chunks(path, ranges) -> list[list[str]]:
+    rows = []
+    for start, end in ranges:
+        with open_chunk(path, start, end) as handle:
+            rows.extend(csv.reader(handle))
+    return rows
+
+
+def _expected(data: bytes) -> list[list[str]]:
+    lines = data.decode("utf-8").splitlines(keepends=True)
+    return list(csv.reader(lines))[1:]
+
+
+def test_chunks_split_on_record_ends_around_quoted_newlines(tmp_path):
+    description = '"Line one\nline two, with a comma\nline ""three"""'
+    lines = [b"sku,name,description,price\n"]
+    for index in range(40):
+        lines.append(f"SKU-{index},Item {index},{description},{index}\n".encode())
+    data = b"".join(lines)
+    path = _write(tmp_path, data)
+
+    fieldnames, ranges = plan_chunks(path, 7)
+
+    assert fieldnames == ["sku", "name", "description", "price"]
+    assert len(ranges) > 1
+    assert _read_chunks(path, ranges) == _expected(data)
+
+
+def test_literal_quote_in_unquoted_field_does_not_shift_boundaries(tmp_path):
+    # One stray quote flips a naive quote count, after which every newline
+    # inside the quoted descriptions looks like a record end.
+    lines = [b"sku,name,description,price\n", b'TV-55,TV 55" screen,,499\n']
+    for index in range(40):
+        lines.append(f'SKU-{index},Item {index},"first\nsecond\nthird",{index}\n'.encode())
+    data = b"".join(lines)
+    path = _write(tmp_path, data)
+
+    _, ranges = plan_chunks(path, 5)
+
+    assert len(ranges) > 1
+    rows = _read_chunks(path, ranges)
+    assert rows == _expected(data)
+    assert rows[0][1] == 'TV 55" screen'
+    assert all(len(row) == 4 for row in rows)
+
+
+def test_crlf_line_endings(tmp_path):
+    lines = [b"sku,name,description,price\r\n"]
+    for index in range(30):
+        lines.append(f'SKU-{index},Item {index},"a\r\nb",{index}\r\n'.encode())
+    data = b"".join(lines)
+    path = _write(tmp_path, data)
+
+    fieldnames, ranges = plan_chunks(path, 4)
+
+    assert fieldnames == ["sku", "name", "description", "price"]
+    assert len(ranges) > 1
+    assert all(start < end for start, end in ranges)
+    assert _read_chunks(path, ranges) == _expected(data)
+
+
+def test_file_smaller_than_chunk_count(tmp_path):
+    data = b"sku,name,description,price\nA-1,Widget,,1\nA-2,Gadget,,2\n"
+    path = _write(tmp_path, data)
+
+    _, ranges = plan_chunks(path, 16)
+
+    assert len(ranges) <= 2
+    assert ranges[0][0] == data.index(b"A-1")
+    assert ranges[-1][1] == len(data)
+    assert _read_chunks(path, ranges) == [["A-1", "Widget", "", "1"], ["A-2", "Gadget", "", "2"]]
+
+
+def test_header_only_file_has_no_ranges(tmp_path):
+    path = _write(tmp_path, b"sku,name,description,price\n")
+
+    fieldnames, ranges = plan_chunks(path, 4)
+
+    assert fieldnames == ["sku", "name", "description", "price"]
+    assert ranges == []
+
+
+def test_read_header_returns_offset_of_first_record(tmp_path):
+    data = b'sku,"long\nname",price\nA-1,Widget,1\n'
+    path = _write(tmp_path, data)
+
+    fieldnames, offset = read_header(path)
+
+    assert fieldnames == ["sku", "long\nname", "price"]
+    assert offset == data.index(b"A-1")
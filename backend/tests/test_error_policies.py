@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob, Product
+from app.tasks.import_csv import import_products_job
+
+LINES = [
+    "sku,name,description,price",
+    "A-1,One,,1",
+    "A-2,Two,,not-a-price",
+    "A-3,Three,,3",
+    "A-4,Four,,-1e20",
+]
+
+
+def _run(write_csv, **options):
+    job = ImportJob(
+        filename="catalog.csv", file_path=write_csv("catalog.csv", LINES), **options
+    )
+    db.session.add(job)
+    db.session.commit()
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+    return job
+
+
+@pytest.mark.postgres
+def test_fail_fast_stops_at_the_first_bad_row(app, write_csv):
+    with pytest.raises(ValueError, match="Row 3: Invalid price"):
+        _run(write_csv, error_policy="fail_fast")
+    job = ImportJob.query.one()
+    assert job.status == "failed"
+    assert job.error_message.startswith("Row 3: Invalid price")
+    assert Product.query.count() == 0
+
+
+@pytest.mark.postgres
+def test_skip_rejects_bad_rows_and_loads_the_rest(app, write_csv):
+    job = _run(write_csv, error_policy="skip")
+    assert job.status == "completed"
+    assert (job.rows_inserted, job.rows_rejected) == (2, 2)
+    assert sorted(product.sku for product in Product.query) == ["A-1", "A-3"]
+
+
+@pytest.mark.postgres
+def test_max_errors_within_budget_completes(app, write_csv):
+    job = _run(write_csv, error_policy="skip", max_errors=2)
+    assert job.status == "completed"
+    assert job.rows_rejected == 2
+
+
+@pytest.mark.postgres
+def test_max_errors_over_budget_fails(app, write_csv):
+    with pytest.raises(ValueError, match="2 rows rejected, more than the allowed 1"):
+        _run(write_csv, error_policy="skip", max_errors=1)
+    job = ImportJob.query.one()
+    assert job.status == "failed"
+    # The batch that crossed the budget was rolled back with the failure.
+    assert Product.query.count() == 0
+
+
+@pytest.mark.parametrize(
+    "form, error",
+    [
+        ({"max_errors": "-1"}, "max_errors must be a non-negative integer"),
+        ({"max_errors": "many"}, "max_errors must be a non-negative integer"),
+        ({"error_policy": "ignore"}, "error_policy must be one of"),
+    ],
+)
+def test_upload_rejects_invalid_error_options(client, form, error):
+    response = client.post(
+        "/api/uploads/",
+        data={"file": (io.BytesIO(b"sku,name\n"), "catalog.csv"), **form},
+    )
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith(error)
+
+
+@pytest.mark.postgres
+def test_max_errors_defaults_the_policy_to_skip(client):
+    body = "\n".join(LINES).encode() + b"\n"
+    response = client.post(
+        "/api/uploads/",
+        data={"file": (io.BytesIO(body), "catalog.csv"), "max_errors": "5"},
+    )
+    job = client.get(f"/api/jobs/{response.get_json()['job_id']}").get_json()
+    assert (job["error_policy"], job["max_errors"]) == ("skip", 5)
+    assert (job["status"], job["rows_rejected"]) == ("completed", 2)
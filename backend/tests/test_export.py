@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models import Product
+
+
+@pytest.fixture
+def catalog(app, monkeypatch):
+    # A small batch size makes the export stream several chunks.
+    monkeypatch.setitem(app.config, "EXPORT_BATCH_SIZE", 2)
+    db.session.add_all(
+        [
+            Product(sku="A-1", sku_normalized="a-1", name="Widget", price=Decimal("9.99")),
+            Product(
+                sku="A-2",
+                sku_normalized="a-2",
+                name='Gadget, 55" wide',
+                description="two\nlines",
+                price=None,
+                is_active=False,
+            ),
+            Product(sku="B-1", sku_normalized="b-1", name="Bolt", price=Decimal("0.10")),
+        ]
+    )
+    db.session.commit()
+
+
+def _read(response) -> bytes:
+    assert response.status_code == 200
+    assert response.is_streamed
+    return b"".join(response.response)
+
+
+def test_csv_export_reimports_as_is(client, catalog):
+    response = client.get("/api/products/export")
+
+    body = _read(response)
+    assert response.mimetype == "text/csv"
+    assert "filename=products.csv" in response.headers["Content-Disposition"]
+    assert list(csv.reader(io.StringIO(body.decode("utf-8")))) == [
+        ["sku", "name", "description", "price", "is_active"],
+        ["A-1", "Widget", "", "9.99", "true"],
+        ["A-2", 'Gadget, 55" wide', "two\nlines", "", "false"],
+        ["B-1", "Bolt", "", "0.10", "true"],
+    ]
+
+
+def test_ndjson_export_with_fields(client, catalog):
+    response = client.get("/api/products/export?format=ndjson&fields=sku,price")
+
+    items = [json.loads(line) for line in _read(response).decode("utf-8").splitlines()]
+    assert response.mimetype == "application/x-ndjson"
+    assert [sorted(item) for item in items] == [["id", "price", "sku"]] * 3
+    assert [(item["sku"], item["price"]) for item in items] == [
+        ("A-1", 9.99),
+        ("A-2", None),
+        ("B-1", 0.1),
+    ]
+    assert [item["id"] for item in items] == sorted(item["id"] for item in items)
+
+
+def test_gzip_export(client, catalog):
+    response = client.get("/api/products/export?format=ndjson&gzip=true&fields=sku")
+
+    body = gzip.decompress(_read(response)).decode("utf-8")
+    assert response.mimetype == "application/gzip"
+    assert "filename=products.ndjson.gz" in response.headers["Content-Disposition"]
+    assert [json.loads(line)["sku"] for line in body.splitlines()] == ["A-1", "A-2", "B-1"]
+
+
+def test_filtered_export(client, catalog):
+    response = client.get("/api/products/export?sku=a-&is_active=true")
+
+    rows = list(csv.reader(io.StringIO(_read(response).decode("utf-8"))))
+    assert [row[0] for row in rows] == ["sku", "A-1"]
+
+
+@pytest.mark.parametrize("query", ["format=xml", "fields=cost"])
+def test_bad_export_parameters_are_a_400(client, query):
+    assert client.get(f"/api/products/export?{query}").status_code == 400
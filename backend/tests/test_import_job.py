@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from app.models import ImportJob
+
+
+def _resumed_job(**fields):
+    # Half the file was loaded by an earlier run; this one has run 10 s and
+    # loaded another quarter.
+    return ImportJob(
+        status="processing",
+        started_at=datetime.utcnow() - timedelta(seconds=10),
+        bytes_total=1000,
+        bytes_at_start=500,
+        bytes_processed=750,
+        rows_at_start=5000,
+        processed_rows=7500,
+        **fields,
+    )
+
+
+def test_eta_counts_only_this_runs_progress():
+    assert _resumed_job().eta_seconds() in (9, 10)
+
+
+def test_rows_per_second_counts_only_this_runs_rows():
+    assert 240 <= _resumed_job().rows_per_second() <= 250
+
+
+def test_no_eta_before_the_run_has_progressed():
+    job = _resumed_job()
+    job.bytes_processed = job.bytes_at_start
+    assert job.eta_seconds() is None
+    job.processed_rows = job.rows_at_start
+    assert job.rows_per_second() is None
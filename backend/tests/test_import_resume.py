@@ -0,0 +1,77 @@
+import csv
+
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob, Product
+from app.tasks.import_csv import import_products_job
+
+pytestmark = pytest.mark.postgres
+
+LINES = [
+    "sku,name,description,price",
+    "A-1,One,,bad",
+    "A-2,Two,,2",
+    "A-3,Three,,bad",
+    "A-4,Four,,4",
+]
+
+
+@pytest.fixture
+def small_batches(app, monkeypatch):
+    monkeypatch.setitem(app.config, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setitem(app.config, "IMPORT_PROGRESS_FLUSH_SECONDS", 0)
+
+
+def _job(write_csv, **options):
+    job = ImportJob(
+        filename="catalog.csv",
+        file_path=write_csv("catalog.csv", LINES),
+        error_policy="skip",
+        **options,
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _rejected_rows(job):
+    with open(job.reject_file_path, newline="") as handle:
+        return [row["_row"] for row in csv.DictReader(handle)]
+
+
+def test_resume_does_not_repeat_rejects(app, write_csv, small_batches):
+    # The second batch writes its reject, then fails on the error budget and
+    # rolls back; the checkpoint still points after the first batch.
+    job = _job(write_csv, max_errors=1)
+    with pytest.raises(ValueError, match="more than the allowed 1"):
+        import_products_job(job.job_id)
+    db.session.refresh(job)
+    assert job.status == "failed"
+    assert _rejected_rows(job) == ["2", "4"]
+
+    job.max_errors = None
+    db.session.commit()
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+
+    assert job.status == "completed"
+    assert _rejected_rows(job) == ["2", "4"]
+    assert job.rows_rejected == 2
+    assert sorted(product.sku for product in Product.query) == ["A-2", "A-4"]
+
+
+def test_import_falls_back_to_the_row_when_redis_is_down(app, write_csv, monkeypatch):
+    monkeypatch.setitem(app.config, "IMPORT_PROGRESS_URL", "redis://127.0.0.1:9/0")
+    job = _job(write_csv)
+
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+
+    assert job.status == "completed"
+    assert (job.processed_rows, job.rows_inserted, job.rows_rejected) == (4, 2, 2)
+    assert client_state(app, job)["processed_rows"] == 4
+
+
+def client_state(app, job):
+    return app.test_client().get(f"/api/jobs/{job.job_id}").get_json()
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from app.extensions import db
+from app.models import ImportJob
+from app.services.job_events import RedisJobEvents, job_events, job_version
+
+
+def _job(status="processing"):
+    job = ImportJob(filename="a.csv", file_path="a.csv", status=status)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _poll(client, job, since, wait):
+    started = time.monotonic()
+    response = client.get(f"/api/jobs/{job.job_id}?since={since}&wait={wait}")
+    return response.get_json(), time.monotonic() - started
+
+
+def test_state_carries_the_row_version(client):
+    job = _job()
+    assert client.get(f"/api/jobs/{job.job_id}").get_json()["version"] == job_version(job)
+
+
+def test_older_version_returns_at_once(client):
+    job = _job()
+    state, elapsed = _poll(client, job, job_version(job) - 1, 5)
+    assert state["version"] == job_version(job)
+    assert elapsed < 1
+
+
+def test_current_version_waits_out_the_timeout(client):
+    job = _job()
+    state, elapsed = _poll(client, job, job_version(job), 0.3)
+    assert state["version"] == job_version(job)
+    assert elapsed >= 0.3
+
+
+def test_settled_job_returns_at_once(client):
+    job = _job(status="completed")
+    state, elapsed = _poll(client, job, job_version(job), 5)
+    assert state["status"] == "completed"
+    assert elapsed < 1
+
+
+def test_publish_wakes_the_poll(app, client):
+    job = _job()
+    since = job_version(job)
+    events = job_events()
+    update = {"job_id": job.job_id, "status": "processing", "version": since + 1}
+    timer = threading.Timer(0.1, events.publish, (job.job_id, update))
+    timer.start()
+    try:
+        state, elapsed = _poll(client, job, since, 5)
+    finally:
+        timer.cancel()
+    assert state["version"] == since + 1
+    assert elapsed < 2
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/jobs/missing?since=1&wait=1").status_code == 404
+
+
+def test_redis_wait_backs_off_when_redis_is_down():
+    # Nothing listens on port 9; the wait must not return before its timeout.
+    events = RedisJobEvents("redis://127.0.0.1:9/0")
+    started = time.monotonic()
+    assert events.wait("job", None, 0.3) is None
+    assert time.monotonic() - started >= 0.3
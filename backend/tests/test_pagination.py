@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.models import Product
+from app.services.pagination import decode_cursor, encode_cursor, keyset_page
+
+CREATED_AT = datetime(2026, 10, 18, 12, 0, 0, 123456)
+
+
+def _seed(count: int, created_at=CREATED_AT):
+    products = [
+        Product(
+            sku=f"P-{index}",
+            sku_normalized=f"p-{index}",
+            name=f"Product {index}",
+            created_at=created_at,
+        )
+        for index in range(count)
+    ]
+    db.session.add_all(products)
+    db.session.commit()
+    return products
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(CREATED_AT, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (CREATED_AT, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not a cursor", "bm90IGpzb24", encode_cursor(CREATED_AT, 1)[:-3], "WyJ4IiwxXQ"],
+)
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_through_equal_created_at(app):
+    # Every row shares created_at, so only the id tie-breaker orders them.
+    products = _seed(7)
+    expected = sorted((product.id for product in products), reverse=True)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        rows, cursor = keyset_page(Product.query, Product, cursor, 3)
+        seen.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == 3
+
+
+def test_last_full_page_has_no_next_cursor(app):
+    _seed(3)
+
+    rows, cursor = keyset_page(Product.query, Product, None, 3)
+
+    assert len(rows) == 3
+    assert cursor is None
+
+
+def test_list_endpoint_rejects_a_bad_cursor(client):
+    response = client.get("/api/products/?cursor=garbage")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_list_endpoint_pages_by_cursor(client):
+    _seed(5)
+
+    first = client.get("/api/products/?cursor=&per_page=2&fields=sku").get_json()
+    second = client.get(
+        f"/api/products/?cursor={first['next_cursor']}&per_page=2&fields=sku"
+    ).get_json()
+
+    assert [item["sku"] for item in first["items"]] == ["P-4", "P-3"]
+    assert [item["sku"] for item in second["items"]] == ["P-2", "P-1"]
+    assert second["next_cursor"]
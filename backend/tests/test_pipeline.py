@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from app.services.pipeline import merge_pipeline_stats, run_pipeline
+
+
+def test_items_reach_the_consumer_in_order():
+    consumed = []
+
+    stats = run_pipeline(iter(range(10)), consumed.append, depth=3)
+
+    assert consumed == list(range(10))
+    assert stats["batches"] == 10
+    assert stats["queue_capacity"] == 3
+
+
+def test_producer_exception_reaches_the_caller():
+    consumed = []
+
+    def produce():
+        yield 1
+        yield 2
+        raise ValueError("Row 3: bad price")
+
+    with pytest.raises(ValueError, match="Row 3: bad price"):
+        run_pipeline(produce(), consumed.append, depth=2)
+    assert consumed == [1, 2]
+
+
+def test_consumer_exception_reaches_the_caller_and_stops_the_producer():
+    produced = []
+
+    def produce():
+        for item in range(1000):
+            produced.append(item)
+            yield item
+
+    def consume(item):
+        if item == 3:
+            raise RuntimeError("database went away")
+
+    with pytest.raises(RuntimeError, match="database went away"):
+        run_pipeline(produce(), consume, depth=2)
+    # The producer runs at most a full queue (plus the item it is handing
+    # off) ahead of the failed consumer, then stops.
+    assert len(produced) <= 3 + 1 + 2 + 1
+
+
+def test_queue_depth_is_bounded():
+    produced = 0
+    ahead = []
+    lock = threading.Lock()
+
+    def produce():
+        nonlocal produced
+        for item in range(30):
+            with lock:
+                produced += 1
+            yield item
+
+    def consume(item):
+        with lock:
+            ahead.append(produced - (item + 1))
+        time.sleep(0.002)
+
+    stats = run_pipeline(produce(), consume, depth=2)
+
+    assert stats["batches"] == 30
+    assert stats["queue_depth_max"] <= 2
+    # Besides the queued items, the producer holds one it is waiting to put.
+    assert max(ahead) <= 2 + 1
+
+
+def test_stall_stats_show_the_slower_side():
+    def slow_produce():
+        for item in range(5):
+            time.sleep(0.02)
+            yield item
+
+    stats = run_pipeline(slow_produce(), lambda item: None, depth=2)
+    assert stats["consumer_stall_seconds"] >= 0.05
+
+    stats = run_pipeline(iter(range(5)), lambda item: time.sleep(0.02), depth=1)
+    assert stats["producer_stall_seconds"] >= 0.05
+
+
+def test_merge_weights_depth_by_batches():
+    merged = merge_pipeline_stats(
+        [
+            {
+                "batches": 3,
+                "queue_capacity": 3,
+                "queue_depth_max": 2,
+                "queue_depth_avg": 2.0,
+                "producer_stall_seconds": 0.5,
+                "consumer_stall_seconds": 0.1,
+            },
+            None,
+            {
+                "batches": 1,
+                "queue_capacity": 3,
+                "queue_depth_max": 1,
+                "queue_depth_avg": 0.0,
+                "producer_stall_seconds": 0.25,
+                "consumer_stall_seconds": 0.2,
+            },
+        ]
+    )
+
+    assert merged == {
+        "batches": 4,
+        "queue_capacity": 3,
+        "queue_depth_max": 2,
+        "queue_depth_avg": 1.5,
+        "producer_stall_seconds": 0.75,
+        "consumer_stall_seconds": 0.3,
+    }
@@ -0,0 +1,67 @@
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob, ImportStaging, Product
+from app.tasks.import_csv import import_products_job
+
+pytestmark = pytest.mark.postgres
+
+
+def _seed():
+    for sku, name in (("A-1", "One"), ("A-2", "Two"), ("OLD", "Old")):
+        db.session.add(
+            Product(sku=sku, sku_normalized=sku.lower(), name=name, price=1, is_active=True)
+        )
+    db.session.commit()
+
+
+def _preview(write_csv, **options):
+    lines = ["sku,name,description,price", "A-1,One,,1", "A-2,Renamed,,1", "A-3,New,,1"]
+    job = ImportJob(
+        filename="catalog.csv",
+        file_path=write_csv("catalog.csv", lines),
+        preview=True,
+        **options,
+    )
+    db.session.add(job)
+    db.session.commit()
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+    return job
+
+
+def test_preview_diffs_without_touching_products(app, write_csv):
+    _seed()
+    job = _preview(write_csv, sync_mode="deactivate")
+
+    assert job.status == "previewed"
+    preview = job.stats["preview"]
+    assert (preview["insert"], preview["update"], preview["unchanged"]) == (1, 1, 1)
+    assert preview["retire"] == 1
+    assert preview["sample"]["insert"][0]["sku"] == "A-3"
+    assert Product.query.filter_by(sku_normalized="a-2").one().name == "Two"
+    assert Product.query.count() == 3
+
+
+def test_apply_merges_the_staged_rows(app, client, write_csv):
+    _seed()
+    job = _preview(write_csv, sync_mode="deactivate")
+
+    response = client.post(f"/api/jobs/{job.job_id}/apply")
+    assert response.status_code == 202
+    assert response.get_json()["preview"]["insert"] == 1
+
+    # The apply ran in the task's own session; drop this one's stale copy.
+    db.session.expire_all()
+    state = client.get(f"/api/jobs/{job.job_id}").get_json()
+    assert state["status"] == "completed"
+    assert (state["rows_inserted"], state["rows_updated"], state["rows_unchanged"]) == (1, 1, 1)
+    assert Product.query.filter_by(sku_normalized="a-2").one().name == "Renamed"
+    assert Product.query.filter_by(sku_normalized="old").one().is_active is False
+    assert ImportStaging.query.filter_by(import_job_id=job.job_id).count() == 0
+
+
+def test_only_a_previewed_job_can_be_applied(app, client, write_csv):
+    job = _preview(write_csv)
+    assert client.post(f"/api/jobs/{job.job_id}/apply").status_code == 202
+    assert client.post(f"/api/jobs/{job.job_id}/apply").status_code == 409
@@ -0,0 +1,69 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models import Product
+from app.services import product_fields
+from app.services.product_fields import LIST_FIELDS, encode_json, parse_fields
+
+
+def _seed():
+    product = Product(
+        sku="A-1",
+        sku_normalized="a-1",
+        name="Widget",
+        price=Decimal("9.99"),
+        created_at=datetime(2026, 10, 18, 12, 0, 0, 500),
+    )
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+def test_parse_fields():
+    assert parse_fields(None) == LIST_FIELDS
+    assert parse_fields("") == LIST_FIELDS
+    assert parse_fields(" price , sku,,") == ("id", "sku", "price")
+    with pytest.raises(ValueError, match="Unknown fields: cost, row_hash"):
+        parse_fields("sku,cost,row_hash")
+
+
+def test_unknown_field_is_a_400(client):
+    response = client.get("/api/products/?fields=sku,row_hash")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Unknown fields: row_hash"}
+
+
+def test_sparse_fields_match_the_full_representation(client):
+    product = _seed()
+
+    full = client.get("/api/products/").get_json()["items"]
+    sparse = client.get("/api/products/?fields=sku,price").get_json()["items"]
+
+    assert full == [product.to_dict()]
+    assert sparse == [{"id": product.id, "sku": "A-1", "price": 9.99}]
+
+
+@pytest.mark.skipif(product_fields.orjson is None, reason="orjson is not installed")
+def test_orjson_output_matches_the_stdlib_fallback(monkeypatch):
+    payload = {
+        "items": [{"id": 1, "created_at": datetime(2026, 10, 18, 12, 0, 0, 500), "price": 9.99}],
+        "next_cursor": None,
+    }
+
+    fast = encode_json(payload)
+    monkeypatch.setattr(product_fields, "orjson", None)
+    slow = encode_json(payload)
+
+    assert fast == slow
+    assert json.loads(fast)["items"][0]["created_at"] == "2026-10-18T12:00:00.000500"
+
+
+def test_stdlib_fallback_encodes_decimals(monkeypatch):
+    monkeypatch.setattr(product_fields, "orjson", None)
+
+    assert encode_json({"price": Decimal("1.50")}) == b'{"price":1.5}'
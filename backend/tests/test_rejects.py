@@ -0,0 +1,64 @@
+import csv
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob
+from app.tasks.import_csv import import_products_job
+
+pytestmark = pytest.mark.postgres
+
+
+def _lines():
+    lines = ["sku,name,description,price"]
+    for index in range(1, 301):
+        price = "bad" if index in (3, 150, 290) else str(index)
+        lines.append(f"S-{index},Name {index},,{price}")
+        if index == 100:
+            lines.append("")  # a blank line still counts as a row
+    return lines
+
+
+def _import(write_csv, chunks):
+    job = ImportJob(
+        filename="catalog.csv",
+        file_path=write_csv(f"catalog-{chunks}.csv", _lines()),
+        chunk_count=chunks,
+        error_policy="skip",
+    )
+    db.session.add(job)
+    db.session.commit()
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+    return job
+
+
+def _rejects(job):
+    with open(job.reject_file_path, newline="") as handle:
+        return [(row["_row"], row["sku"]) for row in csv.DictReader(handle)]
+
+
+def test_chunked_rejects_carry_file_row_numbers(app, write_csv):
+    single = _import(write_csv, 1)
+    chunked = _import(write_csv, 3)
+
+    assert chunked.status == single.status == "completed"
+    assert chunked.chunk_count == 3
+    assert _rejects(single) == [("4", "S-3"), ("152", "S-150"), ("292", "S-290")]
+    assert _rejects(chunked) == _rejects(single)
+
+
+def test_rejects_import_needs_a_corrected_file(client, write_csv):
+    job = _import(write_csv, 1)
+
+    assert client.post(f"/api/jobs/{job.job_id}/rejects/import").status_code == 400
+
+    corrected = "_row,_offset,_error,sku,name,description,price\n4,0,,S-3,Name 3,,3\n"
+    response = client.post(
+        f"/api/jobs/{job.job_id}/rejects/import",
+        data={"file": (io.BytesIO(corrected.encode()), "fixed.csv")},
+    )
+    assert response.status_code == 202
+    reimport = client.get(f"/api/jobs/{response.get_json()['job_id']}").get_json()
+    assert (reimport["status"], reimport["rows_inserted"]) == ("completed", 1)
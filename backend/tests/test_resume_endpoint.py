@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api import jobs
+from app.extensions import db
+from app.models import ImportJob
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    tasks = []
+
+    class Task:
+        @staticmethod
+        def delay(job_id):
+            tasks.append(job_id)
+
+    monkeypatch.setattr(jobs, "resume_task", lambda job: Task)
+    return tasks
+
+
+def _job(status: str, heartbeat_age: int = 0) -> ImportJob:
+    job = ImportJob(
+        filename="a.csv",
+        file_path="a.csv",
+        status=status,
+        heartbeat_at=datetime.utcnow() - timedelta(seconds=heartbeat_age),
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+@pytest.mark.parametrize(
+    "status", ["queued", "completed", "previewed", "expired", "skipped_duplicate"]
+)
+def test_settled_or_waiting_jobs_cannot_be_resumed(client, queued, status):
+    job = _job(status, heartbeat_age=3600)
+
+    response = client.post(f"/api/jobs/{job.job_id}/resume")
+
+    assert response.status_code == 409
+    assert queued == []
+    assert ImportJob.query.filter_by(job_id=job.job_id).one().status == status
+
+
+@pytest.mark.parametrize("status", ["processing", "applying"])
+def test_live_jobs_cannot_be_resumed(client, queued, status):
+    job = _job(status)
+
+    response = client.post(f"/api/jobs/{job.job_id}/resume")
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "Job is still running"}
+    assert queued == []
+
+
+@pytest.mark.parametrize(
+    "status, heartbeat_age", [("failed", 0), ("processing", 3600), ("applying", 3600)]
+)
+def test_failed_and_stalled_jobs_are_requeued(client, queued, status, heartbeat_age):
+    job = _job(status, heartbeat_age)
+
+    response = client.post(f"/api/jobs/{job.job_id}/resume")
+
+    assert response.status_code == 202
+    assert queued == [job.job_id]
+    assert ImportJob.query.filter_by(job_id=job.job_id).one().status == "queued"
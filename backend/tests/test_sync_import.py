@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import ImportJob, Product
+from app.tasks.import_csv import import_products_job
+
+pytestmark = pytest.mark.postgres
+
+
+def _seed(*skus):
+    for sku in skus:
+        db.session.add(
+            Product(sku=sku, sku_normalized=sku.lower(), name=sku, price=1, is_active=True)
+        )
+    db.session.commit()
+
+
+def _run_sync(write_csv, tmp_path, mode, lines, load_mode="insert"):
+    job = ImportJob(
+        filename="catalog.csv",
+        file_path=write_csv("catalog.csv", ["sku,name,description,price", *lines]),
+        sync_mode=mode,
+        load_mode=load_mode,
+    )
+    db.session.add(job)
+    db.session.commit()
+    import_products_job(job.job_id)
+    db.session.refresh(job)
+    return job
+
+
+@pytest.mark.parametrize("mode, kind", [("delete", "deleted"), ("deactivate", "updated")])
+def test_retired_products_are_announced(app, write_csv, tmp_path, subscribe, mode, kind):
+    _seed("A-1", "B-1", "C-1")
+    changes = subscribe("products.changed")
+
+    job = _run_sync(write_csv, tmp_path, mode, ["A-1,A-1,,1"])
+
+    assert job.status == "completed"
+    assert job.stats["sync"]["rows"] == 2
+    retired = [payload for payload in changes() if payload[kind]]
+    assert sorted(sku for payload in retired for sku in payload[kind]) == ["B-1", "C-1"]
+
+
+def test_unchanged_rows_keep_their_products(app, write_csv, tmp_path):
+    _seed("A-1", "B-1")
+    updated_at = {product.sku: product.updated_at for product in Product.query}
+
+    job = _run_sync(write_csv, tmp_path, "deactivate", ["A-1,A-1,,1", "B-1,B-1,,1"])
+
+    assert job.rows_unchanged == 2
+    assert job.stats["sync"]["rows"] == 0
+    db.session.expire_all()
+    products = Product.query.all()
+    assert all(product.is_active for product in products)
+    assert all(product.sync_generation == job.id for product in products)
+    assert {product.sku: product.updated_at for product in products} == updated_at
+
+
+@pytest.mark.parametrize("load_mode", ["insert", "copy"])
+def test_plain_import_keeps_the_sync_generation(app, write_csv, tmp_path, load_mode):
+    _seed("A-1")
+    sync = _run_sync(write_csv, tmp_path, "deactivate", ["A-1,A-1,,1"])
+
+    plain = _run_sync(write_csv, tmp_path, None, ["A-1,Renamed,,1"], load_mode=load_mode)
+
+    assert plain.rows_updated == 1
+    product = Product.query.filter_by(sku_normalized="a-1").one()
+    assert (product.name, product.sync_generation) == ("Renamed", sync.id)
+
+
+def test_repeated_sync_upload_is_not_skipped_as_a_duplicate(client):
+    catalog = b"sku,name,description,price\nA-1,A-1,,1\n"
+
+    def upload():
+        response = client.post(
+            "/api/uploads/",
+            data={"file": (io.BytesIO(catalog), "catalog.csv"), "sync_mode": "delete"},
+        )
+        assert response.status_code == 202
+        return response.get_json()["job_id"]
+
+    upload()
+    _seed("B-1")
+    second = upload()
+
+    assert ImportJob.query.filter_by(job_id=second).one().status == "completed"
+    assert [product.sku for product in Product.query] == ["A-1"]
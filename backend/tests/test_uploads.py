@@ -0,0 +1,63 @@
+import pytest
+
+from app.api import uploads
+from app.models import ImportJob, UploadSession
+
+CSV = b"sku,name,description,price\nA-1,One,,1\nA-2,Two,,2\n"
+
+
+def _upload_in_session(client, chunks):
+    session = client.post(
+        "/api/uploads/sessions", json={"filename": "catalog.csv", "size": sum(map(len, chunks))}
+    ).get_json()
+    offset = 0
+    for index, chunk in enumerate(chunks):
+        client.put(
+            f"/api/uploads/sessions/{session['session_id']}/chunks/{index}?offset={offset}",
+            data=chunk,
+        )
+        offset += len(chunk)
+    return client.post(f"/api/uploads/sessions/{session['session_id']}/finalize")
+
+
+@pytest.mark.postgres
+def test_session_upload_is_hashed_by_the_worker(client):
+    response = _upload_in_session(client, [CSV[:20], CSV[20:]])
+    assert response.status_code == 202
+    job = ImportJob.query.filter_by(job_id=response.get_json()["job_id"]).one()
+    assert job.status == "completed"
+    assert job.content_sha256 is not None
+
+
+@pytest.mark.postgres
+def test_identical_session_upload_is_skipped_by_the_worker(client):
+    first = _upload_in_session(client, [CSV]).get_json()
+    second = _upload_in_session(client, [CSV[:10], CSV[10:]]).get_json()
+
+    job = client.get(f"/api/jobs/{second['job_id']}").get_json()
+    assert job["status"] == "skipped_duplicate"
+    assert job["duplicate_of"] == first["job_id"]
+
+
+@pytest.mark.parametrize("body", ["[]", '"catalog.csv"', "null", "not json"])
+def test_session_body_must_be_a_json_object(client, body):
+    response = client.post("/api/uploads/sessions", data=body, content_type="application/json")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Request body must be a JSON object"}
+
+
+def test_failed_finalize_leaves_the_session_open(client, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(uploads, "_record_import", fail)
+
+    response = _upload_in_session(client, [CSV])
+
+    assert response.status_code == 400
+    upload_session = UploadSession.query.one()
+    assert (upload_session.status, upload_session.job_id) == ("open", None)
+    assert upload_session.file_path.endswith(".part")
+    with open(upload_session.file_path, "rb") as handle:
+        assert handle.read() == CSV
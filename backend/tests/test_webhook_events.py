@@ -0,0 +1,44 @@
+import threading
+
+from app.models import ImportJob, WebhookDelivery
+from app.services import webhook_dispatcher
+from app.services.webhook_events import emit_import_progress
+
+TOTALS = {"processed_rows": 10, "bytes_processed": 50}
+
+
+def test_progress_events_are_rate_limited_per_job(app, subscribe):
+    progress = subscribe("product.import.progress")
+    first = ImportJob(job_id="job-1", filename="a.csv", file_path="a.csv", bytes_total=100)
+    second = ImportJob(job_id="job-2", filename="b.csv", file_path="b.csv", bytes_total=100)
+
+    for _ in range(3):
+        emit_import_progress(first, TOTALS)
+    emit_import_progress(second, TOTALS)
+
+    assert [(event["job_id"], event["progress"]) for event in progress()] == [
+        ("job-1", 50.0),
+        ("job-2", 50.0),
+    ]
+
+
+def test_eager_dispatch_sends_deliveries_off_the_calling_thread(app, subscribe, monkeypatch):
+    sent = []
+    done = threading.Event()
+
+    def deliver(delivery_ids):
+        sent.append((delivery_ids, threading.current_thread() is threading.main_thread()))
+        done.set()
+
+    monkeypatch.setattr(webhook_dispatcher, "deliver_webhooks", deliver)
+    monkeypatch.setitem(app.config, "WEBHOOK_EAGER_DELIVERY", True)
+    subscribe("product.import.progress")
+
+    emit_import_progress(
+        ImportJob(job_id="job-3", filename="c.csv", file_path="c.csv", bytes_total=100), TOTALS
+    )
+
+    assert done.wait(5)
+    delivery = WebhookDelivery.query.one()
+    assert sent == [([delivery.id], False)]
+    assert delivery.status == "pending"
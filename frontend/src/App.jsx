@@ -1,6 +1,10 @@
 import { useEffect, useMemo, useState } from 'react'
 
 const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:5000/api'
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+const CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+const SETTLED_STATUSES = ['completed', 'failed', 'skipped_duplicate', 'previewed', 'expired']
+const LONG_POLL_SECONDS = 25
 
 function App() {
   return (
@@ -41,28 +45,56 @@ function UploadSection() {
   const [jobId, setJobId] = useState(null)
   const [job, setJob] = useState(null)
   const [status, setStatus] = useState('idle')
+  const [uploadProgress, setUploadProgress] = useState(null)
   const [error, setError] = useState('')
+  const [previewFirst, setPreviewFirst] = useState(false)
+  const [pollKey, setPollKey] = useState(0)
 
   useEffect(() => {
     if (!jobId) return undefined
-    let intervalId = null
-    const fetchStatus = async () => {
-      try {
-        const res = await fetch(`${API_BASE}/jobs/${jobId}`)
-        if (!res.ok) throw new Error('Unable to fetch job status')
-        const data = await res.json()
-        setJob(data)
-        if (['completed', 'failed'].includes(data.status) && intervalId) {
-          clearInterval(intervalId)
+    let cancelled = false
+    let source = null
+    let version = null
+    const track = (data) => {
+      setJob(data)
+      version = data.version
+      return SETTLED_STATUSES.includes(data.status)
+    }
+    // Used when the browser or a proxy cannot keep the event stream open:
+    // each request waits on the server until the job changes.
+    const longPoll = async () => {
+      while (!cancelled) {
+        try {
+          const query = version === null ? '' : `?since=${version}&wait=${LONG_POLL_SECONDS}`
+          const res = await fetch(`${API_BASE}/jobs/${jobId}${query}`)
+          if (!res.ok) throw new Error('Unable to fetch job status')
+          const data = await res.json()
+          if (cancelled || track(data)) return
+        } catch (err) {
+          setError(err.message)
+          await new Promise((resolve) => setTimeout(resolve, 2000))
         }
-      } catch (err) {
-        setError(err.message)
       }
     }
-    fetchStatus()
-    intervalId = setInterval(fetchStatus, 2000)
-    return () => clearInterval(intervalId)
-  }, [jobId])
+
+    if (window.EventSource) {
+      source = new EventSource(`${API_BASE}/jobs/${jobId}/events`)
+      source.addEventListener('job', (event) => {
+        if (track(JSON.parse(event.data))) source.close()
+      })
+      source.onerror = () => {
+        // EventSource reconnects on its own; it only closes for good when
+        // the stream is refused, and then polling takes over.
+        if (source.readyState === EventSource.CLOSED && !cancelled) longPoll()
+      }
+    } else {
+      longPoll()
+    }
+    return () => {
+      cancelled = true
+      if (source) source.close()
+    }
+  }, [jobId, pollKey])
 
   useEffect(() => {
     if (job?.status) {
@@ -74,8 +106,8 @@ function UploadSection() {
   }, [job])
 
   const progress = useMemo(() => {
-    if (!job || !job.total_rows) return 0
-    return Math.min(100, Math.round((job.processed_rows / job.total_rows) * 100))
+    if (!job || job.progress == null) return 0
+    return Math.min(100, Math.round(job.progress))
   }, [job])
 
   const handleSubmit = async (event) => {
@@ -86,19 +118,14 @@ function UploadSection() {
     }
     setError('')
     setStatus('uploading')
-
-    const formData = new FormData()
-    formData.append('file', file)
+    setUploadProgress(null)
 
     try {
-      const res = await fetch(`${API_BASE}/uploads/`, {
-        method: 'POST',
-        body: formData,
-      })
-      const data = await res.json()
-      if (!res.ok) {
-        throw new Error(data.error || 'Upload failed')
-      }
+      const options = previewFirst ? { preview: 'true' } : {}
+      const data =
+        file.size > CHUNKED_UPLOAD_THRESHOLD
+          ? await uploadInChunks(file, setUploadProgress, options)
+          : await uploadInOneRequest(file, options)
       setJobId(data.job_id)
       setJob(null)
       setStatus('processing')
@@ -108,6 +135,20 @@ function UploadSection() {
     }
   }
 
+  const handleApply = async () => {
+    setError('')
+    try {
+      const res = await fetch(`${API_BASE}/jobs/${jobId}/apply`, { method: 'POST' })
+      const data = await res.json()
+      if (!res.ok) throw new Error(data.error || 'Unable to apply preview')
+      setPollKey((key) => key + 1)
+    } catch (err) {
+      setError(err.message)
+    }
+  }
+
+  const preview = job?.stats?.preview
+
   return (
     <div className="stack gap-md">
       <form className="upload-form" onSubmit={handleSubmit}>
@@ -117,7 +158,7 @@ function UploadSection() {
 
           <input
             type="file"
-            accept=".csv"
+            accept=".csv,.gz,.zst,.zip"
             onChange={(event) => {
               setFile(event.target.files?.[0] ?? null)
               setError('')
@@ -126,8 +167,21 @@ function UploadSection() {
         </label>
 
         <button type="submit" className="btn primary" disabled={!file || status === 'uploading'}>
-          {status === 'uploading' ? 'Uploading…' : 'Start Import'}
+          {status === 'uploading'
+            ? `Uploading…${uploadProgress != null ? ` ${Math.round(uploadProgress * 100)}%` : ''}`
+            : previewFirst
+              ? 'Preview Import'
+              : 'Start Import'}
         </button>
+
+        <label className="checkbox">
+          <input
+            type="checkbox"
+            checked={previewFirst}
+            onChange={(event) => setPreviewFirst(event.target.checked)}
+          />
+          Preview changes first
+        </label>
       </form>
 
       {jobId && (
@@ -145,6 +199,7 @@ function UploadSection() {
               <p className="label">Progress</p>
               <p>
                 {job?.processed_rows ?? 0}/{job?.total_rows ?? '—'}
+                {job?.eta_seconds != null && ` · ~${job.eta_seconds}s left`}
               </p>
             </div>
           </div>
@@ -152,11 +207,46 @@ function UploadSection() {
             <div className="progress" style={{ width: `${progress}%` }} />
           </div>
           <p className="status-hint">
-            {job?.status === 'processing' && 'Parsing CSV and writing to PostgreSQL…'}
+            {job?.status === 'processing' &&
+              (job.preview ? 'Parsing CSV into staging…' : 'Parsing CSV and writing to PostgreSQL…')}
+            {job?.status === 'applying' && 'Applying previewed changes…'}
+            {job?.status === 'expired' && 'Preview expired; upload the file again.'}
             {job?.status === 'completed' && 'Import complete!'}
+            {job?.status === 'skipped_duplicate' &&
+              `Identical file already imported (job ${job?.duplicate_of}); nothing to do.`}
             {job?.status === 'failed' && `Failed: ${job?.error_message}`}
             {!job && 'Queued… waiting for worker.'}
           </p>
+          {job?.status === 'previewed' && preview && (
+            <div className="stack gap-sm">
+              <p className="status-hint">
+                Would insert {preview.insert} · update {preview.update} · leave {preview.unchanged}{' '}
+                unchanged · reject {preview.rejected}
+                {preview.retire != null && ` · retire ${preview.retire}`}
+              </p>
+              {preview.sample.update.length > 0 && (
+                <ul className="preview-sample">
+                  {preview.sample.update.map((row) => (
+                    <li key={row.sku}>
+                      <span className="mono">{row.sku}</span>:{' '}
+                      {Object.entries(row.changes)
+                        .map(([field, change]) => `${field} ${change.from ?? '—'} → ${change.to ?? '—'}`)
+                        .join(', ')}
+                    </li>
+                  ))}
+                </ul>
+              )}
+              <button type="button" className="btn primary" onClick={handleApply}>
+                Apply Changes
+              </button>
+            </div>
+          )}
+          {job?.rows_rejected > 0 && (
+            <p className="status-hint">
+              {job.rows_rejected} rows rejected ·{' '}
+              <a href={`${API_BASE}/jobs/${jobId}/rejects`}>Download reject file</a>
+            </p>
+          )}
         </div>
       )}
 
@@ -165,10 +255,72 @@ function UploadSection() {
   )
 }
 
-//
-// ⬇️ NO CHANGES BELOW THIS LINE
-// ALL OTHER SECTIONS ARE EXACTLY SAME AS YOUR ORIGINAL CODE
-//
+async function uploadInOneRequest(file, options = {}) {
+  const formData = new FormData()
+  formData.append('file', file)
+  Object.entries(options).forEach(([key, value]) => formData.append(key, value))
+
+  const res = await fetch(`${API_BASE}/uploads/`, {
+    method: 'POST',
+    body: formData,
+  })
+  const data = await res.json()
+  if (!res.ok) {
+    throw new Error(data.error || 'Upload failed')
+  }
+  return data
+}
+
+// Large files go through an upload session: fixed-size chunks appended at
+// the server's acknowledged offset, so a dropped connection only re-sends
+// the unacknowledged part of one chunk.
+async function uploadInChunks(file, onProgress, options = {}) {
+  const res = await fetch(`${API_BASE}/uploads/sessions`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ filename: file.name, size: file.size, ...options }),
+  })
+  const session = await res.json()
+  if (!res.ok) {
+    throw new Error(session.error || 'Unable to start upload')
+  }
+
+  const sessionUrl = `${API_BASE}/uploads/sessions/${session.session_id}`
+  let offset = session.offset
+  let index = 0
+  let failures = 0
+
+  while (offset < file.size) {
+    try {
+      const chunkRes = await fetch(`${sessionUrl}/chunks/${index}?offset=${offset}`, {
+        method: 'PUT',
+        body: file.slice(offset, offset + UPLOAD_CHUNK_SIZE),
+      })
+      const data = await chunkRes.json()
+      if (data.offset == null) {
+        throw new Error(data.error || 'Chunk upload failed')
+      }
+      offset = data.offset
+      index += 1
+      failures = 0
+      onProgress(offset / file.size)
+    } catch (err) {
+      failures += 1
+      if (failures > 3) throw err
+      const statusRes = await fetch(sessionUrl)
+      if (statusRes.ok) {
+        offset = (await statusRes.json()).offset
+      }
+    }
+  }
+
+  const finalRes = await fetch(`${sessionUrl}/finalize`, { method: 'POST' })
+  const data = await finalRes.json()
+  if (!finalRes.ok) {
+    throw new Error(data.error || 'Upload failed')
+  }
+  return data
+}
 
 const initialProductForm = {
   sku: '',
@@ -182,6 +334,8 @@ function ProductSection() {
   const [products, setProducts] = useState([])
   const [filters, setFilters] = useState({ sku: '', name: '', description: '', is_active: '' })
   const [page, setPage] = useState(1)
+  const [cursors, setCursors] = useState([''])
+  const [nextCursor, setNextCursor] = useState(null)
   const [perPage] = useState(20)
   const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(false)
@@ -192,11 +346,12 @@ function ProductSection() {
   const updateFilter = (field, value) => {
     setFilters((prev) => ({ ...prev, [field]: value }))
     setPage(1)
+    setCursors([''])
   }
 
   const fetchProducts = async () => {
     setLoading(true)
-    const params = new URLSearchParams({ page, per_page: perPage })
+    const params = new URLSearchParams({ cursor: cursors[page - 1] ?? '', per_page: perPage, total: 'approx' })
     Object.entries(filters).forEach(([key, value]) => {
       if (value !== '' && value !== null) params.append(key, value)
     })
@@ -206,6 +361,7 @@ function ProductSection() {
       if (!res.ok) throw new Error(data.error || 'Unable to fetch products')
       setProducts(data.items)
       setTotal(data.total)
+      setNextCursor(data.next_cursor)
       setMessage('')
     } catch (err) {
       setMessage(err.message)
@@ -263,11 +419,45 @@ function ProductSection() {
 
   const handleBulkDelete = async () => {
     if (!window.confirm('Delete ALL products?')) return
-    await fetch(`${API_BASE}/products/bulk-delete`, { method: 'POST' })
-    fetchProducts()
+    const res = await fetch(`${API_BASE}/products/bulk-delete`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ all: true }),
+    })
+    const data = await res.json()
+    if (!res.ok) {
+      setMessage(data.error || 'Bulk delete failed')
+      return
+    }
+    setMessage('Bulk delete running…')
+    // The delete runs as a background job; refresh once it finishes.
+    const intervalId = setInterval(async () => {
+      const statusRes = await fetch(`${API_BASE}/products/bulk-delete/${data.job_id}`)
+      const status = await statusRes.json()
+      if (status.status === 'completed' || status.status === 'failed') {
+        clearInterval(intervalId)
+        setMessage(
+          status.status === 'completed'
+            ? `Deleted ${status.deleted_rows} products`
+            : status.error_message || 'Bulk delete failed',
+        )
+        fetchProducts()
+      }
+    }, 1000)
   }
 
-  const totalPages = Math.ceil(total / perPage) || 1
+  const totalPages = Math.max(Math.ceil(total / perPage), page)
+
+  const exportParams = new URLSearchParams({ format: 'csv' })
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== '' && value !== null) exportParams.append(key, value)
+  })
+  const exportUrl = `${API_BASE}/products/export?${exportParams.toString()}`
+
+  const goToNextPage = () => {
+    setCursors((prev) => [...prev.slice(0, page), nextCursor])
+    setPage((p) => p + 1)
+  }
 
   return (
     <div className="stack gap-lg">
@@ -304,6 +494,9 @@ function ProductSection() {
         >
           Clear
         </button>
+        <a className="btn ghost" href={exportUrl}>
+          Export CSV
+        </a>
         <button className="btn danger" onClick={handleBulkDelete}>
           Bulk Delete
         </button>
@@ -421,9 +614,9 @@ function ProductSection() {
           Prev
         </button>
         <span>
-          Page {page} of {totalPages}
+          Page {page} of ~{totalPages}
         </span>
-        <button className="btn ghost" disabled={page >= totalPages} onClick={() => setPage((p) => p + 1)}>
+        <button className="btn ghost" disabled={!nextCursor} onClick={goToNextPage}>
           Next
         </button>
       </div>
@@ -431,7 +624,13 @@ function ProductSection() {
   )
 }
 
-const initialWebhookForm = { name: '', url: '', event_type: 'product.import.completed', is_enabled: true }
+const initialWebhookForm = {
+  name: '',
+  url: '',
+  event_type: 'product.import.completed',
+  is_enabled: true,
+  gzip: false,
+}
 
 function WebhookSection() {
   const [webhooks, setWebhooks] = useState([])
@@ -477,6 +676,7 @@ function WebhookSection() {
       url: webhook.url,
       event_type: webhook.event_type,
       is_enabled: webhook.is_enabled,
+      gzip: webhook.gzip,
     })
   }
 
@@ -520,6 +720,8 @@ function WebhookSection() {
             <option value="product.import.started">Import Started</option>
             <option value="product.import.completed">Import Completed</option>
             <option value="product.import.failed">Import Failed</option>
+            <option value="product.import.progress">Import Progress</option>
+            <option value="products.changed">Products Changed</option>
           </select>
           <select
             value={form.is_enabled ? 'true' : 'false'}
@@ -528,6 +730,13 @@ function WebhookSection() {
             <option value="true">Enabled</option>
             <option value="false">Disabled</option>
           </select>
+          <select
+            value={form.gzip ? 'true' : 'false'}
+            onChange={(e) => setForm({ ...form, gzip: e.target.value === 'true' })}
+          >
+            <option value="false">Plain JSON</option>
+            <option value="true">Gzip bodies</option>
+          </select>
         </div>
         <div className="form-actions">
           <button type="submit" className="btn primary">
@@ -581,6 +790,11 @@ function WebhookSection() {
                   ) : (
                     '—'
                   )}
+                  {hook.circuit_open_until && (
+                    <span className="pill muted" title={`Paused until ${hook.circuit_open_until}`}>
+                      Paused
+                    </span>
+                  )}
                 </td>
                 <td>
                   <div className="table-actions">